@@ -14,6 +14,7 @@ from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -28,7 +29,8 @@ load_dotenv(BASE_DIR / ".env")
 SECRET_KEY = os.getenv("SECRET_KEY")
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# `manage.py serve` starts with DEBUG=0 (DEBUG also keeps every SQL query in memory).
+DEBUG = os.getenv("DEBUG", "1") == "1"
 
 ALLOWED_HOSTS = ["167.233.113.252", "127.0.0.1", "localhost", "videoflix-backend.richard-wezel.de"]
 
@@ -37,6 +39,135 @@ if not GEMINI_API_KEY:
     raise RuntimeError(
         "GEMINI_API_KEY fehlt. Setze ihn als Umgebungsvariable (z. B. in .env oder im Deployment)."
     )
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+# Override the API endpoint (e.g. a local stand-in server); empty = Google's default.
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "")
+GEMINI_TIMEOUT_SECONDS = int(os.getenv("GEMINI_TIMEOUT_SECONDS", "120"))
+# Size of the shared HTTP connection pool used for all Gemini calls.
+GEMINI_MAX_CONNECTIONS = int(os.getenv("GEMINI_MAX_CONNECTIONS", "10"))
+# Longer transcripts are compressed to this many tokens before prompting (0 = no limit).
+QUIZ_PROMPT_TOKEN_BUDGET = int(os.getenv("QUIZ_PROMPT_TOKEN_BUDGET", "30000"))
+# Map-reduce generation for long transcripts: sections of QUIZ_MAP_SECTION_TOKENS are turned
+# into candidate questions by up to QUIZ_MAP_CONCURRENCY parallel calls (0 = always one call).
+QUIZ_MAP_REDUCE_MIN_TOKENS = int(os.getenv("QUIZ_MAP_REDUCE_MIN_TOKENS", "12000"))
+QUIZ_MAP_SECTION_TOKENS = int(os.getenv("QUIZ_MAP_SECTION_TOKENS", "4000"))
+QUIZ_MAP_CONCURRENCY = int(os.getenv("QUIZ_MAP_CONCURRENCY", "4"))
+# Follow-up calls allowed to replace unparseable answers or invalid/missing questions.
+QUIZ_REPAIR_ATTEMPTS = int(os.getenv("QUIZ_REPAIR_ATTEMPTS", "2"))
+
+# GET /api/quizzes/ is paginated with a cursor (next page in the Link header); ?page_size= up to the max.
+QUIZ_LIST_PAGE_SIZE = int(os.getenv("QUIZ_LIST_PAGE_SIZE", "50"))
+QUIZ_LIST_MAX_PAGE_SIZE = int(os.getenv("QUIZ_LIST_MAX_PAGE_SIZE", "200"))
+
+# Per-user cache of the quiz list and detail payloads; every write invalidates the affected entries.
+# QUIZ_CACHE_BACKEND: "file" (QUIZ_CACHE_LOCATION is a directory shared by all workers), "redis"
+# (QUIZ_CACHE_LOCATION is a redis:// URL, needs the redis package), "locmem" (per worker process: only
+# for a single worker, others would not see its invalidations) or "dummy" (off).
+QUIZ_CACHE_BACKEND = os.getenv("QUIZ_CACHE_BACKEND", "file")
+QUIZ_CACHE_LOCATION = os.getenv("QUIZ_CACHE_LOCATION", "")
+QUIZ_CACHE_TIMEOUT = int(os.getenv("QUIZ_CACHE_TIMEOUT", "300"))
+QUIZ_CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "quiz-reads"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / "quiz_app" / "response_cache")),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/1"),
+    "dummy": ("django.core.cache.backends.dummy.DummyCache", ""),
+}
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "quiz_reads": {
+        "BACKEND": QUIZ_CACHE_BACKENDS[QUIZ_CACHE_BACKEND][0],
+        "LOCATION": QUIZ_CACHE_LOCATION or QUIZ_CACHE_BACKENDS[QUIZ_CACHE_BACKEND][1],
+        "TIMEOUT": QUIZ_CACHE_TIMEOUT,
+    },
+}
+
+# Quiz generation jobs
+# Number of background worker threads that run the download/transcribe/LLM pipeline.
+QUIZ_JOB_WORKERS = int(os.getenv("QUIZ_JOB_WORKERS", "2"))
+# Run jobs inline in the request thread instead of the worker pool (tests, debugging).
+QUIZ_JOB_EAGER = os.getenv("QUIZ_JOB_EAGER", "0") == "1"
+# Every QUIZ_JOB_HEARTBEAT_SECONDS a process marks its RUNNING jobs as alive and requeues lost ones
+# (0 disables the watchdog). Jobs of a dead process on the same host are requeued right away, those of
+# other hosts once they had no heartbeat or progress event for QUIZ_JOB_STALE_SECONDS. Each job is
+# requeued once; a starting worker pool also requeues all PENDING jobs.
+QUIZ_JOB_HEARTBEAT_SECONDS = int(os.getenv("QUIZ_JOB_HEARTBEAT_SECONDS", "60"))
+QUIZ_JOB_STALE_SECONDS = int(os.getenv("QUIZ_JOB_STALE_SECONDS", str(5 * 60)))
+# Maximum number of URLs accepted by one POST /api/createQuizzes/ request.
+QUIZ_BATCH_MAX_URLS = int(os.getenv("QUIZ_BATCH_MAX_URLS", "50"))
+# Server-sent progress events (GET /api/jobs/<id>/events/).
+QUIZ_EVENTS_POLL_SECONDS = float(os.getenv("QUIZ_EVENTS_POLL_SECONDS", "1"))
+QUIZ_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("QUIZ_EVENTS_HEARTBEAT_SECONDS", "15"))
+QUIZ_EVENTS_STREAM_TIMEOUT = int(os.getenv("QUIZ_EVENTS_STREAM_TIMEOUT", str(30 * 60)))
+# Open streams per process; each holds a server thread (keep it well below GUNICORN_THREADS).
+# Further clients get 503 and poll GET /api/jobs/<id>/ instead.
+QUIZ_EVENTS_MAX_STREAMS = int(os.getenv("QUIZ_EVENTS_MAX_STREAMS", "4"))
+
+# Whisper speech recognition
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+# CPU-only nodes: run Whisper with int8 dynamically quantized linear layers (faster, slightly
+# less accurate; compare with `manage.py benchmark_quantization`).
+WHISPER_QUANTIZE = os.getenv("WHISPER_QUANTIZE", "0") == "1"
+# Comma-separated models to load before serving: in gunicorn's master (`manage.py serve`) or by
+# runserver, never by other management commands (empty = load lazily on first use).
+WHISPER_WARMUP_MODELS = [m.strip() for m in os.getenv("WHISPER_WARMUP_MODELS", "").split(",") if m.strip()]
+# Parallel transcription of long recordings in a process pool (< 2 workers disables it). The pool is
+# shared by all model sizes; each of its processes keeps at most WHISPER_PARALLEL_MAX_MODELS loaded.
+WHISPER_PARALLEL_WORKERS = int(os.getenv("WHISPER_PARALLEL_WORKERS", "0"))
+WHISPER_PARALLEL_MAX_MODELS = int(os.getenv("WHISPER_PARALLEL_MAX_MODELS", "1"))
+WHISPER_PARALLEL_MIN_SECONDS = int(os.getenv("WHISPER_PARALLEL_MIN_SECONDS", "600"))
+WHISPER_PARALLEL_WINDOW_SECONDS = int(os.getenv("WHISPER_PARALLEL_WINDOW_SECONDS", "240"))
+WHISPER_PARALLEL_OVERLAP_SECONDS = int(os.getenv("WHISPER_PARALLEL_OVERLAP_SECONDS", "5"))
+# Pipelined mode: transcribe 30 s windows while the rest of the video is still downloading.
+WHISPER_PIPELINED = os.getenv("WHISPER_PIPELINED", "0") == "1"
+WHISPER_PIPELINE_WINDOW_SECONDS = int(os.getenv("WHISPER_PIPELINE_WINDOW_SECONDS", "30"))
+WHISPER_PIPELINE_OVERLAP_SECONDS = int(os.getenv("WHISPER_PIPELINE_OVERLAP_SECONDS", "2"))
+WHISPER_PIPELINE_QUEUE_WINDOWS = int(os.getenv("WHISPER_PIPELINE_QUEUE_WINDOWS", "4"))
+
+# ASR backend routing: WHISPER_MODEL is the default; short clips get the next larger enabled
+# model, long recordings and a busy job queue (active jobs) the next smaller one.
+ASR_BACKENDS = [b.strip() for b in os.getenv("ASR_BACKENDS", "tiny,base,small,tiny.en,base.en,small.en").split(",") if b.strip()]
+# Spoken language if known ("en" selects the English-only models); empty = detect per video.
+ASR_LANGUAGE = os.getenv("ASR_LANGUAGE", "")
+ASR_SHORT_CLIP_SECONDS = int(os.getenv("ASR_SHORT_CLIP_SECONDS", "300"))
+ASR_LONG_RECORDING_SECONDS = int(os.getenv("ASR_LONG_RECORDING_SECONDS", str(30 * 60)))
+ASR_BUSY_QUEUE_DEPTH = int(os.getenv("ASR_BUSY_QUEUE_DEPTH", "4"))
+
+# On-disk transcript cache (LRU, bounded by total size in bytes)
+TRANSCRIPT_CACHE_DIR = Path(os.getenv("TRANSCRIPT_CACHE_DIR", BASE_DIR / "quiz_app" / "transcript_cache"))
+TRANSCRIPT_CACHE_MAX_BYTES = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# Use YouTube captions (manual or automatic, in the spoken language) instead of Whisper when available.
+CAPTIONS_ENABLED = os.getenv("CAPTIONS_ENABLED", "1") == "1"
+CAPTION_MIN_CHARS = int(os.getenv("CAPTION_MIN_CHARS", "200"))
+
+# Metadata probe before anything is downloaded: rejects live streams, unavailable and too long
+# videos, and tells the pipeline the duration and whether captions exist. Cached per video id.
+VIDEO_PROBE_ENABLED = os.getenv("VIDEO_PROBE_ENABLED", "1") == "1"
+VIDEO_PROBE_TTL_SECONDS = int(os.getenv("VIDEO_PROBE_TTL_SECONDS", str(60 * 60)))
+VIDEO_PROBE_CACHE_SIZE = int(os.getenv("VIDEO_PROBE_CACHE_SIZE", "1024"))
+# Live and upcoming streams are probed again sooner: they become normal videos when they end.
+VIDEO_PROBE_LIVE_TTL_SECONDS = int(os.getenv("VIDEO_PROBE_LIVE_TTL_SECONDS", "60"))
+# Longest accepted video in seconds (0 = no limit).
+QUIZ_MAX_VIDEO_DURATION = int(os.getenv("QUIZ_MAX_VIDEO_DURATION", str(3 * 60 * 60)))
+
+# Per-job scratch directories for downloads (point SCRATCH_DIR at a tmpfs such as /dev/shm/quizly
+# to keep audio in memory). Jobs wait up to SCRATCH_WAIT_SECONDS while SCRATCH_QUOTA_BYTES is used
+# up; the janitor removes directories of crashed workers every SCRATCH_SWEEP_INTERVAL seconds
+# (those of other hosts once they are SCRATCH_ORPHAN_SECONDS old).
+SCRATCH_DIR = Path(os.getenv("SCRATCH_DIR", Path(tempfile.gettempdir()) / "quizly-scratch"))
+SCRATCH_QUOTA_BYTES = int(os.getenv("SCRATCH_QUOTA_BYTES", str(2 * 1024 * 1024 * 1024)))
+SCRATCH_WAIT_SECONDS = int(os.getenv("SCRATCH_WAIT_SECONDS", "600"))
+SCRATCH_SWEEP_INTERVAL = int(os.getenv("SCRATCH_SWEEP_INTERVAL", str(15 * 60)))
+SCRATCH_ORPHAN_SECONDS = int(os.getenv("SCRATCH_ORPHAN_SECONDS", str(6 * 60 * 60)))
+
+# Cross-process lock files that let concurrent requests for one video share a pipeline run.
+QUIZ_LOCK_DIR = Path(os.getenv("QUIZ_LOCK_DIR", Path(tempfile.gettempdir()) / "quizly-locks"))
+QUIZ_LOCK_TIMEOUT = int(os.getenv("QUIZ_LOCK_TIMEOUT", str(60 * 60)))
+
+# yt-dlp updates: checked at most once per TTL after a job, installed only while no job runs.
+YT_DLP_AUTO_UPDATE = os.getenv("YT_DLP_AUTO_UPDATE", "1") == "1"
+YT_DLP_UPDATE_CHECK_TTL = int(os.getenv("YT_DLP_UPDATE_CHECK_TTL", str(6 * 60 * 60)))
+YT_DLP_VERSION_STATE = Path(os.getenv("YT_DLP_VERSION_STATE", BASE_DIR / "quiz_app" / "yt_dlp_version.json"))
 
 # Application definition
 
@@ -141,6 +272,10 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'  # Sammlung aller statischen Dateien
 STATICFILES_DIRS = [
     BASE_DIR / 'static',  # z.B. für dein Frontend-Verzeichnis
 ]
+# With DEBUG off (`manage.py serve`) runserver's static handling is gone: the Docker image runs
+# collectstatic and Django serves STATIC_ROOT itself (admin CSS/JS). Set SERVE_STATIC=0 when a
+# reverse proxy serves STATIC_ROOT under STATIC_URL instead.
+SERVE_STATIC = os.getenv("SERVE_STATIC", "1") == "1"
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
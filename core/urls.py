@@ -1,9 +1,22 @@
+import re
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.contrib.staticfiles.urls import staticfiles_urlpatterns
+from django.views.static import serve
+
+
+def collected_static(request, path):
+    '''Serve files gathered by collectstatic (admin CSS/JS) when no proxy does; see SERVE_STATIC.'''
+    return serve(request, path, document_root=settings.STATIC_ROOT)
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('auth_app.api.urls')),
     path('api/', include('quiz_app.api.urls')),
 ] + staticfiles_urlpatterns ()
+
+if settings.SERVE_STATIC:
+    urlpatterns += [re_path(rf'^{re.escape(settings.STATIC_URL.lstrip("/"))}(?P<path>.*)$', collected_static)]
@@ -5,9 +5,9 @@ echo "-> Running migrations..."
 python manage.py migrate --noinput
 echo "-> Migrations complete."
 
-# If arguments are provided, run them (e.g. CMD override), otherwise start server
+# If arguments are provided, run them (e.g. CMD override), otherwise start the production server
 if [ "$#" -gt 0 ]; then
 	exec "$@"
 else
-	exec python manage.py runserver 0.0.0.0:8000
+	exec python manage.py serve
 fi
\ No newline at end of file
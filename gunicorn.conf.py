@@ -0,0 +1,50 @@
+# Production profile for gunicorn, used by `python manage.py serve`.
+# The app and the Whisper models in WHISPER_WARMUP_MODELS are loaded once in
+# the master (when_ready); forked workers share those pages copy-on-write.
+import gc
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+# Requests are mostly short DB reads; the pipeline itself runs on each worker's job pool.
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+worker_class = "gthread"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "60"))
+keepalive = 5
+preload_app = True
+accesslog = "-"
+
+
+def when_ready(server):
+    # Runs once in the master, after the app is loaded and before any worker is forked:
+    # the Whisper models (WHISPER_WARMUP_MODELS, set by `manage.py serve`) and the
+    # tokenizer (ships with the image, see Dockerfile) are loaded here and inherited.
+    from quiz_app.api.transcript_budget import load_encoding
+    from quiz_app.api.whisper_models import registry
+
+    registry.warm_up()
+    load_encoding(timeout=30)
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's reach: otherwise a
+    # worker's first GC run writes to every object header and copies the pages.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Never share the master's database sockets with a worker.
+    from django.db import connections
+
+    connections.close_all()
+
+    # Split the cores between the workers instead of every worker using all of them.
+    import torch
+
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // server.cfg.workers))
+
+    # Start the job pool right away: it requeues the jobs the previous workers left unfinished.
+    from quiz_app.api.jobs import get_executor
+
+    get_executor()
@@ -1,12 +1,13 @@
 from django.contrib import admin
-from .models import Quiz, Question
+from .models import Quiz, Question, QuizJob, QuizBatch
 
 @admin.register(Quiz)
 class QuizAdmin(admin.ModelAdmin):
     list_display = ('id', 'title', 'description', 'video_url', 'owner', 'created_at', 'updated_at')
     search_fields = ('title', 'description', 'owner__username', 'owner__email')
     list_filter = ('created_at', 'updated_at', 'owner')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'transcript_tokens', 'prompt_tokens', 'llm_latency_ms',
+                       'asr_backend', 'asr_real_time_factor')
 
     fields = (
         "title",
@@ -15,6 +16,11 @@ class QuizAdmin(admin.ModelAdmin):
         "owner",         
         "created_at",
         "updated_at",
+        "transcript_tokens",
+        "prompt_tokens",
+        "llm_latency_ms",
+        "asr_backend",
+        "asr_real_time_factor",
     )
 
     def save_model(self, request, obj, form, change):
@@ -27,4 +33,17 @@ class QuestionAdmin(admin.ModelAdmin):
     list_display = ('id', 'question_title', 'question_options', 'answer')
     search_fields = ('question_title',)
     list_filter = ('id', 'question_title')
-    readonly_fields = ('id',)
\ No newline at end of file
+    readonly_fields = ('id',)
+
+@admin.register(QuizJob)
+class QuizJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'video_url', 'owner', 'status', 'quiz', 'batch', 'created_at', 'finished_at')
+    search_fields = ('video_url', 'owner__username')
+    list_filter = ('status', 'created_at')
+    readonly_fields = ('id', 'created_at', 'updated_at', 'started_at', 'finished_at')
+
+@admin.register(QuizBatch)
+class QuizBatchAdmin(admin.ModelAdmin):
+    list_display = ('id', 'owner', 'created_at')
+    search_fields = ('owner__username',)
+    readonly_fields = ('id', 'created_at', 'rejected')
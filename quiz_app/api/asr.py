@@ -0,0 +1,99 @@
+import threading
+
+from django.conf import settings
+
+from . import utils
+
+# Per-request quality hints and how many model sizes they move away from WHISPER_MODEL.
+QUALITY_STEPS = {"fast": -1, "balanced": 0, "best": 1}
+
+
+class AsrBackend:
+    '''
+    Interface of a speech recognition backend. tier orders backends by
+    accuracy (and cost): a higher tier is more accurate and slower.
+    '''
+    name = ""
+    tier = 0
+    english_only = False
+
+    def transcribe(self, audio):
+        '''Return the text of a 16 kHz mono float32 buffer.'''
+        raise NotImplementedError
+
+    def transcribe_url(self, url, stats=None):
+        '''Return the text of a video while it is still downloading (pipelined mode).'''
+        raise NotImplementedError
+
+
+class WhisperBackend(AsrBackend):
+    '''One local Whisper model size, e.g. "base" or the English-only "base.en".'''
+
+    def __init__(self, model_name, tier):
+        self.name = model_name
+        self.tier = tier
+        self.english_only = model_name.endswith(".en")
+
+    def transcribe(self, audio):
+        return utils.transcript_audio(audio, model_name=self.name)
+
+    def transcribe_url(self, url, stats=None):
+        return utils.transcribe_stream(url, model_name=self.name, stats=stats)
+
+
+class AsrRegistry:
+    '''Known ASR backends and the policy that picks one per transcription.'''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._backends = {}
+
+    def register(self, backend):
+        with self._lock:
+            self._backends[backend.name] = backend
+        return backend
+
+    def get(self, name):
+        with self._lock:
+            return self._backends[name]
+
+    def enabled(self):
+        '''Return the backends enabled in ASR_BACKENDS, lowest tier first.'''
+        with self._lock:
+            backends = [self._backends[name] for name in settings.ASR_BACKENDS if name in self._backends]
+        return sorted(backends, key=lambda backend: backend.tier)
+
+    def route(self, duration=None, queue_depth=0, quality=None, language=None):
+        '''
+        Pick a backend. The starting point is WHISPER_MODEL, moved by the
+        quality hint; short clips move one size up, long recordings and a
+        busy job queue one size down each. English audio uses the .en
+        variants when they are enabled.
+        '''
+        backends = self.enabled()
+        if not backends:
+            raise LookupError("No ASR backend is enabled (ASR_BACKENDS).")
+        english = (language or settings.ASR_LANGUAGE) == "en"
+        candidates = [b for b in backends if b.english_only == english] or [b for b in backends if not b.english_only]
+        candidates = candidates or backends
+        tiers = sorted({backend.tier for backend in candidates})
+
+        default = self._backends.get(settings.WHISPER_MODEL)
+        default_tier = default.tier if default else tiers[0]
+        index = min(range(len(tiers)), key=lambda i: abs(tiers[i] - default_tier))
+
+        step = QUALITY_STEPS.get(quality or "balanced", 0)
+        if duration is not None and duration <= settings.ASR_SHORT_CLIP_SECONDS:
+            step += 1
+        if duration is not None and duration >= settings.ASR_LONG_RECORDING_SECONDS:
+            step -= 1
+        if queue_depth >= settings.ASR_BUSY_QUEUE_DEPTH:
+            step -= 1
+        tier = tiers[max(0, min(len(tiers) - 1, index + step))]
+        return next(backend for backend in candidates if backend.tier == tier)
+
+
+registry = AsrRegistry()
+for _tier, _size in enumerate(("tiny", "base", "small")):
+    registry.register(WhisperBackend(_size, _tier))
+    registry.register(WhisperBackend(f"{_size}.en", _tier))
@@ -0,0 +1,174 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from django.views import View
+
+from rest_framework import exceptions, status
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from auth_app.api.authentication import CookieJWTAuthentication
+from quiz_app.models import Quiz, QuizJob
+from .conditional import is_conditional, not_modified, quiz_detail_validators, quiz_list_validators, set_validators
+from .jobs import enqueue_quiz_job
+from .pagination import KeysetPagination
+from .permissions import IsOwnerOrReadOnly
+from .response_cache import get_quiz_read_cache
+from .serializers import CreateQuizSerializer, QuizJobSerializer, QuizReadSerializer
+from .views import quiz_list
+
+
+class AsyncAPIView(View):
+    '''
+    Native async counterpart of DRF's APIView (DRF itself is sync only): the
+    same authentication, permissions and error format, but the handlers run
+    on the event loop and only hop to a thread for blocking work.
+    '''
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, FormParser, MultiPartParser]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Token auth only, like APIView; csrf_exempt() would hide the coroutine in Django 4.2.
+        view.csrf_exempt = True
+        return view
+
+    def _initial(self, request):
+        '''Authenticate (may query the user table) and check the view permissions.'''
+        request.user  # evaluated here, in a thread, like APIView.perform_authentication()
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_permission(request, self):
+                self.permission_denied(request, permission)
+
+    def permission_denied(self, request, permission):
+        if request.authenticators and not request.successful_authenticator:
+            raise exceptions.NotAuthenticated()
+        raise exceptions.PermissionDenied(getattr(permission, "message", None))
+
+    def check_object_permissions(self, request, obj):
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_object_permission(request, self, obj):
+                self.permission_denied(request, permission)
+
+    def _error_response(self, request, exc):
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+        response = JsonResponse(data, status=exc.status_code, safe=False)
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            header = request.authenticators[0].authenticate_header(request) if request.authenticators else None
+            if header:
+                response["WWW-Authenticate"] = header
+            else:
+                response.status_code = status.HTTP_403_FORBIDDEN
+        return response
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(
+            request,
+            parsers=[parser() for parser in self.parser_classes],
+            authenticators=[auth() for auth in self.authentication_classes],
+        )
+        try:
+            handler = getattr(self, request.method.lower(), None)
+            if request.method.lower() not in self.http_method_names or handler is None:
+                raise exceptions.MethodNotAllowed(request.method)
+            await sync_to_async(self._initial)(request)
+            return await handler(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self._error_response(request, exc)
+
+
+class AsyncCreateQuizView(AsyncAPIView):
+    '''Async version of CreateQuizView: queues the job without holding a thread.'''
+    authentication_classes = [CookieJWTAuthentication, JWTAuthentication]
+
+    async def post(self, request):
+        serializer = CreateQuizSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        job = await QuizJob.objects.acreate(
+            owner=request.user,
+            video_url=serializer.validated_data["url"],
+            quality=serializer.validated_data.get("quality", ""),
+        )
+        # Normally only a hand-over to the worker pool; in eager mode this
+        # runs the whole download/transcribe/LLM pipeline in a thread.
+        await sync_to_async(enqueue_quiz_job)(job)
+        job = await QuizJob.objects.select_related("quiz").prefetch_related("quiz__questions").aget(pk=job.pk)
+
+        response = JsonResponse(QuizJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+        response["Location"] = reverse("quiz-job-detail", kwargs={"id": job.pk})
+        return response
+
+
+class AsyncQuizListView(AsyncAPIView):
+    '''Async version of QuizListView.'''
+
+    async def get(self, request):
+        validators = None
+        if is_conditional(request):
+            validators = await sync_to_async(quiz_list_validators)(request)
+            response = not_modified(request, *validators)
+            if response is not None:
+                return response
+        reads = get_quiz_read_cache()
+        key, entry = await sync_to_async(reads.list_entry)(
+            request.user.pk, sorted(request.query_params.lists()), request.headers.get("Accept", ""),
+        )
+        if entry is None or (validators and entry["headers"].get("ETag") != validators[0]):
+            validators = validators or await sync_to_async(quiz_list_validators)(request)
+            paginator = KeysetPagination()
+            queryset, serializer_class = quiz_list(request)
+            quizzes = await sync_to_async(paginator.paginate_queryset)(queryset, request, self)
+            headers = set_validators(paginator.get_headers(), *validators)
+            entry = {"data": serializer_class(quizzes, many=True).data, "headers": headers}
+            await sync_to_async(reads.store)(key, entry["data"], entry["headers"])
+        return JsonResponse(entry["data"], safe=False, headers=entry["headers"])
+
+
+class AsyncQuizDetailView(AsyncAPIView):
+    '''Async version of QuizDetailView (retrieve, partial update, delete).'''
+    permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+
+    async def get_object(self, request, id):
+        try:
+            quiz = await Quiz.objects.filter(owner=request.user).prefetch_related("questions").aget(pk=id)
+        except Quiz.DoesNotExist:
+            raise exceptions.NotFound()
+        self.check_object_permissions(request, quiz)
+        return quiz
+
+    async def get(self, request, id):
+        validators = None
+        if is_conditional(request):
+            validators = await sync_to_async(quiz_detail_validators)(request, id)
+            response = not_modified(request, *validators)
+            if response is not None:
+                return response
+        reads = get_quiz_read_cache()
+        key, entry = await sync_to_async(reads.quiz_entry)(request.user.pk, id, request.headers.get("Accept", ""))
+        if entry is None or (validators and entry["headers"].get("ETag") != validators[0]):
+            validators = validators or await sync_to_async(quiz_detail_validators)(request, id)
+            quiz = await self.get_object(request, id)
+            entry = {"data": QuizReadSerializer(quiz).data, "headers": set_validators({}, *validators)}
+            await sync_to_async(reads.store)(key, entry["data"], entry["headers"])
+        return JsonResponse(entry["data"], headers=entry["headers"])
+
+    async def patch(self, request, id):
+        quiz = await self.get_object(request, id)
+        serializer = QuizReadSerializer(quiz, data=request.data, partial=True)
+        # Model validators (unique video_url) query the database.
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await sync_to_async(serializer.save)()
+        return JsonResponse(QuizReadSerializer(quiz).data)
+
+    put = patch
+
+    async def delete(self, request, id):
+        quiz = await self.get_object(request, id)
+        await quiz.adelete()
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,168 @@
+# Parallel transcription of long recordings: the decoded audio is cut into
+# overlapping windows that are transcribed in a process pool whose workers keep
+# their Whisper models loaded. Must stay importable without Django because the
+# workers are started with the "spawn" method.
+import gc
+import multiprocessing
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import whisper
+
+from .quantization import quantize_model
+
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+
+# Models loaded in a worker process by name, least recently used first.
+_worker_models = OrderedDict()
+_worker_options = {}
+_worker_quantized = False
+_worker_max_models = 1
+
+
+def _init_worker(model_name, options, torch_threads, quantized=False, max_models=1):
+    '''Pool initializer: load the default Whisper model (int8 if quantized) once per worker process.'''
+    global _worker_options, _worker_quantized, _worker_max_models
+    import torch
+
+    torch.set_num_threads(torch_threads)
+    _worker_options = dict(options)
+    _worker_quantized = quantized
+    _worker_max_models = max(1, max_models)
+    _worker_model(model_name)
+
+
+def _worker_model(model_name):
+    '''Return the worker's copy of model_name, loading it and dropping the least recently used beyond the limit.'''
+    if model_name in _worker_models:
+        _worker_models.move_to_end(model_name)
+        return _worker_models[model_name]
+    while len(_worker_models) >= _worker_max_models:
+        _worker_models.popitem(last=False)
+        gc.collect()
+    model = whisper.load_model(model_name)
+    _worker_models[model_name] = quantize_model(model) if _worker_quantized else model
+    return _worker_models[model_name]
+
+
+def _transcribe_window(model_name, start_sample, audio):
+    '''Transcribe one window and shift its segment timestamps to the full recording.'''
+    result = _worker_model(model_name).transcribe(audio, **_worker_options)
+    offset = start_sample / SAMPLE_RATE
+    return [
+        {"start": seg["start"] + offset, "end": seg["end"] + offset, "text": seg["text"]}
+        for seg in result.get("segments", [])
+    ]
+
+
+def split_windows(audio, window_seconds, overlap_seconds):
+    '''Return (start_sample, samples) windows of window_seconds that overlap by overlap_seconds.'''
+    window = int(window_seconds * SAMPLE_RATE)
+    step = window - int(overlap_seconds * SAMPLE_RATE)
+    if step <= 0:
+        raise ValueError("overlap_seconds must be smaller than window_seconds")
+    windows = []
+    start = 0
+    while True:
+        windows.append((start, audio[start:start + window]))
+        if start + window >= len(audio):
+            return windows
+        start += step
+
+
+def _normalize(text):
+    return re.sub(r"\W+", " ", text).strip().lower()
+
+
+def stitch_segments(window_results, overlap_seconds):
+    '''
+    Merge the segments of consecutive windows. Inside an overlap each
+    segment is kept only by the window that owns its midpoint (the first
+    half of the overlap belongs to the earlier window), and a segment that
+    repeats the text of the previous one is dropped.
+    '''
+    half = overlap_seconds / 2
+    merged = []
+    for i, (start_sample, length, segments) in enumerate(window_results):
+        window_start = start_sample / SAMPLE_RATE
+        window_end = (start_sample + length) / SAMPLE_RATE
+        owned_from = window_start + half if i > 0 else float("-inf")
+        owned_to = window_end - half if i < len(window_results) - 1 else float("inf")
+        for seg in segments:
+            midpoint = (seg["start"] + seg["end"]) / 2
+            if not owned_from <= midpoint < owned_to:
+                continue
+            if merged and _normalize(merged[-1]["text"]) == _normalize(seg["text"]):
+                continue
+            merged.append(seg)
+    return merged
+
+
+class ChunkedTranscriber:
+    '''
+    Transcribes audio in overlapping windows on a pool of preloaded worker
+    processes. Every model size shares the one pool: each window names its
+    model and a worker keeps at most max_models of them loaded, so the
+    process count stays at workers whatever the routing picks.
+    '''
+
+    def __init__(self, model_name, workers, window_seconds=240, overlap_seconds=5, options=None, executor=None,
+                 quantized=False, max_models=1):
+        self.model_name = model_name
+        self.quantized = quantized
+        self.max_models = max_models
+        self.workers = workers
+        self.window_seconds = window_seconds
+        self.overlap_seconds = overlap_seconds
+        self.options = dict(options or {})
+        self._executor = executor
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, self.options, torch_threads, self.quantized, self.max_models),
+                )
+            return self._executor
+
+    def warm_up(self):
+        '''Start all worker processes so their models are loaded before the first real job.'''
+        silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        executor = self._get_executor()
+        for future in [executor.submit(_transcribe_window, self.model_name, 0, silence) for _ in range(self.workers)]:
+            future.result()
+
+    def transcribe(self, audio, on_window_done=None, model_name=None):
+        '''Return {"text", "segments"} like Whisper's transcribe() for the whole recording (default model: model_name).'''
+        model_name = model_name or self.model_name
+        windows = split_windows(audio, self.window_seconds, self.overlap_seconds)
+        executor = self._get_executor()
+        futures = [executor.submit(_transcribe_window, model_name, start, chunk) for start, chunk in windows]
+        results = []
+        try:
+            for index, ((start, chunk), future) in enumerate(zip(windows, futures), start=1):
+                results.append((start, len(chunk), future.result()))
+                if on_window_done:
+                    on_window_done(index, len(windows))
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool next time.
+            self.shutdown()
+            raise
+        segments = stitch_segments(results, self.overlap_seconds)
+        return {"text": "".join(seg["text"] for seg in segments).strip(), "segments": segments}
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,96 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from quiz_app.models import Quiz
+
+from .pagination import KeysetPagination
+
+
+def _change_state(quizzes):
+    '''
+    Everything a quiz response is built from, in one aggregate query: any
+    created, edited or deleted quiz or question changes one of these values.
+    '''
+    return quizzes.aggregate(
+        quiz_total=Count('id', distinct=True),
+        quiz_changed=Max('updated_at'),
+        question_total=Count('questions'),
+        question_changed=Max('questions__updated_at'),
+        last_question=Max('questions__id'),
+    )
+
+
+def _page_state(request):
+    '''
+    Change state of the requested list page only, in one query bounded by
+    the page size: id, updated_at and question state of each quiz in the
+    page's keyset range, plus the row after it (whether a next page exists).
+    '''
+    rows = KeysetPagination().seek(Quiz.objects.filter(owner=request.user), request).annotate(
+        question_total=Count('questions'),
+        question_changed=Max('questions__updated_at'),
+        last_question=Max('questions__id'),
+    ).values_list('id', 'updated_at', 'question_total', 'question_changed', 'last_question')
+    return {"rows": list(rows)}
+
+
+def _etag(request, state, *parts):
+    '''Strong ETag of one representation: the change state plus what selects the representation.'''
+    raw = repr((request.user.pk, request.headers.get("Accept", ""), *parts, sorted(state.items())))
+    return quote_etag(hashlib.sha1(raw.encode("utf-8")).hexdigest())
+
+
+def quiz_list_validators(request):
+    '''
+    Return (ETag, Last-Modified) of the requesting user's quiz list. The ETag
+    covers the requested page (not the whole account, so it costs the same
+    for any number of quizzes) and the query string (cursor, page_size,
+    expand). There is no Last-Modified: a deleted quiz leaves no newer
+    timestamp behind, so If-Modified-Since could not see it.
+    '''
+    if not hasattr(request, "_quiz_validators"):
+        state = _page_state(request)
+        query = sorted(request.query_params.lists())
+        request._quiz_validators = (_etag(request, state, query), None)
+    return request._quiz_validators
+
+
+def quiz_detail_validators(request, id):
+    '''
+    Return (ETag, Last-Modified) of one quiz of the requesting user, or
+    (None, None) if it is not theirs (the view answers that with a 404).
+    '''
+    if not hasattr(request, "_quiz_validators"):
+        state = _change_state(Quiz.objects.filter(pk=id, owner=request.user))
+        if not state["quiz_total"]:
+            request._quiz_validators = (None, None)
+        else:
+            last_modified = max(filter(None, (state["quiz_changed"], state["question_changed"])))
+            request._quiz_validators = (_etag(request, state, id), last_modified)
+    return request._quiz_validators
+
+
+def is_conditional(request):
+    '''
+    True if the request carries If-None-Match or If-Modified-Since. Only
+    those compute the validators up front; other reads are answered from
+    the response cache, which stores the validators with the payload.
+    '''
+    return "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
+
+
+def not_modified(request, etag, last_modified=None):
+    '''The 304 response for a conditional GET that matches, or None.'''
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag, last_modified=None):
+    if etag:
+        response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
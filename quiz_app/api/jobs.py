@@ -0,0 +1,281 @@
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework import serializers
+
+from quiz_app.models import QuizJob
+from . import progress
+from .scratch import _pid_alive, start_janitor
+from .serializers import CreateQuizSerializer, QuizReadSerializer
+from .ytdlp_version import get_version_manager
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Tracks running jobs so maintenance work (yt-dlp updates) only runs while the pool is idle.
+_pool_state = threading.Condition()
+_active_jobs = 0
+_maintenance = False
+
+
+def get_executor():
+    '''Return the process-wide worker pool, creating it on first use.'''
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.QUIZ_JOB_WORKERS,
+                thread_name_prefix="quiz-job",
+            )
+            # Processes that run jobs also clean up after crashed ones.
+            start_janitor()
+            executor = _executor
+            submit = lambda job_id: executor.submit(_run_in_worker, job_id)
+            recover_jobs(submit)
+            start_watchdog(submit)
+        return _executor
+
+
+def _process_started(pid):
+    '''Start time of process pid (clock ticks since boot, Linux only), None if unknown; tells a reused pid apart.'''
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as fh:
+            return int(fh.read().rsplit(")", 1)[1].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def worker_identity():
+    '''The process as recorded on the jobs it runs, like the owner file of a scratch directory.'''
+    pid = os.getpid()
+    return {"host": socket.gethostname(), "pid": pid, "started": _process_started(pid)}
+
+
+def _worker_gone(worker):
+    '''True if worker was a process on this host that no longer runs (exited, or its pid was reused).'''
+    if not worker or worker.get("host") != socket.gethostname() or not worker.get("pid"):
+        return False
+    if not _pid_alive(worker["pid"]):
+        return True
+    return worker.get("started") is not None and worker["started"] != _process_started(worker["pid"])
+
+
+def requeue_lost_jobs():
+    '''
+    Put RUNNING jobs whose process is gone back to PENDING: right away if it
+    ran on this host (see QuizJob.worker), otherwise once the job had no
+    heartbeat or progress event for QUIZ_JOB_STALE_SECONDS. A job that was
+    already requeued once fails instead, so a job that kills its process
+    cannot loop. Returns the ids of the requeued jobs.
+    '''
+    cutoff = timezone.now() - timedelta(seconds=settings.QUIZ_JOB_STALE_SECONDS)
+    running = QuizJob.objects.filter(status=QuizJob.Status.RUNNING).annotate(last_event=Max("events__created_at"))
+    requeued = []
+    for job in running:
+        stale = job.updated_at < cutoff and (job.last_event is None or job.last_event < cutoff)
+        if not stale and not _worker_gone(job.worker):
+            continue
+        with progress.reporting(job):
+            if job.events.filter(type="job.requeued").exists():
+                _fail_job(job, {"detail": "Der Job wurde wiederholt durch einen Neustart abgebrochen."})
+                continue
+            # Only if no other process touched the job since it was read.
+            reset = QuizJob.objects.filter(pk=job.pk, status=QuizJob.Status.RUNNING, updated_at=job.updated_at).update(
+                status=QuizJob.Status.PENDING, started_at=None, worker=None, updated_at=timezone.now(),
+            )
+            if reset:
+                progress.emit("job.requeued")
+                requeued.append(job.pk)
+    return requeued
+
+
+def recover_jobs(submit):
+    '''
+    Pick up the jobs a previous process left behind (restart, deploy, worker
+    recycle): lost RUNNING jobs go back to PENDING (requeue_lost_jobs), then
+    every PENDING job is passed to submit. Returns the submitted ids.
+    '''
+    try:
+        requeue_lost_jobs()
+        pending = list(
+            QuizJob.objects.filter(status=QuizJob.Status.PENDING).order_by("created_at").values_list("pk", flat=True)
+        )
+    except DatabaseError as exc:
+        print(f"-> Could not recover unfinished quiz jobs: {exc}")
+        return []
+    if pending:
+        print(f"-> Requeueing {len(pending)} unfinished quiz job(s).")
+    for job_id in pending:
+        submit(job_id)
+    return pending
+
+
+def watch_jobs(submit):
+    '''
+    One watchdog round: refresh updated_at of the jobs this process runs
+    (the heartbeat that keeps them from looking stale), then requeue and
+    submit the jobs other processes lost. Returns the submitted ids.
+    '''
+    me = worker_identity()
+    try:
+        QuizJob.objects.filter(
+            status=QuizJob.Status.RUNNING, worker__host=me["host"], worker__pid=me["pid"], worker__started=me["started"],
+        ).update(updated_at=timezone.now())
+        requeued = requeue_lost_jobs()
+    except DatabaseError as exc:
+        print(f"-> Quiz job watchdog failed: {exc}")
+        return []
+    if requeued:
+        print(f"-> Requeueing {len(requeued)} lost quiz job(s).")
+    for job_id in requeued:
+        submit(job_id)
+    return requeued
+
+
+_watchdog = None
+
+
+def start_watchdog(submit):
+    '''Run watch_jobs every QUIZ_JOB_HEARTBEAT_SECONDS in a daemon thread.'''
+    global _watchdog
+    if _watchdog is not None or settings.QUIZ_JOB_HEARTBEAT_SECONDS <= 0:
+        return _watchdog
+
+    def run():
+        while True:
+            time.sleep(settings.QUIZ_JOB_HEARTBEAT_SECONDS)
+            try:
+                watch_jobs(submit)
+            except Exception as exc:
+                print(f"-> Quiz job watchdog failed: {exc}")
+            finally:
+                close_old_connections()
+
+    _watchdog = threading.Thread(target=run, name="quiz-job-watchdog", daemon=True)
+    _watchdog.start()
+    return _watchdog
+
+
+def enqueue_quiz_job(job):
+    '''Schedule a QuizJob on the worker pool (or run it inline in eager mode).'''
+    if settings.QUIZ_JOB_EAGER:
+        run_quiz_job(job.pk)
+        return None
+    print(f"-> Queueing quiz job {job.pk} for {job.video_url}")
+    return get_executor().submit(_run_in_worker, job.pk)
+
+
+@contextmanager
+def _job_slot():
+    '''Mark a job as running; waits while maintenance work is in progress.'''
+    global _active_jobs
+    with _pool_state:
+        while _maintenance:
+            _pool_state.wait()
+        _active_jobs += 1
+    try:
+        yield
+    finally:
+        with _pool_state:
+            _active_jobs -= 1
+            _pool_state.notify_all()
+
+
+def run_between_jobs(fn):
+    '''Run fn only if no job is running; jobs that start meanwhile wait for it.'''
+    global _maintenance
+    with _pool_state:
+        if _active_jobs or _maintenance:
+            return False
+        _maintenance = True
+    try:
+        fn()
+    finally:
+        with _pool_state:
+            _maintenance = False
+            _pool_state.notify_all()
+    return True
+
+
+def refresh_yt_dlp():
+    '''Re-check yt-dlp once the cached result expired and install updates while the pool is idle.'''
+    if not settings.YT_DLP_AUTO_UPDATE:
+        return
+    manager = get_version_manager()
+    try:
+        state = manager.check()
+        if manager.should_update(state):
+            run_between_jobs(manager.apply_update)
+    except Exception as exc:
+        print(f"-> yt-dlp version maintenance failed: {exc}")
+
+
+def _run_in_worker(job_id):
+    '''Entry point for pool threads: run the job and release the DB connection.'''
+    close_old_connections()
+    try:
+        with _job_slot():
+            run_quiz_job(job_id)
+        refresh_yt_dlp()
+    finally:
+        close_old_connections()
+
+
+def _finish_job(job, status, quiz=None, error=None):
+    '''Persist the final state of a job.'''
+    job.status = status
+    job.quiz = quiz
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "quiz", "error", "finished_at", "updated_at"])
+
+
+def _fail_job(job, error):
+    progress.emit("job.failed", error=error)
+    _finish_job(job, QuizJob.Status.FAILED, error=error)
+
+
+def run_quiz_job(job_id):
+    '''Run the CreateQuizSerializer pipeline for a pending job and store the outcome.'''
+    claimed = QuizJob.objects.filter(pk=job_id, status=QuizJob.Status.PENDING).update(
+        status=QuizJob.Status.RUNNING,
+        started_at=timezone.now(),
+        updated_at=timezone.now(),
+        worker=worker_identity(),
+    )
+    if not claimed:
+        print(f"-> Quiz job {job_id} is not pending anymore, skipping.")
+        return None
+
+    job = QuizJob.objects.select_related("owner").get(pk=job_id)
+    print(f"-> Running quiz job {job.pk} for {job.video_url}")
+    data = {"url": job.video_url}
+    if job.quality:
+        data["quality"] = job.quality
+    serializer = CreateQuizSerializer(data=data, context={"user": job.owner})
+    with progress.reporting(job):
+        progress.emit("job.started", video_url=job.video_url)
+        try:
+            serializer.is_valid(raise_exception=True)
+            quiz = serializer.save()
+        except serializers.ValidationError as exc:
+            _fail_job(job, serializers.as_serializer_error(exc))
+        except Exception as exc:
+            print(f"-> Quiz job {job.pk} failed: {exc}")
+            _fail_job(job, {"detail": str(exc)})
+        else:
+            # The final event is stored before the job is marked finished,
+            # so an event stream that sees the finished job has all events.
+            progress.emit("quiz.completed", quiz=QuizReadSerializer(quiz).data)
+            _finish_job(job, QuizJob.Status.SUCCEEDED, quiz=quiz)
+    print(f"-> Quiz job {job.pk} finished with status '{job.status}'.")
+    return job
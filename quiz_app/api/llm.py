@@ -0,0 +1,229 @@
+import asyncio
+import json
+import threading
+import weakref
+
+import httpx
+from django.conf import settings
+from google import genai
+from google.genai import types
+from pydantic import BaseModel, Field
+
+from . import metrics
+
+
+class QuizGenerationError(ValueError):
+    '''The model's answer could not be turned into quiz JSON.'''
+
+
+# Response schemas: Gemini constrains its JSON output to these shapes.
+class QuestionSchema(BaseModel):
+    question_title: str
+    question_options: list[str] = Field(min_length=4, max_length=4)
+    answer: str
+
+
+class QuestionListSchema(BaseModel):
+    questions: list[QuestionSchema]
+
+
+class QuizSummarySchema(BaseModel):
+    title: str
+    description: str
+
+
+class QuizSchema(BaseModel):
+    title: str
+    description: str
+    questions: list[QuestionSchema] = Field(min_length=10, max_length=10)
+
+
+def build_quiz_prompt(transcription: str) -> str:
+    '''Build the prompt for the GenAI model to generate a quiz.'''
+    return (
+        "Based on the following transcript, generate exactly one JSON object and nothing else.\n\n"
+        f"Transcript:\n{transcription}\n\n"
+        "Return valid JSON only, without markdown, code fences, comments, or explanatory text.\n"
+        "The output must be parseable directly with json.loads() in Python.\n\n"
+        "The quiz must follow this exact JSON structure:\n\n"
+        "{\n"
+        '  "title": "Create a concise quiz title based on the topic of the transcript.",\n'
+        '  "description": "Summarize the transcript in no more than 150 characters. Do not include any quiz questions or answers.",\n'
+        '  "questions": [\n'
+        "    {\n"
+        '      "question_title": "The question goes here.",\n'
+        '      "question_options": ["Option A", "Option B", "Option C", "Option D"],\n'
+        '      "answer": "The correct answer from the above options"\n'
+        "    },\n"
+        "    ...\n"
+        "    (exactly 10 questions)\n"
+        "  ]\n"
+        "}\n\n"
+        "Rules:\n"
+        "- Output only valid JSON. Do not add any text before or after the JSON object.\n"
+        "- Do not use markdown formatting, backticks, or explanatory text.\n"
+        "- Generate exactly 10 questions.\n"
+        "- Each question must have exactly 4 distinct answer options.\n"
+        "- Only one correct answer is allowed per question, and it must be one of the options.\n"
+        "- Do not include any additional fields beyond title, description, and questions.\n"
+        "- Do not pluralize or change the field names. Use exactly the keys shown above.\n"
+    )
+
+
+def parse_quiz_json(raw):
+    '''Parse the model output, tolerating trailing content after the JSON object.'''
+    if not isinstance(raw, str):
+        raise QuizGenerationError("Generated content is empty")
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        print("-> Failed to parse generated content as JSON.")
+        print("-> Raw generated content:\n" + raw[:2000])
+    try:
+        quiz_json, _ = json.JSONDecoder().raw_decode(raw.strip())
+    except json.JSONDecodeError:
+        raise QuizGenerationError("Generated content is not valid JSON")
+    print("-> Parsed JSON prefix despite trailing content.")
+    return quiz_json
+
+
+def question_error(question):
+    '''Return why a generated question is unusable, or None if it is fine.'''
+    if not isinstance(question, dict):
+        return "muss ein Objekt mit 'question_title', 'question_options' und 'answer' sein."
+    q_title = question.get("question_title")
+    opts = question.get("question_options")
+    ans = question.get("answer")
+
+    if not isinstance(q_title, str) or not q_title.strip():
+        return "'question_title' fehlt oder ist leer."
+    if not isinstance(opts, list) or len(opts) != 4:
+        return "'question_options' muss eine Liste mit exakt 4 Einträgen sein."
+    try:
+        distinct = len(set(opts))
+    except TypeError:
+        return "'question_options' darf nur Texte enthalten."
+    if distinct != 4:
+        return "'question_options' enthält Duplikate."
+    if ans not in opts:
+        return "'answer' muss eine der Optionen sein."
+    return None
+
+
+def _response_text(response):
+    if hasattr(response, 'text'):
+        return response.text
+    return getattr(response, 'content', None)
+
+
+class QuizLLM:
+    '''
+    Long-lived Gemini client. The underlying httpx clients keep their
+    connections alive, so only the first call per connection pays for DNS,
+    TCP and TLS setup. Async connections belong to one event loop, so every
+    loop gets its own client.
+    '''
+
+    generation_config = {
+        "response_mime_type": "application/json",
+        "temperature": 0.0,
+    }
+
+    def __init__(self, model, api_key=None, base_url=None, timeout_seconds=120, max_connections=10):
+        self.model = model
+        self.base_url = base_url or None
+        self.config = (model, api_key, self.base_url, timeout_seconds, max_connections)
+        self.client = self._make_client()
+        self._async_clients = weakref.WeakKeyDictionary()  # event loop -> genai.Client
+        self._async_lock = threading.Lock()
+
+    def _make_client(self):
+        _, api_key, base_url, timeout_seconds, max_connections = self.config
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        return genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                base_url=base_url,
+                timeout=int(timeout_seconds * 1000),
+                client_args={"limits": limits},
+                async_client_args={"limits": limits},
+            ),
+        )
+
+    def _async_client(self):
+        '''Return the async client of the running event loop.'''
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = self._async_clients[loop] = self._make_client()
+        return client.aio
+
+    def complete(self, prompt, **config):
+        '''Send one prompt and return the raw text of the answer.'''
+        with metrics.timer("llm.generate"):
+            response = self.client.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config={**self.generation_config, **config},
+            )
+        return _response_text(response)
+
+    async def acomplete(self, prompt, **config):
+        '''Async variant of complete() for use from an event loop.'''
+        with metrics.timer("llm.generate"):
+            response = await self._async_client().models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config={**self.generation_config, **config},
+            )
+        return _response_text(response)
+
+    def generate_quiz_sync(self, transcript):
+        '''Generate quiz JSON for a transcript, blocking the calling thread.'''
+        return parse_quiz_json(self.complete(build_quiz_prompt(transcript), response_schema=QuizSchema))
+
+    async def generate_quiz(self, transcript):
+        '''Generate quiz JSON for a transcript without blocking the event loop.'''
+        return parse_quiz_json(await self.acomplete(build_quiz_prompt(transcript), response_schema=QuizSchema))
+
+    def close(self):
+        '''Close the sync connections and the async ones of every loop that still runs.'''
+        self.client.close()
+        with self._async_lock:
+            clients = list(self._async_clients.items())
+            self._async_clients.clear()
+        for loop, client in clients:
+            client.close()
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aio.aclose(), loop)
+
+
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def get_llm():
+    '''Return the process-wide Gemini client configured in settings.'''
+    global _llm
+    with _llm_lock:
+        config = (
+            settings.GEMINI_MODEL,
+            settings.GEMINI_API_KEY,
+            settings.GEMINI_BASE_URL or None,
+            settings.GEMINI_TIMEOUT_SECONDS,
+            settings.GEMINI_MAX_CONNECTIONS,
+        )
+        if _llm is None or _llm.config != config:
+            previous, _llm = _llm, QuizLLM(*config)
+            if previous is not None:
+                previous.close()
+        return _llm
+
+
+async def generate_quiz(transcript):
+    '''Generate quiz JSON for a transcript with the shared client (for ASGI code).'''
+    return await get_llm().generate_quiz(transcript)
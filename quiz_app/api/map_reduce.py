@@ -0,0 +1,142 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+from .llm import QuestionListSchema, QuizGenerationError, QuizSummarySchema, parse_quiz_json, question_error
+from .transcript_budget import count_tokens, split_sentences
+
+
+def split_sections(text, section_tokens):
+    '''Cut text at sentence boundaries into sections of about section_tokens tokens.'''
+    sections = []
+    current = []
+    used = 0
+    for sentence in split_sentences(text):
+        tokens = count_tokens(" " + sentence)
+        if current and used + tokens > section_tokens:
+            sections.append(" ".join(current))
+            current, used = [], 0
+        current.append(sentence)
+        used += tokens
+    if current:
+        sections.append(" ".join(current))
+    return sections
+
+
+def build_section_prompt(section, index, total, count):
+    '''Prompt for the map step: candidate questions for one section of the transcript.'''
+    return (
+        f"The following is section {index} of {total} of a video transcript.\n\n"
+        f"Section:\n{section}\n\n"
+        f"Write {count} multiple-choice quiz questions that can be answered from this section alone.\n"
+        "Return valid JSON only, without markdown, code fences, comments, or explanatory text:\n\n"
+        "{\n"
+        '  "questions": [\n'
+        "    {\n"
+        '      "question_title": "The question goes here.",\n'
+        '      "question_options": ["Option A", "Option B", "Option C", "Option D"],\n'
+        '      "answer": "The correct answer from the above options"\n'
+        "    }\n"
+        "  ]\n"
+        "}\n\n"
+        "Rules:\n"
+        "- Each question must have exactly 4 distinct answer options.\n"
+        "- Only one correct answer is allowed per question, and it must be one of the options.\n"
+        "- Do not ask about details that need other parts of the video.\n"
+    )
+
+
+def build_summary_prompt(questions):
+    '''Prompt for the reduce step: title and description for the selected questions.'''
+    listing = "\n".join(f"- {q['question_title'].strip()}" for q in questions)
+    return (
+        "These quiz questions were generated from the transcript of one video:\n\n"
+        f"{listing}\n\n"
+        "Return valid JSON only, without markdown or explanatory text:\n\n"
+        "{\n"
+        '  "title": "Create a concise quiz title based on the topic of the video.",\n'
+        '  "description": "Summarize the video in no more than 150 characters. Do not include any quiz questions or answers."\n'
+        "}\n"
+    )
+
+
+def _question_key(question):
+    return re.sub(r"\W+", " ", question["question_title"]).strip().lower()
+
+
+def select_questions(candidates_per_section, count):
+    '''
+    Pick up to count valid questions with distinct titles, taking them from
+    the sections in turn so that the whole video is covered.
+    '''
+    pools = [
+        [q for q in candidates if question_error(q) is None]
+        for candidates in candidates_per_section
+    ]
+    selected = []
+    seen = set()
+    while len(selected) < count and any(pools):
+        for pool in pools:
+            while pool:
+                question = pool.pop(0)
+                key = _question_key(question)
+                if key not in seen:
+                    seen.add(key)
+                    selected.append(question)
+                    break
+            if len(selected) == count:
+                break
+    return selected
+
+
+def generate_quiz_map_reduce(llm, transcript, section_tokens, concurrency, question_count=10):
+    '''
+    Generate quiz JSON for a long transcript: candidate questions for every
+    section are requested concurrently (at most concurrency calls at once),
+    then question_count of them are selected and the title and description
+    are written in one more call. Returns (quiz_json, stats).
+    '''
+    sections = split_sections(transcript, section_tokens)
+    # Ask for a few spare questions so invalid or duplicate ones can be skipped.
+    per_section = max(3, -(-question_count // len(sections)) + 1)
+    prompts = [
+        build_section_prompt(section, index, len(sections), per_section)
+        for index, section in enumerate(sections, start=1)
+    ]
+    print(f"-> Generating questions for {len(sections)} transcript sections...")
+
+    def map_section(prompt):
+        try:
+            return parse_quiz_json(llm.complete(prompt, response_schema=QuestionListSchema)).get("questions") or []
+        except Exception as exc:
+            # One failed section must not sink the others; the reduce step
+            # notices if too few questions are left.
+            print(f"-> Section generation failed: {exc}")
+            metrics.increment("llm.map_reduce.failed_sections")
+            return []
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="quiz-map") as executor:
+        candidates = list(executor.map(map_section, prompts))
+
+    questions = select_questions(candidates, question_count)
+    summary = {}
+    if questions:
+        summary_prompt = build_summary_prompt(questions)
+        prompts.append(summary_prompt)
+        try:
+            summary = parse_quiz_json(llm.complete(summary_prompt, response_schema=QuizSummarySchema))
+        except QuizGenerationError:
+            # Left empty; the repair step asks for the title again.
+            print("-> Summary generation failed.")
+    metrics.increment("llm.map_reduce.runs")
+
+    quiz_json = {
+        "title": summary.get("title") if isinstance(summary, dict) else None,
+        "description": summary.get("description", "") if isinstance(summary, dict) else "",
+        "questions": questions,
+    }
+    stats = {
+        "sections": len(sections),
+        "prompt_tokens": sum(count_tokens(prompt) for prompt in prompts),
+    }
+    return quiz_json, stats
@@ -0,0 +1,86 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Simple in-process metrics. Values are per worker process and reset on restart.
+_lock = threading.Lock()
+_counters = {}
+_timings = {}
+_gauges = {}
+
+
+def increment(name, value=1):
+    '''Increase a counter by value.'''
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name, seconds):
+    '''Record one duration sample (in seconds) for a timing.'''
+    with _lock:
+        timing = _timings.setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+        timing["count"] += 1
+        timing["total_seconds"] += seconds
+        timing["max_seconds"] = max(timing["max_seconds"], seconds)
+
+
+def set_gauge(name, value):
+    '''Store the current value of a gauge.'''
+    with _lock:
+        _gauges[name] = value
+
+
+@contextmanager
+def timer(name):
+    '''Context manager that records the duration of its block as a timing.'''
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started)
+
+
+def snapshot():
+    '''Return a copy of all metrics plus hit rates for every `<name>.hits`/`<name>.misses` pair.'''
+    with _lock:
+        timings = {
+            name: {**timing, "avg_seconds": timing["total_seconds"] / timing["count"]}
+            for name, timing in _timings.items()
+        }
+        hit_rates = {}
+        for name, hits in _counters.items():
+            if name.endswith(".hits"):
+                prefix = name[: -len(".hits")]
+                total = hits + _counters.get(f"{prefix}.misses", 0)
+                hit_rates[prefix] = hits / total if total else 0.0
+        return {"counters": dict(_counters), "timings": timings, "gauges": dict(_gauges), "hit_rates": hit_rates}
+
+
+def reset():
+    '''Forget all recorded metrics.'''
+    with _lock:
+        _counters.clear()
+        _timings.clear()
+        _gauges.clear()
+
+
+def process_memory():
+    '''
+    Return the memory of this process from /proc (Linux). "pss_bytes" splits
+    pages shared with the other workers (e.g. preloaded model weights) evenly,
+    so it is the fair per-worker cost; "rss_bytes" counts them fully.
+    '''
+    fields = {"Rss": "rss_bytes", "Pss": "pss_bytes", "Shared_Clean": "shared_clean_bytes",
+              "Shared_Dirty": "shared_dirty_bytes", "Private_Clean": "private_clean_bytes",
+              "Private_Dirty": "private_dirty_bytes"}
+    memory = {"pid": os.getpid()}
+    try:
+        with open("/proc/self/smaps_rollup", encoding="ascii") as fh:
+            for line in fh:
+                key, _, value = line.partition(":")
+                if key in fields:
+                    memory[fields[key]] = int(value.split()[0]) * 1024
+    except OSError:
+        pass
+    return memory
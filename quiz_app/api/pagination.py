@@ -0,0 +1,75 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(created_at, pk):
+    payload = json.dumps([created_at.isoformat(), pk]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def decode_cursor(cursor):
+    '''Return (created_at, id) of a cursor; NotFound if it was not made by encode_cursor.'''
+    try:
+        created_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        created_at = parse_datetime(created_at)
+        if created_at is None or not isinstance(pk, int):
+            raise ValueError(cursor)
+    except (ValueError, TypeError, UnicodeError):
+        raise NotFound("Ungültiger Cursor.")
+    return created_at, pk
+
+
+class KeysetPagination(BasePagination):
+    '''
+    Cursor pagination over (created_at, id), newest first like Quiz.Meta.ordering.
+    Each page seeks past the last row of the previous one, so a page costs
+    the same no matter how deep it is. The body stays a plain list; the next
+    page is announced in the Link header (rel="next").
+    '''
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, settings.QUIZ_LIST_PAGE_SIZE))
+        except ValueError:
+            size = settings.QUIZ_LIST_PAGE_SIZE
+        return max(1, min(size, settings.QUIZ_LIST_MAX_PAGE_SIZE))
+
+    def seek(self, queryset, request):
+        '''The rows of the requested page plus one; that extra row tells whether there is a next page.'''
+        size = self.get_page_size(request)
+        queryset = queryset.order_by("-created_at", "-id")
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            created_at, pk = decode_cursor(cursor)
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        return queryset[:size + 1]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        size = self.get_page_size(request)
+        rows = list(self.seek(queryset, request))
+        page, self.has_next = rows[:size], len(rows) > size
+        self.next_cursor = encode_cursor(page[-1].created_at, page[-1].pk) if self.has_next else None
+        return page
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_headers(self):
+        next_link = self.get_next_link()
+        return {"Link": f'<{next_link}>; rel="next"'} if next_link else {}
+
+    def get_paginated_response(self, data):
+        return Response(data, headers=self.get_headers())
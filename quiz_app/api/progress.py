@@ -0,0 +1,115 @@
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+
+from quiz_app.models import QuizJob, QuizJobEvent
+
+# The job whose pipeline runs in the current thread; set by the job runner.
+_current_job = contextvars.ContextVar("quiz_job", default=None)
+
+# Event streams open in this process; each one occupies a server thread while it runs.
+_open_streams = 0
+_streams_lock = threading.Lock()
+
+
+@contextmanager
+def reporting(job):
+    '''Record the events emitted inside the block as QuizJobEvents of job.'''
+    token = _current_job.set(job)
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+
+def emit(event_type, **data):
+    '''
+    Store a progress event for the job running in this thread. Does nothing
+    outside of a job (e.g. management commands) and never lets a failed
+    write break the pipeline.
+    '''
+    job = _current_job.get()
+    if job is None:
+        return None
+    try:
+        return QuizJobEvent.objects.create(job=job, type=event_type, data=data)
+    except Exception as exc:
+        print(f"-> Could not store progress event '{event_type}': {exc}")
+        return None
+
+
+def format_event(event):
+    '''Render a QuizJobEvent in the text/event-stream format.'''
+    data = json.dumps(event.data, cls=DjangoJSONEncoder)
+    return f"id: {event.pk}\nevent: {event.type}\ndata: {data}\n\n"
+
+
+def event_stream(job_id, last_event_id=0, poll_seconds=1.0, heartbeat_seconds=15.0, timeout=None):
+    '''
+    Yield the events of a job as server-sent events, starting after
+    last_event_id, until the job is finished (or timeout seconds passed).
+    The job status is read before the events, and the job runner stores its
+    final event before it marks the job finished, so no event is lost.
+    '''
+    finished_states = (QuizJob.Status.SUCCEEDED, QuizJob.Status.FAILED)
+    started = last_sent = time.monotonic()
+    yield "retry: 2000\n\n"
+    while True:
+        status = QuizJob.objects.filter(pk=job_id).values_list("status", flat=True).first()
+        if status is None:
+            return
+        events = list(QuizJobEvent.objects.filter(job_id=job_id, pk__gt=last_event_id))
+        for event in events:
+            last_event_id = event.pk
+            yield format_event(event)
+        now = time.monotonic()
+        if events:
+            last_sent = now
+        if status in finished_states or (timeout and now - started >= timeout):
+            return
+        if now - last_sent >= heartbeat_seconds:
+            yield ": keep-alive\n\n"
+            last_sent = now
+        if not connection.in_atomic_block:
+            # Give the connection back while waiting instead of holding it for the whole stream.
+            connection.close()
+        time.sleep(poll_seconds)
+
+
+class _LimitedStream:
+    '''An event stream that holds one of the stream slots until the response is closed.'''
+
+    def __init__(self, events):
+        self.events = events
+        self.released = False
+
+    def __iter__(self):
+        return self.events
+
+    def close(self):
+        global _open_streams
+        self.events.close()
+        with _streams_lock:
+            if not self.released:
+                self.released = True
+                _open_streams -= 1
+
+
+def open_event_stream(job_id, last_event_id=0, **options):
+    '''
+    Return event_stream(...) as streaming content, or None if this process
+    already serves QUIZ_EVENTS_MAX_STREAMS streams: every open stream blocks
+    a server thread, so the rest of the clients have to poll the job instead.
+    '''
+    global _open_streams
+    with _streams_lock:
+        if _open_streams >= settings.QUIZ_EVENTS_MAX_STREAMS:
+            return None
+        _open_streams += 1
+    return _LimitedStream(event_stream(job_id, last_event_id, **options))
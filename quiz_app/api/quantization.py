@@ -0,0 +1,49 @@
+# Int8 inference for CPU-only nodes: dynamic quantization of Whisper's linear
+# layers, plus the word error rate used to measure what it costs. Must stay
+# importable without Django because the parallel transcription workers use it.
+import re
+import warnings
+
+import torch
+import whisper
+
+
+def quantize_model(model):
+    '''
+    Return model with every linear layer replaced by a dynamically quantized
+    int8 version (weights stored as int8, activations quantized per batch).
+    Runs on the CPU only; the model is changed in place.
+    '''
+    model = model.cpu().eval()
+    # Whisper subclasses nn.Linear only to cast weights for fp16; torch's
+    # quantizer matches exact types, so turn them back into plain linears.
+    for module in model.modules():
+        if isinstance(module, whisper.model.Linear):
+            module.__class__ = torch.nn.Linear
+    with warnings.catch_warnings():
+        # torch.ao.quantization is deprecated in favour of torchao, which is not installed.
+        warnings.simplefilter("ignore", DeprecationWarning)
+        warnings.filterwarnings("ignore", message=".*quantize_per_tensor")
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def _words(text):
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    '''Return (substitutions + deletions + insertions) / reference words.'''
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1] / len(ref)
@@ -0,0 +1,120 @@
+import re
+
+from . import metrics
+from .llm import (
+    QuestionListSchema, QuizGenerationError, QuizSummarySchema, parse_quiz_json, question_error,
+)
+
+
+def complete_json(llm, prompt, schema, attempts):
+    '''
+    Ask for schema-constrained JSON and parse it. An unparseable answer is
+    requested again (up to attempts extra calls) instead of failing the quiz.
+    '''
+    for attempt in range(attempts + 1):
+        try:
+            return parse_quiz_json(llm.complete(prompt, response_schema=schema))
+        except QuizGenerationError:
+            if attempt == attempts:
+                metrics.increment("llm.repair.failed")
+                raise
+            print("-> Generated content is not valid JSON, asking again...")
+            metrics.increment("llm.repair.attempts")
+            metrics.increment("llm.repair.regenerated")
+
+
+def build_repair_prompt(transcript, keep_titles, count):
+    '''Prompt for count replacement questions that differ from the ones already kept.'''
+    listing = "\n".join(f"- {title}" for title in keep_titles) or "- (none)"
+    return (
+        f"Based on the following transcript, write {count} new multiple-choice quiz questions.\n\n"
+        f"Transcript:\n{transcript}\n\n"
+        "The quiz already contains these questions, do not repeat or rephrase them:\n"
+        f"{listing}\n\n"
+        "Rules:\n"
+        "- Each question must have exactly 4 distinct answer options.\n"
+        "- Only one correct answer is allowed per question, and it must be exactly one of the options.\n"
+        "- Return valid JSON only with the key questions.\n"
+    )
+
+
+def build_summary_prompt(transcript):
+    '''Prompt for a missing title and description.'''
+    return (
+        "Based on the following transcript, return valid JSON only with the keys title and description.\n\n"
+        f"Transcript:\n{transcript}\n\n"
+        "- title: a concise quiz title based on the topic of the transcript.\n"
+        "- description: a summary in no more than 150 characters, without quiz questions or answers.\n"
+    )
+
+
+def _title_key(question):
+    return re.sub(r"\W+", " ", question["question_title"]).strip().lower()
+
+
+def usable_questions(questions, count):
+    '''Return the first count valid questions with distinct titles and how many were dropped.'''
+    if not isinstance(questions, list):
+        return [], 0
+    kept = []
+    seen = set()
+    for question in questions:
+        if question_error(question) is not None or _title_key(question) in seen:
+            continue
+        seen.add(_title_key(question))
+        kept.append(question)
+    return kept[:count], len(questions) - len(kept)
+
+
+def repair_quiz(llm, transcript, quiz_json, attempts, question_count=10):
+    '''
+    Keep the valid part of a generated quiz and ask only for what is missing:
+    replacement questions for invalid, duplicate or missing ones and, if
+    needed, a title and description. Uses at most attempts follow-up calls
+    for questions. Whatever is still wrong afterwards is left for the
+    regular validation to report.
+    '''
+    if not isinstance(quiz_json, dict):
+        quiz_json = {}
+    questions, dropped = usable_questions(quiz_json.get("questions"), question_count)
+    if dropped:
+        print(f"-> Dropped {dropped} invalid or duplicate questions.")
+    needed_repair = len(questions) < question_count
+
+    for _ in range(attempts):
+        missing = question_count - len(questions)
+        if missing <= 0:
+            break
+        metrics.increment("llm.repair.attempts")
+        metrics.increment("llm.repair.questions", missing)
+        print(f"-> Regenerating {missing} questions...")
+        prompt = build_repair_prompt(transcript, [q["question_title"] for q in questions], missing)
+        try:
+            answer = parse_quiz_json(llm.complete(prompt, response_schema=QuestionListSchema))
+        except QuizGenerationError:
+            continue
+        extra = answer.get("questions") if isinstance(answer, dict) else None
+        questions, _ = usable_questions(questions + (extra if isinstance(extra, list) else []), question_count)
+
+    title = quiz_json.get("title")
+    description = quiz_json.get("description")
+    if not isinstance(title, str) or not title.strip():
+        metrics.increment("llm.repair.attempts")
+        metrics.increment("llm.repair.summaries")
+        print("-> Generated quiz has no title, asking for one...")
+        try:
+            summary = parse_quiz_json(llm.complete(build_summary_prompt(transcript), response_schema=QuizSummarySchema))
+        except QuizGenerationError:
+            summary = {}
+        if isinstance(summary, dict):
+            title = summary.get("title")
+            if not isinstance(description, str) or not description.strip():
+                description = summary.get("description")
+
+    if len(questions) < question_count:
+        metrics.increment("llm.repair.failed")
+    elif needed_repair:
+        metrics.increment("llm.repair.succeeded")
+    if not isinstance(description, str):
+        description = ""
+    return {"title": title, "description": description, "questions": questions}
@@ -0,0 +1,118 @@
+import hashlib
+import threading
+import uuid
+
+from django.core.cache import caches
+from django.db import transaction
+
+from quiz_app.models import Question, Quiz
+
+from . import metrics
+
+CACHE_ALIAS = "quiz_reads"
+# Response headers stored with a payload: the pagination link of list pages
+# and the validators, so a hit answers without touching the database.
+CACHED_HEADERS = ("Link", "ETag", "Last-Modified")
+
+
+class QuizReadCache:
+    '''
+    Serialized quiz list and detail payloads per user, in the "quiz_reads"
+    cache. Keys contain a version token of the user's list and of the quiz;
+    invalidating replaces the token, so old entries are never read again
+    and simply expire. Every save or delete of a Quiz invalidates it (see
+    invalidate_saved_quiz), wherever it happens.
+    '''
+
+    def __init__(self, alias=CACHE_ALIAS):
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _version(self, scope):
+        '''Current version token of scope; a missing (evicted) token is replaced by a fresh one.'''
+        key = f"quiz-reads:version:{scope}"
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key, uuid.uuid4().hex, timeout=None)
+            version = self.cache.get(key)
+        return version
+
+    def list_entry(self, user_id, query, accept=""):
+        '''Return (key, entry) of a list page; query is the (sorted) query string items.'''
+        digest = hashlib.sha1(repr((query, accept)).encode("utf-8")).hexdigest()
+        key = f"quiz-reads:list:{user_id}:{self._version(f'user:{user_id}')}:{digest}"
+        return key, self._get(key)
+
+    def quiz_entry(self, user_id, quiz_id, accept=""):
+        '''Return (key, entry) of a quiz detail payload; the Accept header selects its ETag.'''
+        digest = hashlib.sha1(repr(accept).encode("utf-8")).hexdigest()
+        key = f"quiz-reads:quiz:{user_id}:{quiz_id}:{self._version(f'quiz:{quiz_id}')}:{digest}"
+        return key, self._get(key)
+
+    def store(self, key, data, headers=None):
+        headers = {name: value for name, value in (headers or {}).items() if name in CACHED_HEADERS}
+        self.cache.set(key, {"data": data, "headers": headers})
+
+    def invalidate(self, quiz_id, owner_id):
+        '''Drop the cached detail of a quiz and every cached list page of its owner.'''
+        self.cache.set_many({
+            f"quiz-reads:version:quiz:{quiz_id}": uuid.uuid4().hex,
+            f"quiz-reads:version:user:{owner_id}": uuid.uuid4().hex,
+        }, timeout=None)
+        metrics.increment("quiz_read_cache.invalidations")
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            "backend": self.cache.__class__.__name__,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+        }
+
+    def _get(self, key):
+        entry = self.cache.get(key)
+        outcome = "misses" if entry is None else "hits"
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+        metrics.increment(f"quiz_read_cache.{outcome}")
+        return entry
+
+
+_cache = QuizReadCache()
+
+
+def get_quiz_read_cache():
+    '''Return the process-wide quiz read cache.'''
+    return _cache
+
+
+def invalidate_quiz(quiz_id, owner_id):
+    '''
+    Invalidate a quiz for its owner now and again once the surrounding
+    transaction commits, so a read that raced the write cannot leave the
+    old data cached.
+    '''
+    _cache.invalidate(quiz_id, owner_id)
+    transaction.on_commit(lambda: _cache.invalidate(quiz_id, owner_id))
+
+
+def invalidate_saved_quiz(sender, instance, **kwargs):
+    '''post_save / post_delete receiver for Quiz (connected in QuizAppConfig.ready).'''
+    invalidate_quiz(instance.pk, instance.owner_id)
+
+
+def invalidate_saved_question(sender, instance, **kwargs):
+    '''post_save / post_delete receiver for Question: its quiz changed.'''
+    if Question.quiz.is_cached(instance):
+        owner_id = instance.quiz.owner_id
+    else:
+        owner_id = Quiz.objects.filter(pk=instance.quiz_id).values_list("owner_id", flat=True).first()
+    invalidate_quiz(instance.quiz_id, owner_id)
@@ -0,0 +1,232 @@
+import atexit
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from . import metrics
+
+# Size estimate of a downloaded audio stream (bestaudio is at most ~160 kbit/s opus or m4a).
+AUDIO_BYTES_PER_SECOND = 24_000
+# Reserved for a download whose length is unknown.
+DEFAULT_RESERVE_BYTES = 200 * 1024 * 1024
+OWNER_FILE = ".owner"
+
+
+class ScratchQuotaExceeded(RuntimeError):
+    '''No scratch space became free within the wait time.'''
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except FileNotFoundError:
+                continue
+    return total
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ScratchSpace:
+    '''
+    Hands out one private temporary directory per job below root and removes
+    it when the job ends, however it ends. Jobs reserve their expected disk
+    usage first; while the quota is used up they wait for space
+    (back-pressure) instead of filling the disk.
+    '''
+
+    def __init__(self, root, quota_bytes, wait_seconds=600, orphan_seconds=6 * 60 * 60):
+        self.root = os.path.abspath(str(root))
+        self.quota_bytes = quota_bytes
+        self.wait_seconds = wait_seconds
+        self.orphan_seconds = orphan_seconds
+        self._space = threading.Condition()
+        # Directories of this process and the bytes reserved for each.
+        self._active = {}
+
+    def usage(self):
+        '''
+        Bytes counted against the quota: the larger of reservation and real
+        size for our own directories, the real size for everything else
+        (other worker processes).
+        '''
+        with self._space:
+            active = dict(self._active)
+        total = 0
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            path = os.path.join(self.root, name)
+            size = _dir_size(path) if os.path.isdir(path) else 0
+            total += max(size, active.pop(path, 0))
+        # Reserved directories that were removed from disk behind our back.
+        return total + sum(active.values())
+
+    def _reserve(self, reserve_bytes):
+        if reserve_bytes > self.quota_bytes:
+            raise ScratchQuotaExceeded(
+                f"Job needs {reserve_bytes} bytes of scratch space, the quota is {self.quota_bytes}."
+            )
+        deadline = time.monotonic() + self.wait_seconds
+        waited = False
+        with self._space:
+            while self.usage() + reserve_bytes > self.quota_bytes:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    metrics.increment("scratch.quota_exceeded")
+                    raise ScratchQuotaExceeded("No scratch space became free in time.")
+                if not waited:
+                    print(f"-> Waiting for {reserve_bytes / 1024 / 1024:.0f} MB of scratch space...")
+                    metrics.increment("scratch.waits")
+                    waited = True
+                # Other processes free space without notifying us, so poll as well.
+                self._space.wait(timeout=min(remaining, 1.0))
+            path = tempfile.mkdtemp(prefix="job-", dir=self.root)
+            self._active[path] = reserve_bytes
+        return path
+
+    def _release(self, path):
+        shutil.rmtree(path, ignore_errors=True)
+        with self._space:
+            self._active.pop(path, None)
+            self._space.notify_all()
+
+    @contextmanager
+    def job_dir(self, reserve_bytes=DEFAULT_RESERVE_BYTES, label=None):
+        '''
+        Yield a new empty directory with reserve_bytes of the quota set aside.
+        The directory is deleted on success, on errors and when the thread
+        is interrupted.
+        '''
+        os.makedirs(self.root, exist_ok=True)
+        path = self._reserve(reserve_bytes)
+        try:
+            with open(os.path.join(path, OWNER_FILE), "w", encoding="utf-8") as fh:
+                json.dump({"pid": os.getpid(), "host": socket.gethostname(), "label": label}, fh)
+            metrics.set_gauge("scratch.active_dirs", len(self._active))
+            yield path
+        finally:
+            self._release(path)
+            metrics.set_gauge("scratch.active_dirs", len(self._active))
+
+    def release_all(self):
+        '''Delete the directories of all jobs of this process (interpreter shutdown).'''
+        with self._space:
+            paths = list(self._active)
+        for path in paths:
+            self._release(path)
+
+    def _is_orphan(self, path, now):
+        try:
+            with open(os.path.join(path, OWNER_FILE), encoding="utf-8") as fh:
+                owner = json.load(fh)
+        except (OSError, ValueError):
+            owner = {}
+        if owner.get("host") == socket.gethostname() and owner.get("pid"):
+            if owner["pid"] == os.getpid():
+                return False
+            if not _pid_alive(owner["pid"]):
+                return True
+        try:
+            age = now - os.stat(path).st_mtime
+        except FileNotFoundError:
+            return False
+        # Directories of other hosts or without an owner file only go once they are old.
+        return age > self.orphan_seconds
+
+    def sweep(self):
+        '''Delete directories left behind by crashed workers; returns how many were removed.'''
+        with self._space:
+            active = set(self._active)
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return 0
+        removed = 0
+        now = time.time()
+        for name in names:
+            path = os.path.join(self.root, name)
+            if path in active or not os.path.isdir(path) or not self._is_orphan(path, now):
+                continue
+            print(f"-> Removing orphaned scratch directory {path}")
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+        if removed:
+            metrics.increment("scratch.swept", removed)
+            with self._space:
+                self._space.notify_all()
+        return removed
+
+
+def reserve_bytes_for(duration):
+    '''Scratch space to reserve for the audio of a video of duration seconds (None = unknown).'''
+    if not duration:
+        return DEFAULT_RESERVE_BYTES
+    return int(duration * AUDIO_BYTES_PER_SECOND)
+
+
+_scratch = None
+_scratch_config = None
+_scratch_lock = threading.Lock()
+
+
+def get_scratch_space():
+    '''Return the process-wide scratch space configured in settings.'''
+    global _scratch, _scratch_config
+    with _scratch_lock:
+        config = (
+            str(settings.SCRATCH_DIR), settings.SCRATCH_QUOTA_BYTES,
+            settings.SCRATCH_WAIT_SECONDS, settings.SCRATCH_ORPHAN_SECONDS,
+        )
+        if _scratch is None or _scratch_config != config:
+            _scratch, _scratch_config = ScratchSpace(*config), config
+        return _scratch
+
+
+@atexit.register
+def _release_at_exit():
+    # Workers stopped with SIGTERM exit normally; don't leave their downloads behind.
+    if _scratch is not None:
+        _scratch.release_all()
+
+
+_janitor = None
+
+
+def start_janitor():
+    '''Sweep orphans now and then every SCRATCH_SWEEP_INTERVAL seconds in a daemon thread.'''
+    global _janitor
+    with _scratch_lock:
+        if _janitor is not None or settings.SCRATCH_SWEEP_INTERVAL <= 0:
+            return _janitor
+
+        def run():
+            while True:
+                try:
+                    get_scratch_space().sweep()
+                except Exception as exc:
+                    print(f"-> Scratch janitor failed: {exc}")
+                time.sleep(settings.SCRATCH_SWEEP_INTERVAL)
+
+        _janitor = threading.Thread(target=run, name="scratch-janitor", daemon=True)
+        _janitor.start()
+        return _janitor
@@ -1,11 +1,26 @@
 from rest_framework import serializers
 from quiz_app.models import Quiz, Question
 from rest_framework import serializers
-from quiz_app.models import Quiz, Question
-from quiz_app.api.utils import validate_youtube_url, download_audio, transcript_audio
-import json
-from google import genai
+from quiz_app.models import Quiz, Question, QuizJob, QuizBatch
+from quiz_app.api.utils import (
+    validate_youtube_url, yt_url_to_id, download_audio_pcm, fetch_caption_transcript, TRANSCRIBE_OPTIONS,
+)
+from quiz_app.api.asr import registry as asr_backends
+from quiz_app.api.chunked_transcription import SAMPLE_RATE
+from quiz_app.api.transcript_cache import get_transcript_cache
+from quiz_app.api import metrics, progress
+from quiz_app.api.singleflight import quiz_flights
+from quiz_app.api.llm import QuizGenerationError, QuizSchema, build_quiz_prompt, get_llm, question_error
+from quiz_app.api.repair import complete_json, repair_quiz
+from quiz_app.api.map_reduce import generate_quiz_map_reduce
+from quiz_app.api.transcript_budget import compress_transcript, count_tokens
+from quiz_app.api.response_cache import invalidate_quiz
+from quiz_app.api.scratch import ScratchQuotaExceeded, get_scratch_space, reserve_bytes_for
+from quiz_app.api.video_probe import VideoRejected, check_video, estimate_cost, probe_video
+import time
+from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 
 class QuestionReadSerializer(serializers.ModelSerializer):
     '''Serializer for reading Question objects.'''
@@ -21,98 +36,318 @@ class QuizReadSerializer(serializers.ModelSerializer):
         model = Quiz
         fields = ['id', 'title', 'description', 'created_at', 'updated_at', 'video_url', 'questions']
 
-def _download_and_transcripe_yt_video(url):
-        '''Helper function: download and transcribe a YouTube video.'''
+class QuizSummarySerializer(serializers.ModelSerializer):
+    '''Compact Quiz representation for lists: no questions, only how many there are.'''
+    question_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Quiz
+        fields = ['id', 'title', 'description', 'created_at', 'updated_at', 'video_url', 'question_count']
+
+class QuizJobSerializer(serializers.ModelSerializer):
+    '''Serializer for reading the status and result of a QuizJob.'''
+    quiz = QuizReadSerializer(read_only=True)
+
+    class Meta:
+        model = QuizJob
+        fields = ['id', 'status', 'video_url', 'quality', 'created_at', 'started_at', 'finished_at', 'error', 'quiz']
+        read_only_fields = fields
+
+class QuizBatchJobSerializer(serializers.ModelSerializer):
+    '''Serializer for the per-URL status of a job inside a batch.'''
+    class Meta:
+        model = QuizJob
+        fields = ['id', 'video_url', 'status', 'error', 'quiz']
+        read_only_fields = fields
+
+class QuizBatchSerializer(serializers.ModelSerializer):
+    '''Serializer for a QuizBatch with per-URL status and aggregate progress.'''
+    jobs = QuizBatchJobSerializer(many=True, read_only=True)
+    status = serializers.SerializerMethodField()
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = QuizBatch
+        fields = ['id', 'created_at', 'status', 'progress', 'jobs', 'rejected']
+        read_only_fields = fields
+
+    def get_progress(self, batch):
+        counts = {choice: 0 for choice in QuizJob.Status.values}
+        for job in batch.jobs.all():
+            counts[job.status] += 1
+        total = sum(counts.values())
+        finished = counts[QuizJob.Status.SUCCEEDED] + counts[QuizJob.Status.FAILED]
+        return {
+            "total": total,
+            **counts,
+            "rejected": len(batch.rejected),
+            "percent": round(100 * finished / total) if total else 100,
+        }
+
+    def get_status(self, batch):
+        if any(not job.is_finished for job in batch.jobs.all()):
+            return "running"
+        return "finished"
+
+class CreateQuizBatchSerializer(serializers.Serializer):
+    '''Serializer for the URL list of a batch quiz creation request.'''
+    urls = serializers.ListField(child=serializers.CharField(), allow_empty=False)
+    quality = serializers.ChoiceField(choices=QuizJob.Quality.choices, required=False)
+
+    def validate_urls(self, urls):
+        '''Limit the batch size and drop repeated URLs.'''
+        if len(urls) > settings.QUIZ_BATCH_MAX_URLS:
+            raise serializers.ValidationError(f"Maximal {settings.QUIZ_BATCH_MAX_URLS} URLs pro Anfrage.")
+        return list(dict.fromkeys(url.strip() for url in urls))
+
+    def split_urls(self):
+        '''Return (accepted urls, rejected [{"url", "errors"}]) using the single-quiz URL validation.'''
+        accepted, rejected = [], []
+        for url in self.validated_data["urls"]:
+            url_serializer = CreateQuizSerializer(data={"url": url})
+            if url_serializer.is_valid():
+                accepted.append(url_serializer.validated_data["url"])
+            else:
+                rejected.append({"url": url, "errors": [str(e) for e in url_serializer.errors["url"]]})
+        return accepted, rejected
+
+class VideoProbeSerializer(serializers.Serializer):
+    '''Serializer for the metadata preview of a video: limits check and cost estimate.'''
+    url = serializers.URLField(write_only=True)
+    quality = serializers.ChoiceField(choices=QuizJob.Quality.choices, required=False, write_only=True)
+    video_id = serializers.CharField(read_only=True)
+    title = serializers.CharField(read_only=True)
+    duration = serializers.FloatField(read_only=True, allow_null=True)
+    live_status = serializers.CharField(read_only=True)
+    has_captions = serializers.BooleanField(read_only=True)
+    caption_language = serializers.CharField(read_only=True, allow_null=True)
+    chapters = serializers.ListField(child=serializers.DictField(), read_only=True)
+    accepted = serializers.BooleanField(read_only=True)
+    reason = serializers.CharField(read_only=True, allow_null=True)
+    estimate = serializers.DictField(read_only=True)
+
+    def validate_url(self, url):
+        '''Validate the YouTube URL format.'''
+        if not validate_youtube_url(url):
+            raise serializers.ValidationError("Ungültige YouTube-URL.")
+        return url
+
+    def probe(self):
+        '''Probe the validated URL; unavailable videos come back as not accepted.'''
+        url = self.validated_data["url"]
+        try:
+            probe = dict(probe_video(url))
+        except VideoRejected as exc:
+            return {"video_id": yt_url_to_id(url), "accepted": False, "reason": str(exc), "chapters": [], "estimate": {}}
+        except Exception as exc:
+            print(f"-> Metadata probe failed: {exc}")
+            reason = "Die Video-Metadaten konnten gerade nicht abgerufen werden, bitte später erneut versuchen."
+            return {"video_id": yt_url_to_id(url), "accepted": None, "reason": reason, "chapters": [], "estimate": {}}
+        try:
+            check_video(probe)
+            probe.update(accepted=True, reason=None)
+        except VideoRejected as exc:
+            probe.update(accepted=False, reason=str(exc))
+        probe["estimate"] = estimate_cost(probe, self.validated_data.get("quality"), _asr_queue_depth())
+        return probe
+
+def _probe_video(url, quality=None):
+    '''
+    Stage 0: read the video's metadata before fetching anything and reject
+    live streams, unavailable and too long videos. Returns the probe, or None
+    if probing is disabled or failed for another reason.
+    '''
+    if not settings.VIDEO_PROBE_ENABLED:
+        return None
+    try:
+        probe = probe_video(url)
+        check_video(probe)
+    except VideoRejected as exc:
+        metrics.increment("video_probe.rejected")
+        raise serializers.ValidationError(str(exc))
+    except Exception as exc:
+        print(f"-> Metadata probe failed, continuing without it: {exc}")
+        return None
+    estimate = estimate_cost(probe, quality, _asr_queue_depth())
+    print(f"-> Probed video: {probe['duration']}s, captions: {probe['has_captions']}, estimate: {estimate}")
+    progress.emit(
+        "video.probed", duration=probe["duration"], has_captions=probe["has_captions"],
+        chapters=len(probe["chapters"]), estimate=estimate,
+    )
+    return probe
+
+def _caption_transcript(url, probe=None):
+    '''Strategy 1: use the video's own captions, None if there are none.'''
+    if not settings.CAPTIONS_ENABLED:
+        return None
+    if probe is not None and not probe["has_captions"]:
+        metrics.increment("transcript.captions.misses")
+        return None
+    with metrics.timer("transcript.captions"):
+        try:
+            text = fetch_caption_transcript(url, info=probe["caption_info"] if probe else None)
+        except Exception as exc:
+            print(f"-> Caption lookup failed: {exc}")
+            text = None
+    metrics.increment("transcript.captions.hits" if text else "transcript.captions.misses")
+    return text
+
+def _asr_queue_depth():
+    '''Number of quiz jobs waiting or running in all worker processes.'''
+    return QuizJob.objects.filter(status__in=[QuizJob.Status.PENDING, QuizJob.Status.RUNNING]).count()
+
+def _whisper_transcript(url, quality=None, duration=None):
+    '''
+    Strategy 2: download the audio and transcribe it with the ASR backend
+    picked by the routing policy. duration comes from the metadata probe if
+    there was one. Returns (text, backend name, real-time factor).
+    '''
+    with metrics.timer("transcript.whisper"):
         try: # pragma: no cover
-            mp3_path = download_audio(url)
-            text = transcript_audio(mp3_path)
+            if settings.WHISPER_PIPELINED:
+                backend = asr_backends.route(duration=duration, queue_depth=_asr_queue_depth(), quality=quality)
+                progress.emit("transcription.started", pipelined=True, backend=backend.name)
+                stats = {}
+                started = time.perf_counter()
+                text = backend.transcribe_url(url, stats=stats)
+                duration = stats.get("audio_seconds")
+            else:
+                # Each download gets its own scratch directory, removed whatever happens.
+                scratch = get_scratch_space().job_dir(reserve_bytes_for(duration), label=yt_url_to_id(url))
+                with scratch as workdir:
+                    audio = download_audio_pcm(url, output_dir=workdir)
+                duration = len(audio) / SAMPLE_RATE
+                backend = asr_backends.route(duration=duration, queue_depth=_asr_queue_depth(), quality=quality)
+                progress.emit("transcription.started", pipelined=False, backend=backend.name)
+                started = time.perf_counter()
+                text = backend.transcribe(audio)
+            elapsed = time.perf_counter() - started
             print("-> Text transcription successful.")
-            return text
+        except ScratchQuotaExceeded as exc:
+            print(f"-> {exc}")
+            raise serializers.ValidationError("Der Server ist gerade ausgelastet, bitte später erneut versuchen.")
         except Exception:
             raise serializers.ValidationError("Error processing the YouTube video (download/transcript).")
+    metrics.increment("transcript.whisper.runs")
+    metrics.increment(f"transcript.asr.{backend.name}.runs")
+    rtf = round(elapsed / duration, 4) if duration else None
+    print(f"-> Transcribed with '{backend.name}' (real-time factor {rtf}).")
+    return text, backend.name, rtf
+
+def _transcript_cache_key(cache, video_id, source):
+    if source == "captions":
+        return cache.make_key(video_id, "captions")
+    if settings.WHISPER_QUANTIZE:
+        return cache.make_key(video_id, source, dict(TRANSCRIBE_OPTIONS, int8=True))
+    return cache.make_key(video_id, source, TRANSCRIBE_OPTIONS)
+
+def _cached_sources(quality=None):
+    '''
+    Transcript sources a request may reuse from the cache, best first:
+    captions and the ASR backends at least as accurate as the one the
+    quality hint routes to (a "best" request is not served a tiny transcript).
+    '''
+    backends = asr_backends.enabled()
+    if not backends:
+        return ["captions"]
+    floor = asr_backends.route(quality=quality).tier
+    return ["captions"] + [b.name for b in reversed(backends) if b.tier >= floor]
+
+def _download_and_transcripe_yt_video(url, quality=None):
+        '''
+        Helper function: get the transcript of a YouTube video (cache, metadata
+        probe, captions, then ASR). Returns (text, info) where info names the source in
+        "asr_backend" and, for fresh ASR runs, its "asr_real_time_factor".
+        '''
+        cache = get_transcript_cache()
+        video_id = yt_url_to_id(url)
+        if video_id:
+            keys = {_transcript_cache_key(cache, video_id, source): source for source in _cached_sources(quality)}
+            key, text = cache.get_first(list(keys))
+            if text:
+                source = keys[key]
+                print(f"-> Using cached transcript ({source}) for video {video_id}.")
+                progress.emit("transcript.ready", source=source, cached=True)
+                return text, {"asr_backend": source, "asr_real_time_factor": None}
+
+        probe = _probe_video(url, quality)
+        rtf = None
+        text = _caption_transcript(url, probe)
+        source = "captions"
+        if not text:
+            text, source, rtf = _whisper_transcript(url, quality, probe["duration"] if probe else None)
+        if not text:
+            raise serializers.ValidationError("Error processing the YouTube video (download/transcript).")
+        if video_id:
+            try:
+                cache.set(_transcript_cache_key(cache, video_id, source), text, video_id=video_id, model=source)
+            except OSError as exc:
+                print(f"-> Could not store transcript in cache: {exc}")
+        progress.emit("transcript.ready", source=source, cached=False)
+        return text, {"asr_backend": source, "asr_real_time_factor": rtf}
 
 class CreateQuizSerializer(serializers.Serializer):
     '''Serializer for creating a Quiz from a YouTube URL.'''
     print("-> Initializing CreateQuizSerializer...")
     url = serializers.URLField()
+    quality = serializers.ChoiceField(choices=QuizJob.Quality.choices, required=False)
+    # Token counts, LLM latency and ASR backend of the last generation, stored on the quiz.
+    generation_stats = None
 
     def validate_url(self, url):
         '''Validate the YouTube URL format.'''
         if not validate_youtube_url(url):
             raise serializers.ValidationError("Ungültige YouTube-URL.")
         return url
+
+    def _get_owner(self):
+        '''Return the user the quiz is created for (job owner or requesting user).'''
+        if "user" in self.context:
+            return self.context["user"]
+        return self.context["request"].user
     
     def _build_quiz_prompt(self, transcription: str) -> str:
         '''Build the prompt for the GenAI model to generate a quiz.'''
-        prompt = (
-            "Based on the following transcript, generate exactly one JSON object and nothing else.\n\n"
-            f"Transcript:\n{transcription}\n\n"
-            "Return valid JSON only, without markdown, code fences, comments, or explanatory text.\n"
-            "The output must be parseable directly with json.loads() in Python.\n\n"
-            "The quiz must follow this exact JSON structure:\n\n"
-            "{\n"
-            '  "title": "Create a concise quiz title based on the topic of the transcript.",\n'
-            '  "description": "Summarize the transcript in no more than 150 characters. Do not include any quiz questions or answers.",\n'
-            '  "questions": [\n'
-            "    {\n"
-            '      "question_title": "The question goes here.",\n'
-            '      "question_options": ["Option A", "Option B", "Option C", "Option D"],\n'
-            '      "answer": "The correct answer from the above options"\n'
-            "    },\n"
-            "    ...\n"
-            "    (exactly 10 questions)\n"
-            "  ]\n"
-            "}\n\n"
-            "Rules:\n"
-            "- Output only valid JSON. Do not add any text before or after the JSON object.\n"
-            "- Do not use markdown formatting, backticks, or explanatory text.\n"
-            "- Generate exactly 10 questions.\n"
-            "- Each question must have exactly 4 distinct answer options.\n"
-            "- Only one correct answer is allowed per question, and it must be one of the options.\n"
-            "- Do not include any additional fields beyond title, description, and questions.\n"
-            "- Do not pluralize or change the field names. Use exactly the keys shown above.\n"
-        )
-        return prompt
-    
+        return build_quiz_prompt(transcription)
 
     def _generate_quiz_from_transcript(self, url):
         '''Generate quiz data from the transcript of a YouTube video.'''
-        transcription = _download_and_transcripe_yt_video(url)
+        transcription, transcript_info = _download_and_transcripe_yt_video(url, self.validated_data.get("quality"))
 
         print("-> Generating quiz from transcript...")
 
-        client = genai.Client()
-        prompt = self._build_quiz_prompt(transcription)
-        response_gemini = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config={
-                "response_mime_type": "application/json",
-                "temperature": 0.0,
-            },
-        )
-
-        quiz_data = response_gemini
-        if hasattr(quiz_data, 'text'):
-            quiz_data = quiz_data.text
-        elif hasattr(quiz_data, 'content'):
-            quiz_data = quiz_data.content
-        
+        transcription, budget_stats = compress_transcript(transcription, settings.QUIZ_PROMPT_TOKEN_BUDGET)
+        llm = get_llm()
+        started = time.perf_counter()
+        map_reduce = bool(settings.QUIZ_MAP_REDUCE_MIN_TOKENS) and budget_stats["tokens"] >= settings.QUIZ_MAP_REDUCE_MIN_TOKENS
+        progress.emit("llm.started", transcript_tokens=budget_stats["tokens"], map_reduce=map_reduce)
         try:
-            quiz_json = json.loads(quiz_data)
-            print("-> Quiz generation successful.")
-        except json.JSONDecodeError:
-            print("-> Failed to parse generated content as JSON.")
-            print("-> Raw generated content:\n" + quiz_data[:2000])
-            try:
-                quiz_json, _ = json.JSONDecoder().raw_decode(quiz_data)
-                print("-> Parsed JSON prefix despite trailing content.")
-            except json.JSONDecodeError:
-                raise serializers.ValidationError("Generated content is not valid JSON")
-
+            if map_reduce:
+                quiz_json, map_stats = generate_quiz_map_reduce(
+                    llm, transcription,
+                    section_tokens=settings.QUIZ_MAP_SECTION_TOKENS,
+                    concurrency=settings.QUIZ_MAP_CONCURRENCY,
+                )
+                prompt_tokens = map_stats["prompt_tokens"]
+            else:
+                prompt = self._build_quiz_prompt(transcription)
+                prompt_tokens = count_tokens(prompt)
+                quiz_json = complete_json(llm, prompt, QuizSchema, settings.QUIZ_REPAIR_ATTEMPTS)
+        except QuizGenerationError as exc:
+            raise serializers.ValidationError(str(exc))
+        # Fix single bad questions with small follow-up calls instead of
+        # throwing away the download and transcription.
+        quiz_json = repair_quiz(llm, transcription, quiz_json, settings.QUIZ_REPAIR_ATTEMPTS)
+        self.generation_stats = {
+            "transcript_tokens": budget_stats["raw_tokens"],
+            "prompt_tokens": prompt_tokens,
+            "llm_latency_ms": int((time.perf_counter() - started) * 1000),
+            **transcript_info,
+        }
+        progress.emit("llm.finished", latency_ms=self.generation_stats["llm_latency_ms"])
+        print("-> Quiz generation successful.")
         return quiz_json
-    
-        
+
     def _validate_quiz_json(self, quiz_json):
         '''Validate the structure and content of the generated quiz JSON.'''
         title = quiz_json.get("title")
@@ -126,16 +361,19 @@ class CreateQuizSerializer(serializers.Serializer):
 
         return title.strip(), description.strip(), questions
 
-    def _upsert_quiz(self, url, title, description, user):
+    def _upsert_quiz(self, url, title, description, user, stats=None):
         '''Create or update a Quiz instance in the database.'''
+        stats = stats or {}
         quiz, created = Quiz.objects.get_or_create(
             video_url=url,
-            defaults={"title": title, "description": description, "owner": user},
+            defaults={"title": title, "description": description, "owner": user, **stats},
         )
         if not created:
-            changed_fields = ["title", "description", "updated_at"]
+            changed_fields = ["title", "description", "updated_at", *stats]
             quiz.title = title
             quiz.description = description
+            for field, value in stats.items():
+                setattr(quiz, field, value)
             if quiz.owner_id is None:
                 quiz.owner = user
                 changed_fields.append("owner")
@@ -146,46 +384,55 @@ class CreateQuizSerializer(serializers.Serializer):
         '''Build Question instances from validated question data.'''
         objs = []
         for idx, q in enumerate(questions, start=1):
-            q_title = q.get("question_title")
-            opts = q.get("question_options")
-            ans = q.get("answer")
-
-            if not isinstance(q_title, str) or not q_title.strip():
-                raise serializers.ValidationError(f"Frage {idx}: 'question_title' fehlt oder ist leer.")
-            if not isinstance(opts, list) or len(opts) != 4:
-                raise serializers.ValidationError(f"Frage {idx}: 'question_options' muss eine Liste mit exakt 4 Einträgen sein.")
-            if len(set(opts)) != 4:
-                raise serializers.ValidationError(f"Frage {idx}: 'question_options' enthält Duplikate.")
-            if ans not in opts:
-                raise serializers.ValidationError(f"Frage {idx}: 'answer' muss eine der Optionen sein.")
+            error = question_error(q)
+            if error:
+                raise serializers.ValidationError(f"Frage {idx}: {error}")
 
+            ans = q["answer"]
+            progress.emit("question.validated", index=idx, question_title=q["question_title"].strip(),
+                          question_options=q["question_options"])
             objs.append(
                 Question(
                     quiz=quiz,
-                    question_title=q_title.strip(),
-                    question_options=opts,
+                    question_title=q["question_title"].strip(),
+                    question_options=q["question_options"],
                     answer=ans.strip() if isinstance(ans, str) else ans,
                 )
             )
         return objs
 
     def create(self, validated_data):
-        """Create or update a Quiz and its Questions in the database (refactored)."""
-        print("-> Creating or updating quiz in the database...")
+        """
+        Create or update a Quiz and its Questions in the database. Concurrent
+        requests for the same video share one pipeline run.
+        """
         url = validated_data["url"]
-        user = self.context["request"].user
+        user = self._get_owner()
+        started = timezone.now()
 
+        return quiz_flights.do(
+            yt_url_to_id(url) or url,
+            lambda: self._create_quiz(url, user),
+            reuse=lambda: Quiz.objects.filter(video_url=url, updated_at__gte=started).first(),
+            lock_dir=settings.QUIZ_LOCK_DIR,
+            timeout=settings.QUIZ_LOCK_TIMEOUT,
+        )
+
+    def _create_quiz(self, url, user):
+        """Run the pipeline for url and store the Quiz and its Questions."""
+        print("-> Creating or updating quiz in the database...")
         quiz_json = self._generate_quiz_from_transcript(url)
 
         title, description, questions = self._validate_quiz_json(quiz_json)
 
         with transaction.atomic():
-            quiz, created = self._upsert_quiz(url, title, description, user)
+            quiz, created = self._upsert_quiz(url, title, description, user, self.generation_stats)
             if not created:
                 quiz.questions.all().delete()
 
             question_objs = self._build_question_instances(questions, quiz)
             Question.objects.bulk_create(question_objs)
+            invalidate_quiz(quiz.pk, quiz.owner_id)
 
             print("-> Quiz creation/update completed.")
         return quiz
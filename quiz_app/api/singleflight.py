@@ -0,0 +1,85 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import Future
+
+from filelock import FileLock, Timeout
+
+from . import metrics
+
+
+class SingleFlight:
+    '''Coalesces concurrent calls with the same key into one execution.'''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self):
+        '''Return the keys that are currently being computed in this process.'''
+        with self._lock:
+            return list(self._calls)
+
+    def do(self, key, fn, reuse=None, lock_dir=None, timeout=None):
+        '''
+        Run fn() at most once per key at a time. Threads that ask for a key
+        that is already running wait for it and get the same result (or
+        exception). With lock_dir, a file lock serialises the key across
+        processes as well; a process that had to wait for another one calls
+        reuse() first and only runs fn() if that returns None.
+        '''
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            print(f"-> Joining in-flight pipeline for '{key}'.")
+            metrics.increment("singleflight.coalesced")
+            return future.result()
+
+        try:
+            result = self._run_exclusive(key, fn, reuse, lock_dir, timeout)
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    @staticmethod
+    def lock_path(lock_dir, key):
+        '''Return the lock file used for key inside lock_dir.'''
+        name = hashlib.sha256(str(key).encode("utf-8")).hexdigest()[:32]
+        return os.path.join(str(lock_dir), f"{name}.lock")
+
+    def _run_exclusive(self, key, fn, reuse, lock_dir, timeout):
+        if not lock_dir:
+            return fn()
+
+        os.makedirs(lock_dir, exist_ok=True)
+        lock = FileLock(self.lock_path(lock_dir, key))
+        waited = False
+        try:
+            lock.acquire(timeout=0)
+        except Timeout:
+            print(f"-> Another process is working on '{key}', waiting...")
+            waited = True
+            lock.acquire(timeout=-1 if timeout is None else timeout)
+        try:
+            if waited and reuse:
+                result = reuse()
+                if result is not None:
+                    metrics.increment("singleflight.coalesced")
+                    return result
+            return fn()
+        finally:
+            lock.release()
+
+
+quiz_flights = SingleFlight()
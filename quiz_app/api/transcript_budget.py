@@ -0,0 +1,181 @@
+import os
+import re
+import threading
+
+import tiktoken
+
+# Fallback when no tokenizer can be loaded: roughly four characters per token.
+_CHARS_PER_TOKEN = 4
+# Sentences without punctuation (e.g. auto captions) are cut into pieces of this many words.
+_MAX_SENTENCE_WORDS = 40
+
+_FILLER = re.compile(
+    r"\[(?:music|applause|laughter|musik|applaus|gelächter)\]"
+    r"|\b(?:u+h+|u+h*m+|h+m+|ä+h+m*|ö+h+m*|e+h+m+)\b[,.]?",
+    re.IGNORECASE,
+)
+_STUTTER = re.compile(r"\b(\w+)(?:\s+\1\b)+", re.IGNORECASE)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+# The first count in a process waits at most this long for the tokenizer; later
+# counts never wait and are estimated until it has loaded.
+_REQUEST_WAIT_SECONDS = 2
+
+_encoding = None
+_loaded = threading.Event()
+_loader = None
+_loader_lock = threading.Lock()
+_waited = False
+
+
+def _load_encoding():
+    '''
+    Load a tiktoken encoding. cl100k_base comes from TIKTOKEN_CACHE_DIR (the
+    Docker image ships it) or is downloaded; when that is not possible,
+    Whisper's bundled multilingual encoding is used. None if neither loads.
+    '''
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as exc:
+        print(f"-> Could not load cl100k_base ({exc}), using Whisper's tokenizer.")
+    try:
+        from whisper.tokenizer import get_encoding as whisper_encoding
+        return whisper_encoding("multilingual")
+    except Exception as exc:
+        print(f"-> No tokenizer available ({exc}), estimating token counts.")
+        return None
+
+
+def _run_loader():
+    global _encoding
+    _encoding = _load_encoding()
+    _loaded.set()
+
+
+def load_encoding(timeout=None):
+    '''
+    Start loading the tokenizer in a background thread (once) and wait up to
+    timeout seconds (None = until it is done). Returns the encoding, or None
+    while it is still loading or if none could be loaded.
+    '''
+    global _loader
+    with _loader_lock:
+        if _loader is None:
+            _loader = threading.Thread(target=_run_loader, name="tokenizer-loader", daemon=True)
+            _loader.start()
+    _loaded.wait(timeout)
+    return _encoding
+
+
+def _forget_unfinished_loader():
+    # A forked worker does not inherit the loader thread; start over if it had not finished.
+    global _loader, _loader_lock, _waited
+    _loader_lock = threading.Lock()
+    if not _loaded.is_set():
+        _loader = None
+        _waited = False
+
+
+os.register_at_fork(after_in_child=_forget_unfinished_loader)
+
+
+def get_encoding():
+    '''
+    Return the tokenizer, or None (estimate) while it is not loaded. Only the
+    first call in a process waits for it, a few seconds at most: counting
+    runs once per sentence, so waiting on every call would stall a job.
+    '''
+    global _waited
+    if _loaded.is_set():
+        return _encoding
+    timeout, _waited = (0 if _waited else _REQUEST_WAIT_SECONDS), True
+    return load_encoding(timeout)
+
+
+def count_tokens(text):
+    '''Return the number of tokens in text.'''
+    encoding = get_encoding()
+    if encoding is None:
+        return -(-len(text) // _CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def drop_filler(text):
+    '''Remove filler words, stage annotations and stuttered repetitions.'''
+    text = _FILLER.sub("", text)
+    text = _STUTTER.sub(r"\1", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def split_sentences(text):
+    '''Split text into sentences, cutting unpunctuated runs into short pieces.'''
+    sentences = []
+    for sentence in _SENTENCE_END.split(text):
+        words = sentence.split()
+        for i in range(0, len(words), _MAX_SENTENCE_WORDS):
+            sentences.append(" ".join(words[i:i + _MAX_SENTENCE_WORDS]))
+    return sentences
+
+
+def dedupe_sentences(sentences):
+    '''Drop sentences whose normalized text already appeared earlier.'''
+    seen = set()
+    unique = []
+    for sentence in sentences:
+        key = re.sub(r"\W+", " ", sentence).strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(sentence)
+    return unique
+
+
+def sample_sentences(sentences, budget):
+    '''
+    Keep an evenly spread subset of sentences whose token counts add up to at
+    most budget, so every part of the video stays represented.
+    '''
+    counts = [count_tokens(" " + s) for s in sentences]
+    total = sum(counts)
+    if total <= budget:
+        return list(sentences)
+    ratio = budget / total
+    kept = []
+    used = 0
+    credit = 0.0
+    for sentence, tokens in zip(sentences, counts):
+        credit += tokens * ratio
+        if credit >= tokens and used + tokens <= budget:
+            kept.append(sentence)
+            used += tokens
+            credit -= tokens
+    return kept
+
+
+def compress_transcript(text, budget):
+    '''
+    Shrink text to at most budget tokens (budget <= 0 disables the limit).
+    Cheaper, lossless-ish steps run first; extractive sampling only when they
+    are not enough. Returns (text, stats).
+    '''
+    raw_tokens = count_tokens(text)
+    stats = {"raw_tokens": raw_tokens, "tokens": raw_tokens, "steps": []}
+    if budget <= 0 or raw_tokens <= budget:
+        return text, stats
+
+    text = drop_filler(text)
+    stats["steps"].append("filler")
+    sentences = split_sentences(text)
+
+    if count_tokens(text) > budget:
+        sentences = dedupe_sentences(sentences)
+        text = " ".join(sentences)
+        stats["steps"].append("dedupe")
+
+    if count_tokens(text) > budget:
+        text = " ".join(sample_sentences(sentences, budget))
+        stats["steps"].append("sample")
+
+    stats["tokens"] = count_tokens(text)
+    print(f"-> Transcript compressed from {raw_tokens} to {stats['tokens']} tokens ({', '.join(stats['steps'])}).")
+    return text, stats
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+
+from . import metrics
+
+
+class TranscriptCache:
+    '''Content-addressed on-disk transcript store with size-bounded LRU eviction.'''
+
+    def __init__(self, directory, max_bytes):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(video_id, model, options=None):
+        '''Build the cache key for a video transcribed with a given model and settings.'''
+        payload = json.dumps(
+            {"video_id": video_id, "model": model, "options": options or {}},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        '''Return the cached transcript or None; a hit marks the entry as recently used.'''
+        return self.get_first([key])[1]
+
+    def get_first(self, keys):
+        '''
+        Return (key, transcript) of the first of keys that is cached, or
+        (None, None). One lookup, so exactly one hit or miss is counted.
+        '''
+        for key in keys:
+            text = self._read(key)
+            if text is not None:
+                self._count("hits")
+                return key, text
+        self._count("misses")
+        return None, None
+
+    def _read(self, key):
+        path = self.path_for(key)
+        try:
+            with open(path, encoding="utf-8") as fh:
+                text = json.load(fh)["text"]
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return text
+
+    def set(self, key, text, **meta):
+        '''Store a transcript atomically and evict least recently used entries if needed.'''
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump({**meta, "text": text}, fh, ensure_ascii=False)
+            os.replace(tmp_path, self.path_for(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def _entries(self):
+        '''Return (mtime, size, path) of all cache files.'''
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+        return entries
+
+    def evict(self):
+        '''Delete least recently used entries until the store fits into max_bytes.'''
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    metrics.increment("transcript_cache.evictions")
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+    def _count(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+        metrics.increment(f"transcript_cache.{outcome}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_transcript_cache():
+    '''Return the process-wide transcript cache configured in settings.'''
+    global _cache
+    with _cache_lock:
+        directory = str(settings.TRANSCRIPT_CACHE_DIR)
+        max_bytes = settings.TRANSCRIPT_CACHE_MAX_BYTES
+        if _cache is None or (_cache.directory, _cache.max_bytes) != (directory, max_bytes):
+            _cache = TranscriptCache(directory, max_bytes)
+        return _cache
@@ -1,8 +1,22 @@
 from django.urls import path
-from quiz_app.api.views import CreateQuizView, QuizListView, QuizDetailView
+from quiz_app.api.async_views import AsyncCreateQuizView, AsyncQuizDetailView, AsyncQuizListView
+from quiz_app.api.views import (
+    CreateQuizView, CreateQuizBatchView, QuizListView, QuizDetailView, QuizJobDetailView, QuizJobEventsView,
+    QuizBatchDetailView, VideoProbeView, MetricsView,
+)
 
 urlpatterns = [
     path('createQuiz/', CreateQuizView.as_view(), name='create-quiz'),
+    path('createQuizzes/', CreateQuizBatchView.as_view(), name='create-quiz-batch'),
+    path('probe/', VideoProbeView.as_view(), name='video-probe'),
     path('quizzes/', QuizListView.as_view(), name='quiz-list'),
     path('quizzes/<int:id>/', QuizDetailView.as_view(), name='quiz-detail'),
+    path('jobs/<uuid:id>/', QuizJobDetailView.as_view(), name='quiz-job-detail'),
+    path('jobs/<uuid:id>/events/', QuizJobEventsView.as_view(), name='quiz-job-events'),
+    path('batches/<uuid:id>/', QuizBatchDetailView.as_view(), name='quiz-batch-detail'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    # Native async versions of the views above (serve core.asgi with an ASGI server).
+    path('async/createQuiz/', AsyncCreateQuizView.as_view(), name='async-create-quiz'),
+    path('async/quizzes/', AsyncQuizListView.as_view(), name='async-quiz-list'),
+    path('async/quizzes/<int:id>/', AsyncQuizDetailView.as_view(), name='async-quiz-detail'),
 ]
\ No newline at end of file
@@ -1,8 +1,26 @@
+import html
 import os
+import queue
 import re
+import subprocess
+import sys
+import threading
+import xml.etree.ElementTree as ET
+import numpy as np
 import yt_dlp
-import yt_dlp.update as yt_dlp_update
 import whisper
+from django.conf import settings
+
+from . import progress
+from .whisper_models import registry as whisper_models
+from .chunked_transcription import ChunkedTranscriber, stitch_segments
+
+# Options passed to Whisper's transcribe(); part of the transcript cache key.
+TRANSCRIBE_OPTIONS = {"fp16": False}
+
+_chunked_transcriber = None
+_chunked_transcriber_config = None
+_chunked_transcriber_lock = threading.Lock()
 
 def validate_youtube_url(url):
     """Validate if the provided URL is a valid YouTube URL."""
@@ -28,37 +46,117 @@ def yt_url_to_id(url: str):
     m = re.search(r"youtu\.be/([A-Za-z0-9_-]{6,})", url)
     return m.group(1) if m else None
 
-def _sanitize_filename(name: str) -> str:
-    """Sanitize a string to be safe for use as a filename."""
-    return re.sub(r'[\\/*?:"<>|]+', "_", name).strip()
+def _clean_caption_line(line: str) -> str:
+    """Remove inline timing/styling tags and HTML entities from a caption line."""
+    line = re.sub(r"<[^>]+>", "", line)
+    return re.sub(r"\s+", " ", html.unescape(line)).strip()
+
+def parse_vtt(content: str) -> str:
+    """
+    Convert a WebVTT caption file into plain text. YouTube's automatic
+    captions repeat the previous line in every cue, so consecutive
+    duplicate lines are dropped.
+    """
+    lines = []
+    for block in re.split(r"\n\s*\n", content.replace("\r\n", "\n").strip()):
+        block_lines = block.split("\n")
+        if block_lines[0].startswith(("WEBVTT", "NOTE", "STYLE", "REGION")):
+            continue
+        timing = next((i for i, l in enumerate(block_lines) if "-->" in l), None)
+        if timing is None:
+            continue
+        for raw in block_lines[timing + 1:]:
+            line = _clean_caption_line(raw)
+            if line and (not lines or lines[-1] != line):
+                lines.append(line)
+    return " ".join(lines)
+
+def parse_srv(content: str) -> str:
+    """Convert YouTube's XML caption formats (srv1/srv2/srv3, ttml) into plain text."""
+    root = ET.fromstring(content)
+    lines = []
+    for element in root.iter():
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag in ("p", "text"):
+            line = _clean_caption_line("".join(element.itertext()))
+            if line and (not lines or lines[-1] != line):
+                lines.append(line)
+    return " ".join(lines)
+
+def _pick_caption_track(info):
+    """
+    Choose the caption track closest to the spoken language: manual
+    subtitles first, then YouTube's automatic captions of the original
+    audio ("<lang>-orig"). Machine-translated tracks are never used.
+    """
+    tracks = info.get("requested_subtitles") or {}
+    manual = set(info.get("subtitles") or {})
+    language = (info.get("language") or "").lower()
+
+    def matches_language(lang):
+        return bool(language) and lang.lower().split("-")[0] == language.split("-")[0]
+
+    candidates = (
+        [lang for lang in tracks if lang in manual and matches_language(lang)]
+        + [lang for lang in tracks if lang in manual and not language]
+        + [lang for lang in tracks if lang not in manual and lang.endswith("-orig")]
+        + [lang for lang in tracks if lang not in manual and lang == language]
+    )
+    for lang in candidates:
+        if lang != "live_chat":
+            return lang, tracks[lang]
+    return None, None
+
+# yt-dlp options of a metadata lookup that also lists the caption tracks.
+CAPTION_YDL_OPTS = {
+    "skip_download": True,
+    "writesubtitles": True,
+    "writeautomaticsub": True,
+    "subtitleslangs": ["all"],
+    "subtitlesformat": "vtt/srv3/srv2/srv1/ttml",
+    "quiet": True,
+    "noplaylist": True,
+}
 
-def ensure_latest_yt_dlp():
-    """Check whether yt-dlp is up to date and update it if necessary."""
-    print("-> Checking yt-dlp version...")
+def fetch_caption_transcript(url, info=None):
+    """
+    Fetch the subtitles of a YouTube video via yt-dlp (without downloading
+    the video) and return them as plain text, or None if there is no usable
+    track. `info` may be the caption part of an earlier metadata probe,
+    which saves the metadata request.
+    """
+    print(f"-> Looking for captions: {url}")
+    with yt_dlp.YoutubeDL(dict(CAPTION_YDL_OPTS)) as ydl:
+        if info is None:
+            info = ydl.extract_info(url, download=False)
+        lang, track = _pick_caption_track(info)
+        if not track:
+            print("-> No captions in the spoken language available.")
+            return None
+        content = track.get("data")
+        if content is None:
+            content = ydl.urlopen(track["url"]).read().decode("utf-8", errors="replace")
+
+    parse = parse_vtt if track.get("ext") == "vtt" else parse_srv
     try:
-        ydl = yt_dlp.YoutubeDL({"quiet": True})
-        updater = yt_dlp_update.Updater(ydl)
-        update_info = updater.query_update(_output=False)
-        if update_info:
-            print(f"-> New yt-dlp version available: {update_info.version}. Updating now...")
-            updated = updater.update()
-            if updated:
-                print("-> yt-dlp successfully updated.")
-            else:
-                print("-> yt-dlp update was skipped or failed.")
-        else:
-            print("-> yt-dlp is already up to date.")
-    except Exception as exc:
-        print(f"-> yt-dlp version check/update failed: {exc}")
-
-def download_audio(url):
+        text = parse(content)
+    except ET.ParseError:
+        print(f"-> Could not parse {track.get('ext')} captions ({lang}).")
+        return None
+    if len(text) < settings.CAPTION_MIN_CHARS:
+        print(f"-> Captions ({lang}) too short to be usable.")
+        return None
+    print(f"-> Using {track.get('ext')} captions ({lang}), {len(text)} characters.")
+    return text
+
+def download_audio(url, output_dir=None):
     """Download audio from a YouTube URL and save it as an MP3 file."""
-    ensure_latest_yt_dlp()
     print(f"-> Downloading audio from: {url}")
 
-    output_dir = os.path.join("quiz_app", "audio_file")
+    output_dir = output_dir or os.path.join("quiz_app", "audio_file")
     os.makedirs(output_dir, exist_ok=True)
-    outtmpl_path = os.path.join(output_dir, "%(title)s.%(ext)s")
+    # Named by video id: titles of different videos can be equal.
+    outtmpl_path = os.path.join(output_dir, "%(id)s.%(ext)s")
 
     ydl_opts = {
         "format": "bestaudio/best",
@@ -76,33 +174,251 @@ def download_audio(url):
         info = ydl.extract_info(url, download=True)
         filename = ydl.prepare_filename(info)         
         mp3_path = os.path.splitext(filename)[0] + ".mp3"
+        print(f"-> Download successful: {mp3_path}")
+        return mp3_path
 
-        base = _sanitize_filename(os.path.splitext(os.path.basename(mp3_path))[0])
-        safe_mp3 = os.path.join(output_dir, base + ".mp3")
-        if mp3_path != safe_mp3 and os.path.exists(mp3_path):
-            os.replace(mp3_path, safe_mp3)
+def download_audio_stream(url, output_dir=None):
+    """Download the best audio stream of a YouTube URL as-is (no re-encoding) and return its path."""
+    print(f"-> Downloading audio stream from: {url}")
+
+    output_dir = output_dir or os.path.join("quiz_app", "audio_file")
+    os.makedirs(output_dir, exist_ok=True)
 
-        final_path = safe_mp3 if os.path.exists(safe_mp3) else mp3_path
-        print(f"-> Download successful: {final_path}")
-        return final_path
+    ydl_opts = {
+        "format": "bestaudio/best",
+        "outtmpl": os.path.join(output_dir, "%(id)s.%(ext)s"),
+        "quiet": True,
+        "noplaylist": True,
+    }
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=True)
+        path = ydl.prepare_filename(info)
+    print(f"-> Download successful: {path}")
+    return path
+
+def download_audio_pcm(url, output_dir=None):
+    """
+    Download the best audio stream and decode it once into the 16 kHz mono
+    float32 buffer that Whisper's transcribe() expects. The downloaded
+    stream is deleted afterwards.
+    """
+    path = download_audio_stream(url, output_dir=output_dir)
+    try:
+        audio = whisper.load_audio(path)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    duration = len(audio) / whisper.audio.SAMPLE_RATE
+    print(f"-> Decoded {duration:.0f}s of audio.")
+    progress.emit("download.finished", seconds=round(duration))
+    return audio
     
-def transcript_audio(mp3_path: str):
+def get_chunked_transcriber():
+    """
+    Return the process-wide parallel transcriber, or None if it is disabled.
+    All model sizes share its one pool of WHISPER_PARALLEL_WORKERS processes;
+    a changed configuration shuts the old pool down.
+    """
+    global _chunked_transcriber, _chunked_transcriber_config
+    if settings.WHISPER_PARALLEL_WORKERS < 2:
+        return None
+    config = (
+        settings.WHISPER_MODEL, settings.WHISPER_PARALLEL_WORKERS, settings.WHISPER_PARALLEL_WINDOW_SECONDS,
+        settings.WHISPER_PARALLEL_OVERLAP_SECONDS, settings.WHISPER_QUANTIZE, settings.WHISPER_PARALLEL_MAX_MODELS,
+    )
+    with _chunked_transcriber_lock:
+        if _chunked_transcriber is None or _chunked_transcriber_config != config:
+            if _chunked_transcriber is not None:
+                _chunked_transcriber.shutdown()
+            _chunked_transcriber = ChunkedTranscriber(
+                settings.WHISPER_MODEL,
+                workers=settings.WHISPER_PARALLEL_WORKERS,
+                window_seconds=settings.WHISPER_PARALLEL_WINDOW_SECONDS,
+                overlap_seconds=settings.WHISPER_PARALLEL_OVERLAP_SECONDS,
+                options=TRANSCRIBE_OPTIONS,
+                quantized=settings.WHISPER_QUANTIZE,
+                max_models=settings.WHISPER_PARALLEL_MAX_MODELS,
+            )
+            _chunked_transcriber_config = config
+        return _chunked_transcriber
+
+def _transcribe(audio, model_name=None):
+    """Run Whisper on a path or buffer; long buffers go to the parallel transcriber."""
+    model_name = model_name or settings.WHISPER_MODEL
+    duration = 0 if isinstance(audio, str) else len(audio) / whisper.audio.SAMPLE_RATE
+    chunked = get_chunked_transcriber()
+    if chunked is not None and duration >= settings.WHISPER_PARALLEL_MIN_SECONDS:
+        print(f"-> Transcribing in parallel on {chunked.workers} processes")
+        return chunked.transcribe(audio, model_name=model_name, on_window_done=lambda done, total: progress.emit(
+            "transcription.progress", window=done, windows=total,
+        ))
+    with whisper_models.use(model_name) as model:
+        return model.transcribe(audio, **TRANSCRIBE_OPTIONS)
+
+def transcript_audio(audio, model_name=None):
     """
-    Transcribes audio using Whisper, saves a .txt file in quiz_app/text_file/,
-    and returns (text, text_file_path).
+    Transcribes audio using Whisper (model_name, default WHISPER_MODEL) and
+    returns the text. `audio` is either the path of an audio file (deleted
+    afterwards, also on errors) or a 16 kHz mono float32 buffer as returned by
+    download_audio_pcm().
     """
-    print(f"-> Transcribing audio file: {mp3_path}")
-    if not os.path.exists(mp3_path):
-        raise FileNotFoundError(f"Audio file not found: {mp3_path}")
+    is_path = isinstance(audio, str)
+    if is_path:
+        print(f"-> Transcribing audio file: {audio}")
+        if not os.path.exists(audio):
+            raise FileNotFoundError(f"Audio file not found: {audio}")
+    else:
+        print(f"-> Transcribing {len(audio) / whisper.audio.SAMPLE_RATE:.0f}s of decoded audio")
 
-    model = whisper.load_model("base")
-    result = model.transcribe(mp3_path, fp16=False)
+    try:
+        result = _transcribe(audio, model_name)
+    finally:
+        if is_path and os.path.exists(audio):
+            os.remove(audio)
+            print(f"-> Deleted audiofile at: {audio}")
     text = (result.get("text") or "").strip()
 
     if not text:
         raise ValueError("No transcribed text found")
-    else:
-        os.remove(mp3_path)
-        print(f"-> Deleted audiofile at: {mp3_path}")
-        print(f"-> Transcription successful: {mp3_path}")
-    return text
\ No newline at end of file
+    print("-> Transcription successful.")
+    return text
+
+_END_OF_STREAM = object()
+
+def _spawn_decoder(url):
+    """
+    Start `yt-dlp -o -` piped into ffmpeg, which writes 16 kHz mono s16le
+    PCM to its stdout. Returns (processes, pcm_stream).
+    """
+    downloader = subprocess.Popen(
+        [sys.executable, "-m", "yt_dlp", "-f", "bestaudio/best", "--no-playlist", "--quiet", "-o", "-", url],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    decoder = subprocess.Popen(
+        [
+            "ffmpeg", "-nostdin", "-loglevel", "error", "-i", "pipe:0",
+            "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(whisper.audio.SAMPLE_RATE), "-",
+        ],
+        stdin=downloader.stdout,
+        stdout=subprocess.PIPE,
+    )
+    # Let yt-dlp receive SIGPIPE if ffmpeg exits early.
+    downloader.stdout.close()
+    return [downloader, decoder], decoder.stdout
+
+def _read_pcm_windows(stream, window_seconds, overlap_seconds):
+    """Cut a s16le PCM stream into overlapping float32 windows: yields (start_sample, samples)."""
+    window = int(window_seconds * whisper.audio.SAMPLE_RATE)
+    step = window - int(overlap_seconds * whisper.audio.SAMPLE_RATE)
+    buffer = np.zeros(0, dtype=np.float32)
+    pending = b""
+    start = 0
+    while True:
+        data = stream.read(step * 2)
+        if data:
+            # Pipes may return an odd number of bytes; keep the half sample for the next read.
+            pending += data
+            usable = len(pending) // 2 * 2
+            samples = np.frombuffer(pending[:usable], np.int16).astype(np.float32) / 32768.0
+            pending = pending[usable:]
+            buffer = np.concatenate([buffer, samples])
+        while len(buffer) >= window:
+            yield start, buffer[:window]
+            buffer = buffer[step:]
+            start += step
+        if not data:
+            # The rest is only new audio if it reaches past the previous window's overlap.
+            if len(buffer) and (start == 0 or len(buffer) > window - step):
+                yield start, buffer
+            return
+
+def stream_audio_windows(url, window_seconds=30, overlap_seconds=2, max_windows=4):
+    """
+    Yield decoded audio windows while the rest of the video is still being
+    downloaded and decoded in a background thread. At most max_windows
+    windows are buffered, so memory stays flat for long videos.
+    """
+    windows = queue.Queue(maxsize=max_windows)
+    stop = threading.Event()
+    processes, pcm_stream = _spawn_decoder(url)
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                windows.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def produce():
+        try:
+            for window in _read_pcm_windows(pcm_stream, window_seconds, overlap_seconds):
+                put(window)
+                if stop.is_set():
+                    return
+            for process in processes:
+                if process.wait() != 0:
+                    raise RuntimeError(f"{process.args[0]} exited with code {process.returncode}")
+            put(_END_OF_STREAM)
+        except Exception as exc:
+            put(exc)
+
+    producer = threading.Thread(target=produce, name="audio-stream", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = windows.get()
+            if item is _END_OF_STREAM:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+        producer.join(timeout=5)
+
+def transcribe_stream(url, model_name=None, stats=None):
+    """
+    Pipelined mode: transcribe the first windows while later parts of the
+    video are still downloading, so the total time approaches
+    max(download, transcription) instead of their sum. If a stats dict is
+    given, the length of the audio is stored in stats["audio_seconds"].
+    """
+    model_name = model_name or settings.WHISPER_MODEL
+    print(f"-> Streaming transcription of: {url}")
+    window_seconds = settings.WHISPER_PIPELINE_WINDOW_SECONDS
+    overlap_seconds = settings.WHISPER_PIPELINE_OVERLAP_SECONDS
+    results = []
+    previous_text = ""
+    windows = stream_audio_windows(
+        url, window_seconds, overlap_seconds, max_windows=settings.WHISPER_PIPELINE_QUEUE_WINDOWS,
+    )
+    for start, samples in windows:
+        with whisper_models.use(model_name) as model:
+            # The tail of the previous window keeps wording consistent across boundaries.
+            result = model.transcribe(samples, initial_prompt=previous_text[-200:] or None, **TRANSCRIBE_OPTIONS)
+        offset = start / whisper.audio.SAMPLE_RATE
+        segments = [
+            {"start": seg["start"] + offset, "end": seg["end"] + offset, "text": seg["text"]}
+            for seg in result.get("segments", [])
+        ]
+        results.append((start, len(samples), segments))
+        previous_text = result.get("text") or previous_text
+        print(f"-> Transcribed window {len(results)} ({offset:.0f}s)")
+        progress.emit("transcription.progress", window=len(results), seconds=round(offset + len(samples) / whisper.audio.SAMPLE_RATE))
+
+    segments = stitch_segments(results, overlap_seconds)
+    text = "".join(seg["text"] for seg in segments).strip()
+    if not text:
+        raise ValueError("No transcribed text found")
+    if stats is not None and results:
+        start, length, _ = results[-1]
+        stats["audio_seconds"] = (start + length) / whisper.audio.SAMPLE_RATE
+    print("-> Transcription successful.")
+    return text
+
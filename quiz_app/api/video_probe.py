@@ -0,0 +1,158 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import yt_dlp
+from django.conf import settings
+from django.db.models import Avg
+
+from quiz_app.models import Quiz
+
+from . import metrics
+from .asr import registry as asr_backends
+from .utils import CAPTION_YDL_OPTS, _pick_caption_track, yt_url_to_id
+
+# Rough size of a spoken transcript: ~150 words per minute at ~1.3 tokens per word.
+SPOKEN_TOKENS_PER_SECOND = 3.3
+
+REJECTED_LIVE_STATES = ("is_live", "is_upcoming", "post_live")
+REJECTED_AVAILABILITY = ("private", "premium_only", "subscriber_only", "needs_auth")
+# yt-dlp errors that mean the video itself cannot be fetched (lower-cased message parts).
+# Anything else (network, HTTP 429, extractor bugs) is transient and not the video's fault.
+UNAVAILABLE_ERRORS = (
+    "video unavailable", "private video", "video is private", "has been removed", "no longer available",
+    "account associated with this video has been terminated", "not available in your country",
+    "members-only", "join this channel", "sign in to confirm your age", "live event will begin", "premieres in",
+)
+
+_lock = threading.Lock()
+_probes = OrderedDict()
+
+
+class VideoRejected(ValueError):
+    '''The video cannot be turned into a quiz (too long, live, not available).'''
+
+
+def _chapters(info):
+    return [
+        {"title": chapter.get("title") or "", "start": chapter.get("start_time"), "end": chapter.get("end_time")}
+        for chapter in info.get("chapters") or []
+    ]
+
+
+def _summarize(info):
+    '''Keep the parts of yt-dlp's info dict the pipeline uses (the full dict is large).'''
+    caption_info = {
+        "language": info.get("language"),
+        "subtitles": list(info.get("subtitles") or {}),
+        "requested_subtitles": info.get("requested_subtitles") or {},
+    }
+    caption_language, _ = _pick_caption_track(caption_info)
+    return {
+        "video_id": info.get("id"),
+        "title": info.get("title") or "",
+        "duration": info.get("duration"),
+        "live_status": info.get("live_status") or ("is_live" if info.get("is_live") else "not_live"),
+        "availability": info.get("availability"),
+        "has_captions": caption_language is not None,
+        "caption_language": caption_language,
+        "chapters": _chapters(info),
+        "caption_info": caption_info,
+    }
+
+
+def is_unavailable_error(exc):
+    '''True if a yt-dlp error says the video is private, removed or otherwise not fetchable.'''
+    message = str(exc).lower()
+    return any(part in message for part in UNAVAILABLE_ERRORS)
+
+
+def probe_video(url):
+    '''
+    Return the metadata of a video without downloading it. Results are
+    cached per video id for VIDEO_PROBE_TTL_SECONDS, so the API preview, the
+    job and the caption lookup share one request to YouTube. Raises
+    VideoRejected for unavailable videos; transient yt-dlp errors propagate.
+    '''
+    key = yt_url_to_id(url) or url
+    now = time.monotonic()
+    with _lock:
+        cached = _probes.get(key)
+        if cached and cached[0] > now:
+            _probes.move_to_end(key)
+            metrics.increment("video_probe.hits")
+            return cached[1]
+    metrics.increment("video_probe.misses")
+    print(f"-> Probing video metadata: {url}")
+    with metrics.timer("video_probe"):
+        with yt_dlp.YoutubeDL(dict(CAPTION_YDL_OPTS)) as ydl:
+            try:
+                info = ydl.extract_info(url, download=False)
+            except yt_dlp.utils.DownloadError as exc:
+                if not is_unavailable_error(exc):
+                    raise
+                # Private, removed, region-locked or not yet started; the download would fail too.
+                raise VideoRejected(f"Das Video ist nicht verfügbar: {exc}") from exc
+    probe = _summarize(info)
+    ttl = settings.VIDEO_PROBE_TTL_SECONDS
+    if probe["live_status"] != "not_live":
+        # A live or upcoming stream turns into a normal video when it ends.
+        ttl = min(ttl, settings.VIDEO_PROBE_LIVE_TTL_SECONDS)
+    with _lock:
+        _probes[key] = (now + ttl, probe)
+        _probes.move_to_end(key)
+        while len(_probes) > settings.VIDEO_PROBE_CACHE_SIZE:
+            _probes.popitem(last=False)
+    return probe
+
+
+def clear_cache():
+    '''Forget all probes (mainly for tests).'''
+    with _lock:
+        _probes.clear()
+
+
+def check_video(probe):
+    '''Raise VideoRejected if the pipeline should not start for this video.'''
+    if probe["live_status"] in REJECTED_LIVE_STATES:
+        raise VideoRejected("Livestreams können nicht verarbeitet werden.")
+    if probe["availability"] in REJECTED_AVAILABILITY:
+        raise VideoRejected("Das Video ist nicht öffentlich verfügbar.")
+    limit = settings.QUIZ_MAX_VIDEO_DURATION
+    if limit and probe["duration"] and probe["duration"] > limit:
+        raise VideoRejected(
+            f"Das Video ist zu lang ({int(probe['duration']) // 60} min, erlaubt sind höchstens {limit // 60} min)."
+        )
+
+
+def _observed_real_time_factor(backend_name):
+    '''Mean real-time factor of earlier transcriptions with this backend, or None.'''
+    return Quiz.objects.filter(
+        asr_backend=backend_name, asr_real_time_factor__isnull=False,
+    ).aggregate(rtf=Avg("asr_real_time_factor"))["rtf"]
+
+
+def estimate_cost(probe, quality=None, queue_depth=0):
+    '''
+    Estimate what the pipeline will do for a probed video: transcript source,
+    ASR backend and time, transcript size and number of LLM calls.
+    '''
+    duration = probe["duration"]
+    estimate = {"strategy": "captions" if probe["has_captions"] and settings.CAPTIONS_ENABLED else "asr"}
+    if estimate["strategy"] == "asr":
+        backend = asr_backends.route(duration=duration, queue_depth=queue_depth, quality=quality)
+        rtf = _observed_real_time_factor(backend.name)
+        estimate["asr_backend"] = backend.name
+        estimate["asr_seconds"] = round(duration * rtf) if duration and rtf else None
+    if not duration:
+        return estimate
+    tokens = int(duration * SPOKEN_TOKENS_PER_SECOND)
+    budget = settings.QUIZ_PROMPT_TOKEN_BUDGET
+    prompt_tokens = min(tokens, budget) if budget else tokens
+    map_reduce = bool(settings.QUIZ_MAP_REDUCE_MIN_TOKENS) and prompt_tokens >= settings.QUIZ_MAP_REDUCE_MIN_TOKENS
+    estimate["transcript_tokens"] = tokens
+    estimate["map_reduce"] = map_reduce
+    # One call per section plus the summary call, or one call for the whole transcript.
+    estimate["llm_calls"] = math.ceil(prompt_tokens / settings.QUIZ_MAP_SECTION_TOKENS) + 1 if map_reduce else 1
+    return estimate
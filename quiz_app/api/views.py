@@ -1,21 +1,41 @@
+import json
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Prefetch
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 
 from rest_framework import status, generics
+from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.exceptions import PermissionDenied
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
-from .serializers import CreateQuizSerializer, QuizReadSerializer
-from quiz_app.models import Quiz
+from .serializers import (
+    CreateQuizSerializer, QuizReadSerializer, QuizJobSerializer, CreateQuizBatchSerializer, QuizBatchSerializer,
+    VideoProbeSerializer, QuizSummarySerializer,
+)
+from .jobs import enqueue_quiz_job
+from .whisper_models import registry as whisper_models
+from .transcript_cache import get_transcript_cache
+from . import metrics, progress
+from quiz_app.models import Quiz, QuizJob, QuizBatch
 from .permissions import IsOwnerOrReadOnly
+from .pagination import KeysetPagination
+from .conditional import is_conditional, not_modified, quiz_detail_validators, quiz_list_validators, set_validators
+from .response_cache import get_quiz_read_cache
 from auth_app.api.authentication import CookieJWTAuthentication
 
 
 @method_decorator(csrf_exempt, name="dispatch")
 class CreateQuizView(generics.CreateAPIView):
-    '''API view to create a Quiz from a YouTube URL.'''
+    '''API view to queue the creation of a Quiz from a YouTube URL.'''
     serializer_class = CreateQuizSerializer
     permission_classes = [IsAuthenticated]
     authentication_classes = [CookieJWTAuthentication, JWTAuthentication]
@@ -24,20 +44,176 @@ class CreateQuizView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        quiz = serializer.save()
+        job = QuizJob.objects.create(
+            owner=request.user,
+            video_url=serializer.validated_data["url"],
+            quality=serializer.validated_data.get("quality", ""),
+        )
+        enqueue_quiz_job(job)
+        job.refresh_from_db()
 
-        out = QuizReadSerializer(quiz)
-        headers = self.get_success_headers(out.data)
-        return Response(out.data, status=status.HTTP_201_CREATED, headers=headers)
-    
-class QuizListView(generics.ListAPIView):
-    '''API view to list all Quizzes of the requesting user.'''
-    serializer_class = QuizReadSerializer
+        out = QuizJobSerializer(job)
+        headers = {"Location": reverse("quiz-job-detail", kwargs={"id": job.pk})}
+        return Response(out.data, status=status.HTTP_202_ACCEPTED, headers=headers)
+
+
+class VideoProbeView(APIView):
+    '''API view to check a video against the limits and estimate its cost before creating a quiz.'''
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTAuthentication, JWTAuthentication]
+
+    def get(self, request):
+        serializer = VideoProbeSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        try:
+            probe = serializer.probe()
+        except Exception as exc:
+            print(f"-> Metadata probe failed: {exc}")
+            return Response({"detail": "Die Videodaten konnten nicht abgerufen werden."}, status=status.HTTP_502_BAD_GATEWAY)
+        return Response(VideoProbeSerializer(probe).data, status=status.HTTP_200_OK)
+
+
+def _batches_with_jobs(user):
+    jobs = QuizJob.objects.order_by('created_at')
+    return QuizBatch.objects.filter(owner=user).prefetch_related(Prefetch('jobs', queryset=jobs))
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class CreateQuizBatchView(generics.CreateAPIView):
+    '''API view to queue quiz creation for a list of YouTube URLs as one batch.'''
+    serializer_class = CreateQuizBatchSerializer
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTAuthentication, JWTAuthentication]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        accepted, rejected = serializer.split_urls()
+        if not accepted:
+            return Response({"urls": rejected}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            batch = QuizBatch.objects.create(owner=request.user, rejected=rejected)
+            jobs = QuizJob.objects.bulk_create(
+                [
+                    QuizJob(owner=request.user, video_url=url, batch=batch,
+                            quality=serializer.validated_data.get("quality", ""))
+                    for url in accepted
+                ]
+            )
+        # All jobs run on the shared worker pool of this process, so they
+        # reuse the loaded Whisper models and the pooled Gemini client.
+        for job in jobs:
+            enqueue_quiz_job(job)
+
+        out = QuizBatchSerializer(_batches_with_jobs(request.user).get(pk=batch.pk))
+        headers = {"Location": reverse("quiz-batch-detail", kwargs={"id": batch.pk})}
+        return Response(out.data, status=status.HTTP_202_ACCEPTED, headers=headers)
+
+
+class QuizBatchDetailView(generics.RetrieveAPIView):
+    '''API view to poll the aggregate progress and per-URL status of a batch.'''
+    serializer_class = QuizBatchSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_field = 'id'
+
+    def get_queryset(self):
+        return _batches_with_jobs(self.request.user)
+
+
+class QuizJobDetailView(generics.RetrieveAPIView):
+    '''API view to poll the status and result of a quiz generation job.'''
+    serializer_class = QuizJobSerializer
     permission_classes = [IsAuthenticated]
+    lookup_field = 'id'
 
     def get_queryset(self):
         user = self.request.user
-        return Quiz.objects.filter(owner=user)
+        return QuizJob.objects.filter(owner=user).select_related('quiz').prefetch_related('quiz__questions')
+
+
+class EventStreamRenderer(BaseRenderer):
+    '''Lets clients ask for text/event-stream; only error responses are rendered by it.'''
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode("utf-8")
+
+
+class QuizJobEventsView(APIView):
+    '''
+    Server-sent events with the progress of a job, ending with the quiz or the
+    error. When too many streams are open, answers 503 with the job URL to poll.
+    '''
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def get(self, request, id):
+        job = get_object_or_404(QuizJob, pk=id, owner=request.user)
+        try:
+            last_event_id = int(request.headers.get("Last-Event-ID") or 0)
+        except ValueError:
+            last_event_id = 0
+
+        stream = progress.open_event_stream(
+            job.pk, last_event_id,
+            poll_seconds=settings.QUIZ_EVENTS_POLL_SECONDS,
+            heartbeat_seconds=settings.QUIZ_EVENTS_HEARTBEAT_SECONDS,
+            timeout=settings.QUIZ_EVENTS_STREAM_TIMEOUT,
+        )
+        if stream is None:
+            poll_url = reverse("quiz-job-detail", kwargs={"id": job.pk})
+            return Response(
+                {"detail": "Zu viele offene Fortschritts-Streams. Bitte den Job-Status abfragen.", "poll": poll_url},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(int(settings.QUIZ_EVENTS_POLL_SECONDS) or 1), "Link": f'<{poll_url}>; rel="alternate"'},
+            )
+        response = StreamingHttpResponse(stream, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+def quiz_list(request):
+    '''
+    Return (queryset, serializer class) for a user's quiz list: summaries with
+    a question count from SQL, or the full quizzes with ?expand=questions.
+    '''
+    quizzes = Quiz.objects.filter(owner=request.user)
+    if "questions" in request.query_params.get("expand", "").split(","):
+        return quizzes.prefetch_related('questions'), QuizReadSerializer
+    return quizzes.annotate(question_count=Count('questions')), QuizSummarySerializer
+
+
+class QuizListView(generics.ListAPIView):
+    '''API view to list the Quizzes of the requesting user, newest first, one page at a time.'''
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return quiz_list(self.request)[0]
+
+    def get_serializer_class(self):
+        return quiz_list(self.request)[1]
+
+    def list(self, request, *args, **kwargs):
+        conditional = is_conditional(request)
+        if conditional:
+            response = not_modified(request, *quiz_list_validators(request))
+            if response is not None:
+                return response
+        reads = get_quiz_read_cache()
+        key, entry = reads.list_entry(request.user.pk, sorted(request.query_params.lists()), request.headers.get("Accept", ""))
+        # A conditional request has paid for the validators anyway: use them to skip an outdated entry.
+        if entry is not None and (not conditional or entry["headers"].get("ETag") == quiz_list_validators(request)[0]):
+            return Response(entry["data"], headers=entry["headers"])
+        # Validators before the data: a write in between then only makes the ETag older than the body.
+        validators = quiz_list_validators(request)
+        response = set_validators(super().list(request, *args, **kwargs), *validators)
+        reads.store(key, response.data, dict(response.items()))
+        return response
 
 
 class QuizDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -49,7 +225,22 @@ class QuizDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return Quiz.objects.filter(owner=user)
+        return Quiz.objects.filter(owner=user).prefetch_related('questions')
+
+    def retrieve(self, request, *args, **kwargs):
+        conditional = is_conditional(request)
+        if conditional:
+            response = not_modified(request, *quiz_detail_validators(request, kwargs['id']))
+            if response is not None:
+                return response
+        reads = get_quiz_read_cache()
+        key, entry = reads.quiz_entry(request.user.pk, kwargs['id'], request.headers.get("Accept", ""))
+        if entry is not None and (not conditional or entry["headers"].get("ETag") == quiz_detail_validators(request, kwargs['id'])[0]):
+            return Response(entry["data"], headers=entry["headers"])
+        validators = quiz_detail_validators(request, kwargs['id'])
+        response = set_validators(super().retrieve(request, *args, **kwargs), *validators)
+        reads.store(key, response.data, dict(response.items()))
+        return response
 
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', True)
@@ -74,3 +265,16 @@ class QuizDetailView(generics.RetrieveUpdateDestroyAPIView):
             raise
         except Exception as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class MetricsView(APIView):
+    '''API view exposing the in-process pipeline metrics to staff users.'''
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        data = metrics.snapshot()
+        data["whisper_models"] = whisper_models.stats()
+        data["transcript_cache"] = get_transcript_cache().stats()
+        data["quiz_read_cache"] = get_quiz_read_cache().stats()
+        data["process"] = metrics.process_memory()
+        return Response(data, status=status.HTTP_200_OK)
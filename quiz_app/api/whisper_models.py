@@ -0,0 +1,110 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import torch
+import whisper
+from django.conf import settings
+
+from . import metrics
+from .quantization import quantize_model
+
+
+def model_resident_bytes(model):
+    '''Return the memory held by the parameters and buffers of a torch model.'''
+    tensors = []
+    for value in model.state_dict(keep_vars=True).values():
+        # Quantized linears keep their int8 weight and bias as a packed tuple.
+        tensors.extend(value if isinstance(value, tuple) else [value])
+    return sum(t.numel() * t.element_size() for t in tensors if isinstance(t, torch.Tensor))
+
+
+class _ModelEntry:
+    def __init__(self):
+        self.model = None
+        self.load_seconds = None
+        self.resident_bytes = None
+        self.load_lock = threading.Lock()
+        # Whisper installs kv-cache hooks on the shared decoder during
+        # transcribe(), so two decodes on one model must not overlap.
+        self.inference_lock = threading.Lock()
+
+
+def model_key(name, quantized=False):
+    '''Name under which a model variant is cached and reported, e.g. "base-int8".'''
+    return f"{name}-int8" if quantized else name
+
+
+class WhisperModelRegistry:
+    '''
+    Loads every Whisper model at most once per process and hands it out to
+    threads. With WHISPER_QUANTIZE the int8 variant is built on first use
+    and cached like any other model.
+    '''
+
+    def __init__(self, loader=None):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _entry(self, name):
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _ModelEntry()
+            return self._entries[name]
+
+    def get(self, name, quantized=None):
+        '''Return the loaded model, loading it on first use.'''
+        if quantized is None:
+            quantized = settings.WHISPER_QUANTIZE
+        key = model_key(name, quantized)
+        entry = self._entry(key)
+        with entry.load_lock:
+            if entry.model is None:
+                print(f"-> Loading Whisper model '{key}'...")
+                started = time.perf_counter()
+                model = (self._loader or whisper.load_model)(name)
+                if quantized:
+                    model = quantize_model(model)
+                entry.load_seconds = time.perf_counter() - started
+                entry.resident_bytes = model_resident_bytes(model)
+                entry.model = model
+                metrics.set_gauge(f"whisper.{key}.load_seconds", round(entry.load_seconds, 3))
+                metrics.set_gauge(f"whisper.{key}.resident_bytes", entry.resident_bytes)
+                print(
+                    f"-> Whisper model '{key}' loaded in {entry.load_seconds:.2f}s "
+                    f"({entry.resident_bytes / 1024 / 1024:.1f} MB resident)."
+                )
+        return entry.model
+
+    @contextmanager
+    def use(self, name, quantized=None):
+        '''Yield the model for one transcription, serialising inference per model.'''
+        if quantized is None:
+            quantized = settings.WHISPER_QUANTIZE
+        model = self.get(name, quantized)
+        with self._entry(model_key(name, quantized)).inference_lock:
+            yield model
+
+    def warm_up(self, names=None):
+        '''Eagerly load the given (or configured) models.'''
+        for name in names if names is not None else settings.WHISPER_WARMUP_MODELS:
+            self.get(name)
+
+    def stats(self):
+        '''Return load time and resident size of every loaded model.'''
+        with self._lock:
+            entries = dict(self._entries)
+        return {
+            name: {"load_seconds": entry.load_seconds, "resident_bytes": entry.resident_bytes}
+            for name, entry in entries.items()
+            if entry.model is not None
+        }
+
+    def clear(self):
+        '''Drop all loaded models (mainly for tests).'''
+        with self._lock:
+            self._entries.clear()
+
+
+registry = WhisperModelRegistry()
@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+import yt_dlp
+import yt_dlp.update as yt_dlp_update
+from yt_dlp.version import __version__ as installed_version
+from django.conf import settings
+
+
+class YtDlpVersionManager:
+    '''
+    Checks for yt-dlp updates outside the request path. The last result is
+    kept in a small JSON state file (shared by all worker processes and the
+    management command) and reused until it is older than the TTL.
+    '''
+
+    def __init__(self, state_path, ttl_seconds):
+        self.state_path = str(state_path)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+    def status(self):
+        '''Return the cached check result without touching the network.'''
+        try:
+            with open(self.state_path, encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_status(self, state):
+        directory = os.path.dirname(self.state_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(state, fh)
+        os.replace(tmp_path, self.state_path)
+
+    def is_stale(self, state=None):
+        state = self.status() if state is None else state
+        return time.time() - state.get("checked_at", 0) > self.ttl_seconds
+
+    def _updater(self):
+        return yt_dlp_update.Updater(yt_dlp.YoutubeDL({"quiet": True}))
+
+    def check(self, force=False):
+        '''Query for a newer yt-dlp release unless the cached result is still fresh.'''
+        with self._lock:
+            previous = self.status()
+            if not force and previous and not self.is_stale(previous):
+                return previous
+
+            print("-> Checking yt-dlp version...")
+            state = {"checked_at": time.time(), "current": installed_version, "latest": None, "error": None}
+            if previous.get("restart_required") and previous.get("current") == installed_version:
+                state["restart_required"] = True
+            try:
+                update_info = self._updater().query_update(_output=False)
+            except Exception as exc:
+                state["error"] = str(exc)
+                print(f"-> yt-dlp version check failed: {exc}")
+            else:
+                state["latest"] = (update_info.version or update_info.tag) if update_info else installed_version
+                print(f"-> yt-dlp {installed_version} installed, latest is {state['latest']}.")
+            state["update_available"] = bool(state["latest"]) and state["latest"] != installed_version
+            self._write_status(state)
+            return state
+
+    def should_update(self, state):
+        '''True if a newer release is known and has not been installed yet.'''
+        return bool(state.get("update_available")) and not state.get("restart_required")
+
+    def apply_update(self):
+        '''Install a pending update. Must only run while no job uses yt-dlp.'''
+        with self._lock:
+            print("-> Updating yt-dlp...")
+            try:
+                updated = bool(self._updater().update())
+            except Exception as exc:
+                print(f"-> yt-dlp update failed: {exc}")
+                updated = False
+            state = self.status()
+            state["update_applied"] = updated
+            if updated:
+                # The running interpreter keeps the old module until the workers restart.
+                state["update_available"] = False
+                state["restart_required"] = True
+                print("-> yt-dlp successfully updated (restart workers to load it).")
+            else:
+                print("-> yt-dlp update was skipped or failed.")
+            self._write_status(state)
+            return updated
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_version_manager():
+    '''Return the process-wide yt-dlp version manager configured in settings.'''
+    global _manager
+    with _manager_lock:
+        state_path = str(settings.YT_DLP_VERSION_STATE)
+        ttl = settings.YT_DLP_UPDATE_CHECK_TTL
+        if _manager is None or (_manager.state_path, _manager.ttl_seconds) != (state_path, ttl):
+            _manager = YtDlpVersionManager(state_path, ttl)
+        return _manager
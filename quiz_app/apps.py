@@ -1,7 +1,36 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+
+
+def serves_requests_here():
+    '''
+    True in the process that serves `manage.py runserver` (the reloader's
+    child, or the only process with --noreload). gunicorn warms up in its
+    master instead (gunicorn.conf.py); other commands never need the models.
+    '''
+    if sys.argv[1:2] != ["runserver"]:
+        return False
+    return os.environ.get("RUN_MAIN") == "true" or "--noreload" in sys.argv
 
 
 class QuizAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quiz_app'
     verbose_name = "Quizzly App"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from quiz_app.api.response_cache import invalidate_saved_question, invalidate_saved_quiz
+
+        # Admin, shell and API writes alike drop the cached quiz reads.
+        post_save.connect(invalidate_saved_quiz, sender="quiz_app.Quiz", dispatch_uid="quiz-reads-save")
+        post_delete.connect(invalidate_saved_quiz, sender="quiz_app.Quiz", dispatch_uid="quiz-reads-delete")
+        post_save.connect(invalidate_saved_question, sender="quiz_app.Question", dispatch_uid="quiz-reads-question-save")
+        post_delete.connect(invalidate_saved_question, sender="quiz_app.Question", dispatch_uid="quiz-reads-question-delete")
+
+        if settings.WHISPER_WARMUP_MODELS and serves_requests_here():
+            from quiz_app.api.whisper_models import registry
+            registry.warm_up()
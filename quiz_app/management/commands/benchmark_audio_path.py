@@ -0,0 +1,60 @@
+import resource
+import tempfile
+import time
+
+import whisper
+from django.core.management.base import BaseCommand
+
+from quiz_app.api import utils
+
+
+def cpu_seconds():
+    '''User + system CPU time of this process and its finished children (ffmpeg).'''
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def legacy_path(url, output_dir):
+    '''Previous pipeline: transcode to 192 kbps MP3, then let Whisper decode the MP3.'''
+    mp3_path = utils.download_audio(url, output_dir=output_dir)
+    return whisper.load_audio(mp3_path)
+
+
+def direct_path(url, output_dir):
+    '''Current pipeline: decode the downloaded stream once into the Whisper buffer.'''
+    return utils.download_audio_pcm(url, output_dir=output_dir)
+
+
+class Command(BaseCommand):
+    help = "Compare wall time and CPU seconds of the MP3 re-encode audio path with direct decoding."
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="YouTube URL to benchmark with.")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per path (default: 3).")
+        parser.add_argument(
+            "--transcribe", action="store_true",
+            help="Also run Whisper on the decoded audio (identical work for both paths).",
+        )
+
+    def handle(self, *args, **options):
+        paths = {"mp3 re-encode": legacy_path, "direct decode": direct_path}
+        results = {name: [] for name in paths}
+
+        for run in range(1, options["repeat"] + 1):
+            for name, fn in paths.items():
+                with tempfile.TemporaryDirectory(prefix="quizly-bench-") as tmp:
+                    wall_start, cpu_start = time.perf_counter(), cpu_seconds()
+                    audio = fn(options["url"], tmp)
+                    if options["transcribe"]:
+                        utils.transcript_audio(audio)
+                    wall, cpu = time.perf_counter() - wall_start, cpu_seconds() - cpu_start
+                results[name].append((wall, cpu, len(audio)))
+                self.stdout.write(f"run {run} {name:>14}: wall {wall:7.2f}s  cpu {cpu:7.2f}s")
+
+        self.stdout.write("")
+        self.stdout.write(f"{'path':>14}  {'avg wall':>9}  {'avg cpu':>9}  {'samples':>10}")
+        for name, samples in results.items():
+            avg_wall = sum(s[0] for s in samples) / len(samples)
+            avg_cpu = sum(s[1] for s in samples) / len(samples)
+            self.stdout.write(f"{name:>14}  {avg_wall:8.2f}s  {avg_cpu:8.2f}s  {samples[-1][2]:>10}")
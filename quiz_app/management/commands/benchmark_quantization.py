@@ -0,0 +1,73 @@
+import time
+
+import numpy as np
+import torch
+import whisper
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz_app.api.quantization import word_error_rate
+from quiz_app.api.utils import TRANSCRIBE_OPTIONS
+from quiz_app.api.whisper_models import registry as whisper_models
+
+
+class Command(BaseCommand):
+    help = "Compare latency and word error rate of the int8-quantized Whisper model against fp32 on reference clips."
+
+    def add_arguments(self, parser):
+        parser.add_argument("clips", nargs="+", help="Audio or video files of the reference clip set.")
+        parser.add_argument(
+            "--references", nargs="+", default=None,
+            help="Text files with the correct transcript of each clip (same order). "
+                 "Without them the fp32 output is the reference.",
+        )
+        parser.add_argument("--model", default=None, help="Whisper model (default: WHISPER_MODEL).")
+        parser.add_argument("--threads", type=int, default=1, help="Torch threads (1 = throughput per core).")
+
+    def handle(self, *args, **options):
+        clips = options["clips"]
+        references = options["references"]
+        if references is not None and len(references) != len(clips):
+            raise CommandError("Pass one reference transcript per clip.")
+        model_name = options["model"] or settings.WHISPER_MODEL
+        torch.set_num_threads(options["threads"])
+        self.stdout.write(f"model '{model_name}', {options['threads']} torch thread(s)")
+
+        # Load both variants (and run them once) outside the measurement.
+        silence = np.zeros(whisper.audio.SAMPLE_RATE, dtype=np.float32)
+        for quantized in (False, True):
+            with whisper_models.use(model_name, quantized=quantized) as model:
+                model.transcribe(silence, **TRANSCRIBE_OPTIONS)
+
+        totals = {"audio": 0.0, "fp32": 0.0, "int8": 0.0, "fp32_wer": [], "int8_wer": []}
+        for index, path in enumerate(clips):
+            audio = whisper.load_audio(path)
+            totals["audio"] += len(audio) / whisper.audio.SAMPLE_RATE
+            texts, elapsed = {}, {}
+            for label, quantized in (("fp32", False), ("int8", True)):
+                with whisper_models.use(model_name, quantized=quantized) as model:
+                    started = time.perf_counter()
+                    texts[label] = model.transcribe(audio, **TRANSCRIBE_OPTIONS)["text"].strip()
+                    elapsed[label] = time.perf_counter() - started
+                totals[label] += elapsed[label]
+            if references is not None:
+                with open(references[index], encoding="utf-8") as file:
+                    reference = file.read()
+                totals["fp32_wer"].append(word_error_rate(reference, texts["fp32"]))
+            else:
+                reference = texts["fp32"]
+            totals["int8_wer"].append(word_error_rate(reference, texts["int8"]))
+            fp32_wer = f"{totals['fp32_wer'][-1]:.3f}" if references is not None else "  ref"
+            self.stdout.write(
+                f"{path}: fp32 {elapsed['fp32']:.1f}s WER {fp32_wer}  "
+                f"int8 {elapsed['int8']:.1f}s WER {totals['int8_wer'][-1]:.3f}"
+            )
+
+        fp32_wer = f"{np.mean(totals['fp32_wer']):.3f}" if references is not None else "  ref"
+        for label in ("fp32", "int8"):
+            wer = fp32_wer if label == "fp32" else f"{np.mean(totals['int8_wer']):.3f}"
+            self.stdout.write(
+                f"{label}: {totals[label]:8.1f}s  real-time factor {totals[label] / totals['audio']:.3f}  "
+                f"mean WER {wer}"
+            )
+        self.stdout.write(f"int8 speedup {totals['fp32'] / totals['int8']:.2f}x")
@@ -0,0 +1,54 @@
+import difflib
+import time
+
+import whisper
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from quiz_app.api.chunked_transcription import ChunkedTranscriber
+from quiz_app.api.utils import TRANSCRIBE_OPTIONS
+from quiz_app.api.whisper_models import registry as whisper_models
+
+
+class Command(BaseCommand):
+    help = "Measure the speedup of chunked parallel transcription against serial Whisper per worker count."
+
+    def add_arguments(self, parser):
+        parser.add_argument("audio", help="Audio or video file to transcribe.")
+        parser.add_argument("--workers", type=int, nargs="+", default=[2, 4], help="Worker counts to try.")
+        parser.add_argument("--model", default=None, help="Whisper model (default: WHISPER_MODEL).")
+        parser.add_argument("--window", type=int, default=settings.WHISPER_PARALLEL_WINDOW_SECONDS)
+        parser.add_argument("--overlap", type=int, default=settings.WHISPER_PARALLEL_OVERLAP_SECONDS)
+
+    def handle(self, *args, **options):
+        model_name = options["model"] or settings.WHISPER_MODEL
+        audio = whisper.load_audio(options["audio"])
+        duration = len(audio) / whisper.audio.SAMPLE_RATE
+        self.stdout.write(f"{duration:.0f}s of audio, model '{model_name}'")
+
+        with whisper_models.use(model_name) as model:
+            started = time.perf_counter()
+            reference = model.transcribe(audio, **TRANSCRIBE_OPTIONS)["text"].strip()
+            serial = time.perf_counter() - started
+        self.stdout.write(f"{'serial':>10}: {serial:8.1f}s  speedup 1.00x")
+
+        for workers in options["workers"]:
+            transcriber = ChunkedTranscriber(
+                model_name, workers,
+                window_seconds=options["window"],
+                overlap_seconds=options["overlap"],
+                options=TRANSCRIBE_OPTIONS,
+            )
+            try:
+                # Start the pool (and load the models) outside the measurement.
+                transcriber.warm_up()
+                started = time.perf_counter()
+                text = transcriber.transcribe(audio)["text"]
+                elapsed = time.perf_counter() - started
+            finally:
+                transcriber.shutdown()
+            similarity = difflib.SequenceMatcher(None, reference.split(), text.split()).ratio()
+            self.stdout.write(
+                f"{workers:>3} workers: {elapsed:8.1f}s  speedup {serial / elapsed:.2f}x  "
+                f"word similarity {similarity:.3f}"
+            )
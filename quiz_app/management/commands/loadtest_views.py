@@ -0,0 +1,78 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_load(client, url, requests, concurrency):
+    '''Send requests GETs to url with at most concurrency in flight; returns (seconds, latencies, errors).'''
+    latencies, errors = [], 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await client.get(url)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+
+class Command(BaseCommand):
+    help = "Load-test the sync and the async quiz views of a running server and compare throughput and latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Server to test.")
+        parser.add_argument("--user", help="Username to create an access token for (this database).")
+        parser.add_argument("--token", help="Access token to use instead of --user.")
+        parser.add_argument("--quiz", type=int, help="Quiz id for the detail views (default: list views only).")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per view and concurrency level.")
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 200])
+
+    def handle(self, *args, **options):
+        token = options["token"]
+        if not token:
+            if not options["user"]:
+                raise CommandError("Pass --user or --token.")
+            token = str(AccessToken.for_user(get_user_model().objects.get(username=options["user"])))
+
+        views = [("sync list", reverse("quiz-list")), ("async list", reverse("async-quiz-list"))]
+        if options["quiz"]:
+            views += [
+                ("sync detail", reverse("quiz-detail", kwargs={"id": options["quiz"]})),
+                ("async detail", reverse("async-quiz-detail", kwargs={"id": options["quiz"]})),
+            ]
+        asyncio.run(self._run(options, token, views))
+
+    async def _run(self, options, token, views):
+        limits = httpx.Limits(max_connections=max(options["concurrency"]), max_keepalive_connections=max(options["concurrency"]))
+        async with httpx.AsyncClient(
+            base_url=options["base_url"], headers={"Authorization": f"Bearer {token}"}, limits=limits, timeout=60,
+        ) as client:
+            self.stdout.write(f"{'view':>12} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}")
+            for concurrency in options["concurrency"]:
+                for name, url in views:
+                    elapsed, latencies, errors = await run_load(client, url, options["requests"], concurrency)
+                    self.stdout.write(
+                        f"{name:>12} {concurrency:>5} {len(latencies) / elapsed:8.1f} "
+                        f"{statistics.median(latencies) * 1000:8.1f} {percentile(latencies, 0.95) * 1000:8.1f} "
+                        f"{percentile(latencies, 0.99) * 1000:8.1f} {errors:>6}"
+                    )
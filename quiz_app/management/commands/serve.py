@@ -0,0 +1,41 @@
+import os
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Run the production server: gunicorn with DEBUG off and the app and Whisper models preloaded."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default=None, help="Address to listen on (default: 0.0.0.0:8000).")
+        parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: 2).")
+        parser.add_argument("--threads", type=int, default=None, help="Request threads per worker (default: 8).")
+        parser.add_argument(
+            "--models", default=None,
+            help="Comma-separated Whisper models to preload (default: WHISPER_WARMUP_MODELS or WHISPER_MODEL).",
+        )
+
+    def gunicorn_environ(self, options):
+        '''Environment of the gunicorn process: production settings and the chosen profile.'''
+        env = dict(os.environ, DEBUG="0")
+        env["WHISPER_WARMUP_MODELS"] = options["models"] or ",".join(
+            settings.WHISPER_WARMUP_MODELS or [settings.WHISPER_MODEL]
+        )
+        for option, variable in (("bind", "GUNICORN_BIND"), ("workers", "GUNICORN_WORKERS"), ("threads", "GUNICORN_THREADS")):
+            if options[option] is not None:
+                env[variable] = str(options[option])
+        return env
+
+    def handle(self, *args, **options):
+        env = self.gunicorn_environ(options)
+        argv = [
+            sys.executable, "-m", "gunicorn",
+            "--config", str(settings.BASE_DIR / "gunicorn.conf.py"),
+            "core.wsgi:application",
+        ]
+        self.stdout.write(f"-> Starting gunicorn, preloading Whisper models: {env['WHISPER_WARMUP_MODELS']}")
+        self.stdout.flush()
+        # Replace this process, so gunicorn's master gets the signals directly.
+        os.execve(sys.executable, argv, env)
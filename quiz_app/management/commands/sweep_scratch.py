@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from quiz_app.api.scratch import get_scratch_space
+
+
+class Command(BaseCommand):
+    help = "Delete scratch directories left behind by crashed workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age", type=int, default=None,
+            help="Also delete directories older than this many seconds (default: SCRATCH_ORPHAN_SECONDS).",
+        )
+
+    def handle(self, *args, **options):
+        scratch = get_scratch_space()
+        if options["max_age"] is not None:
+            scratch.orphan_seconds = options["max_age"]
+        removed = scratch.sweep()
+        self.stdout.write(f"Removed {removed} orphaned scratch directories from {scratch.root}; "
+                          f"{scratch.usage() / 1024 / 1024:.1f} MB in use.")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from quiz_app.api.ytdlp_version import get_version_manager
+
+
+class Command(BaseCommand):
+    help = "Check for (and optionally install) yt-dlp updates outside the request path, e.g. from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Ignore the cached result and query now.")
+        parser.add_argument("--apply", action="store_true", help="Install an available update.")
+
+    def handle(self, *args, **options):
+        manager = get_version_manager()
+        state = manager.check(force=options["force"])
+        self.stdout.write(
+            f"installed: {state.get('current')}  latest: {state.get('latest')}  "
+            f"update available: {state.get('update_available')}"
+        )
+        if state.get("error"):
+            self.stderr.write(f"check failed: {state['error']}")
+        if options["apply"] and manager.should_update(state):
+            if manager.apply_update():
+                self.stdout.write(self.style.SUCCESS("yt-dlp updated, restart the workers to load it."))
+            else:
+                self.stderr.write("yt-dlp update was skipped or failed.")
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.25 on 2026-10-18 18:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0005_quizjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='llm_latency_ms',
+            field=models.PositiveIntegerField(blank=True, help_text='Duration of the LLM call', null=True),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='prompt_tokens',
+            field=models.PositiveIntegerField(blank=True, help_text='Tokens of the prompt sent to the LLM', null=True),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='transcript_tokens',
+            field=models.PositiveIntegerField(blank=True, help_text='Tokens of the full transcript', null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.25 on 2026-10-18 18:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0007_quizbatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizJobEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(max_length=64)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='quiz_app.quizjob')),
+            ],
+            options={
+                'verbose_name': 'Quiz Job Event',
+                'verbose_name_plural': 'Quiz Job Events',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.25 on 2026-10-18 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0008_quizjobevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='asr_backend',
+            field=models.CharField(blank=True, help_text='Source of the transcript (captions or ASR model)', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='asr_real_time_factor',
+            field=models.FloatField(blank=True, help_text='Transcription time / audio length', null=True),
+        ),
+        migrations.AddField(
+            model_name='quizjob',
+            name='quality',
+            field=models.CharField(blank=True, choices=[('fast', 'Fast'), ('balanced', 'Balanced'), ('best', 'Best')], max_length=16),
+        ),
+    ]
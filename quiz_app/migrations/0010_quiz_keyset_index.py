@@ -0,0 +1,21 @@
+# Generated by Django 4.2.25 on 2026-10-18 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0009_asr_backend'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='quiz',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Quiz', 'verbose_name_plural': 'Quizzes'},
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='quiz_owner_created_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-18 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz_app', '0010_quiz_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizjob',
+            name='worker',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.conf import settings
 
@@ -13,17 +15,26 @@ class Quiz(models.Model):
         db_index=True,
         help_text="Ersteller des Quizzes"
     )
+    transcript_tokens = models.PositiveIntegerField(null=True, blank=True, help_text="Tokens of the full transcript")
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True, help_text="Tokens of the prompt sent to the LLM")
+    llm_latency_ms = models.PositiveIntegerField(null=True, blank=True, help_text="Duration of the LLM call")
+    asr_backend = models.CharField(max_length=32, blank=True, help_text="Source of the transcript (captions or ASR model)")
+    asr_real_time_factor = models.FloatField(null=True, blank=True, help_text="Transcription time / audio length")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
         constraints = [
             models.UniqueConstraint(
                 fields=['video_url'],
                 name='unique_quiz_per_video_url'
             )
         ]
+        indexes = [
+            # Keyset pagination of a user's quizzes seeks on (created_at, id).
+            models.Index(fields=['owner', '-created_at', '-id'], name='quiz_owner_created_idx'),
+        ]
         verbose_name = 'Quiz'
         verbose_name_plural = 'Quizzes'
 
@@ -43,4 +54,83 @@ class Question(models.Model):
         ordering = ['id']
 
     def __str__(self):
-        return f"{self.quiz.title} - {self.question_title}"
\ No newline at end of file
+        return f"{self.quiz.title} - {self.question_title}"
+
+
+class QuizBatch(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='quiz_batches',
+    )
+    # URLs that were rejected when the batch was submitted, as [{"url": ..., "errors": [...]}].
+    rejected = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Quiz Batch'
+        verbose_name_plural = 'Quiz Batches'
+
+    def __str__(self):
+        return f"Batch {self.pk} ({self.owner})"
+
+
+class QuizJob(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        SUCCEEDED = 'succeeded', 'Succeeded'
+        FAILED = 'failed', 'Failed'
+
+    class Quality(models.TextChoices):
+        FAST = 'fast', 'Fast'
+        BALANCED = 'balanced', 'Balanced'
+        BEST = 'best', 'Best'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='quiz_jobs',
+    )
+    video_url = models.URLField()
+    quality = models.CharField(max_length=16, choices=Quality.choices, blank=True)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING, db_index=True)
+    quiz = models.ForeignKey(Quiz, related_name='jobs', on_delete=models.SET_NULL, null=True, blank=True)
+    batch = models.ForeignKey(QuizBatch, related_name='jobs', on_delete=models.CASCADE, null=True, blank=True)
+    error = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Process running the job ({"host", "pid", "started"}), so a restart can tell its jobs are lost.
+    worker = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Quiz Job'
+        verbose_name_plural = 'Quiz Jobs'
+
+    def __str__(self):
+        return f"{self.video_url} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.Status.SUCCEEDED, self.Status.FAILED)
+
+
+class QuizJobEvent(models.Model):
+    job = models.ForeignKey(QuizJob, related_name='events', on_delete=models.CASCADE)
+    type = models.CharField(max_length=64)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Quiz Job Event'
+        verbose_name_plural = 'Quiz Job Events'
+
+    def __str__(self):
+        return f"{self.job_id}: {self.type}"
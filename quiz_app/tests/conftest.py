@@ -64,3 +64,55 @@ def mock_quiz_generation(monkeypatch, fake_quiz_payload):
         "_generate_quiz_from_transcript",
         fake_generate,
     )
+
+
+@pytest.fixture(autouse=True)
+def eager_quiz_jobs(settings):
+    """
+    Quiz-Jobs laufen in Tests direkt im Request-Thread statt im Worker-Pool,
+    damit sie dieselbe Test-Datenbank-Transaktion sehen.
+    """
+    settings.QUIZ_JOB_EAGER = True
+
+
+@pytest.fixture(autouse=True)
+def isolated_transcript_cache(settings, tmp_path):
+    """Transkript-Cache, Lock-Dateien und Arbeitsverzeichnisse in ein temporäres Verzeichnis umleiten."""
+    settings.TRANSCRIPT_CACHE_DIR = tmp_path / "transcript_cache"
+    settings.QUIZ_LOCK_DIR = tmp_path / "locks"
+    settings.SCRATCH_DIR = tmp_path / "scratch"
+
+
+@pytest.fixture(autouse=True)
+def no_caption_lookup(settings):
+    """Keine echten Untertitel-Abfragen bei YouTube in Tests."""
+    settings.CAPTIONS_ENABLED = False
+
+
+@pytest.fixture(autouse=True)
+def no_video_probe(settings):
+    """Keine echten Metadaten-Abfragen bei YouTube in Tests."""
+    settings.VIDEO_PROBE_ENABLED = False
+    from quiz_app.api import video_probe
+
+    video_probe.clear_cache()
+
+
+@pytest.fixture(autouse=True)
+def empty_quiz_read_cache(settings):
+    """Jeder Test beginnt mit leerem Antwort-Cache im Speicher (Ids wiederholen sich zwischen Tests)."""
+    from django.core.cache import caches
+
+    settings.CACHES = {
+        **settings.CACHES,
+        "quiz_reads": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "quiz-reads-tests"},
+    }
+    caches["quiz_reads"].clear()
+
+
+@pytest.fixture(autouse=True, scope="session")
+def loaded_tokenizer():
+    """Tokenizer vorab vollständig laden, damit Tokenzahlen in allen Tests gleich gezählt werden."""
+    from quiz_app.api.transcript_budget import load_encoding
+
+    load_encoding()
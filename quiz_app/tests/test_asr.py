@@ -0,0 +1,100 @@
+import json
+
+import numpy as np
+from django.urls import reverse
+import pytest
+
+from quiz_app.api import asr, utils
+from quiz_app.api import serializers as quiz_serializers
+from quiz_app.models import Quiz, QuizJob
+
+REAL_GENERATE = quiz_serializers.CreateQuizSerializer._generate_quiz_from_transcript
+
+
+@pytest.fixture(autouse=True)
+def routing_settings(settings):
+    settings.WHISPER_MODEL = "base"
+    settings.ASR_BACKENDS = ["tiny", "base", "small", "tiny.en", "base.en", "small.en"]
+    settings.ASR_LANGUAGE = ""
+    settings.ASR_SHORT_CLIP_SECONDS = 300
+    settings.ASR_LONG_RECORDING_SECONDS = 1800
+    settings.ASR_BUSY_QUEUE_DEPTH = 4
+
+
+@pytest.mark.parametrize("duration, queue_depth, quality, expected", [
+    (600, 0, None, "base"),         # mittlere Länge: Standardmodell
+    (60, 0, None, "small"),         # kurzer Clip: besseres Modell
+    (3 * 3600, 0, None, "tiny"),    # lange Vorlesung: schnelleres Modell
+    (600, 5, None, "tiny"),         # volle Warteschlange: schnelleres Modell
+    (60, 0, "best", "small"),       # nie über das größte Modell hinaus
+    (600, 0, "fast", "tiny"),
+    (3 * 3600, 5, "best", "tiny"),
+    (None, 0, None, "base"),        # Länge unbekannt (Pipeline-Modus)
+])
+def test_route_by_duration_load_and_quality(duration, queue_depth, quality, expected):
+    backend = asr.registry.route(duration=duration, queue_depth=queue_depth, quality=quality)
+
+    assert backend.name == expected
+
+
+def test_english_audio_uses_english_only_models(settings):
+    assert asr.registry.route(duration=60, language="en").name == "small.en"
+
+    settings.ASR_BACKENDS = ["tiny", "base"]
+    assert asr.registry.route(duration=60, language="en").name == "base"
+
+
+def test_backends_can_be_plugged_in(settings):
+    class CloudBackend(asr.AsrBackend):
+        name = "cloud"
+        tier = 5
+
+        def transcribe(self, audio):
+            return "aus der Cloud"
+
+    registry = asr.AsrRegistry()
+    registry.register(asr.WhisperBackend("base", 1))
+    registry.register(CloudBackend())
+    settings.ASR_BACKENDS = ["base", "cloud"]
+
+    assert registry.route(duration=60).transcribe(None) == "aus der Cloud"
+
+
+@pytest.mark.django_db
+def test_quiz_records_backend_and_real_time_factor(monkeypatch, user, fake_quiz_payload):
+    monkeypatch.setattr(quiz_serializers.CreateQuizSerializer, "_generate_quiz_from_transcript", REAL_GENERATE)
+    monkeypatch.setattr(quiz_serializers, "download_audio_pcm", lambda url, output_dir=None: np.zeros(60 * 16000, dtype=np.float32))
+    used = []
+
+    def fake_transcript(audio, model_name=None):
+        used.append(model_name)
+        return "Ein kurzes Transkript."
+
+    monkeypatch.setattr(utils, "transcript_audio", fake_transcript)
+
+    class FakeLLM:
+        def complete(self, prompt, **config):
+            return json.dumps(fake_quiz_payload)
+
+    monkeypatch.setattr(quiz_serializers, "get_llm", lambda: FakeLLM())
+
+    serializer = quiz_serializers.CreateQuizSerializer(
+        data={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "quality": "fast"}, context={"user": user},
+    )
+    assert serializer.is_valid(), serializer.errors
+    quiz = Quiz.objects.get(pk=serializer.save().pk)
+
+    # kurzer Clip (+1) mit Qualitätswunsch "fast" (-1) → Standardmodell
+    assert used == ["base"]
+    assert quiz.asr_backend == "base"
+    assert quiz.asr_real_time_factor is not None and quiz.asr_real_time_factor >= 0
+
+
+@pytest.mark.django_db
+def test_quality_hint_is_stored_on_the_job(api_client):
+    response = api_client.post(
+        reverse("create-quiz"), data={"url": "https://youtu.be/abc123", "quality": "best"}, format="json",
+    )
+
+    assert QuizJob.objects.get(pk=response.data["id"]).quality == "best"
+    assert response.data["quality"] == "best"
@@ -0,0 +1,89 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from quiz_app.models import Question, Quiz
+
+
+def make_quiz(owner, video_id="abc123", questions=2):
+    quiz = Quiz.objects.create(
+        title=f"Quiz {video_id}", description="desc", video_url=f"https://www.youtube.com/watch?v={video_id}", owner=owner,
+    )
+    for i in range(questions):
+        Question.objects.create(quiz=quiz, question_title=f"Frage {i}?", question_options=["A", "B", "C", "D"], answer="A")
+    return quiz
+
+
+@pytest.mark.django_db
+def test_async_list_matches_sync_list(api_client, user):
+    make_quiz(user, "aaa111")
+    make_quiz(user, "bbb222", questions=3)
+    make_quiz(User.objects.create_user(username="other", password="123456"), "ccc333")
+
+    sync_response = api_client.get(reverse("quiz-list"))
+    async_response = api_client.get(reverse("async-quiz-list"))
+
+    assert async_response.status_code == status.HTTP_200_OK
+    assert async_response.json() == sync_response.json()
+    assert [q["question_count"] for q in async_response.json()] == [3, 2]
+
+    expanded = api_client.get(reverse("async-quiz-list"), {"expand": "questions"})
+    assert expanded.json() == api_client.get(reverse("quiz-list"), {"expand": "questions"}).json()
+    assert [len(q["questions"]) for q in expanded.json()] == [3, 2]
+
+
+@pytest.mark.django_db
+def test_async_detail_get_patch_delete(api_client, user):
+    quiz = make_quiz(user)
+    url = reverse("async-quiz-detail", kwargs={"id": quiz.pk})
+
+    assert api_client.get(url).json() == api_client.get(reverse("quiz-detail", kwargs={"id": quiz.pk})).json()
+
+    response = api_client.patch(url, {"title": "Neuer Titel"}, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "Neuer Titel"
+    assert len(response.json()["questions"]) == 2
+    quiz.refresh_from_db()
+    assert quiz.title == "Neuer Titel"
+
+    assert api_client.delete(url).status_code == status.HTTP_204_NO_CONTENT
+    assert not Quiz.objects.filter(pk=quiz.pk).exists()
+    assert api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_async_views_require_authentication_and_ownership(user):
+    quiz = make_quiz(user)
+    client = APIClient()
+
+    assert client.get(reverse("async-quiz-list")).status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.post(reverse("async-create-quiz"), {"url": "https://youtu.be/abc123"}, format="json")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    client.force_authenticate(user=User.objects.create_user(username="other", password="123456"))
+    response = client.patch(reverse("async-quiz-detail", kwargs={"id": quiz.pk}), {"title": "x"}, format="json")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_async_create_queues_a_job(api_client, user):
+    response = api_client.post(
+        reverse("async-create-quiz"), {"url": "https://www.youtube.com/watch?v=abc123", "quality": "fast"}, format="json",
+    )
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    data = response.json()
+    assert data["status"] == "succeeded" and data["quality"] == "fast"
+    assert data["quiz"]["title"] and len(data["quiz"]["questions"]) == 10
+    assert response["Location"] == reverse("quiz-job-detail", kwargs={"id": data["id"]})
+    assert Quiz.objects.get().owner == user
+
+
+@pytest.mark.django_db
+def test_async_create_validates_the_url(api_client):
+    response = api_client.post(reverse("async-create-quiz"), {"url": "https://example.com/video"}, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "url" in response.json()
@@ -0,0 +1,92 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from quiz_app.api import serializers as quiz_serializers
+from quiz_app.models import Quiz, QuizBatch, QuizJob
+
+
+URLS = [
+    "https://www.youtube.com/watch?v=aaa111",
+    "https://youtu.be/bbb222",
+    "https://www.youtube.com/watch?v=ccc333",
+]
+
+
+@pytest.mark.django_db
+def test_batch_creates_one_job_per_url_and_reports_progress(api_client, user):
+    response = api_client.post(reverse("create-quiz-batch"), data={"urls": URLS + [URLS[0]]}, format="json")
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    batch = QuizBatch.objects.get(pk=response.data["id"])
+    assert response["Location"] == reverse("quiz-batch-detail", kwargs={"id": batch.pk})
+    assert batch.jobs.count() == 3  # doppelte URL nur einmal
+    assert Quiz.objects.filter(owner=user).count() == 3
+
+    detail = api_client.get(response["Location"])
+
+    assert detail.status_code == status.HTTP_200_OK
+    assert detail.data["status"] == "finished"
+    assert detail.data["progress"]["total"] == 3
+    assert detail.data["progress"]["succeeded"] == 3
+    assert detail.data["progress"]["percent"] == 100
+    assert sorted(job["video_url"] for job in detail.data["jobs"]) == sorted(URLS)
+
+
+@pytest.mark.django_db
+def test_batch_allows_partial_success(api_client, monkeypatch, fake_quiz_payload):
+    def fake_generate(self, url):
+        if "bbb222" in url:
+            raise quiz_serializers.serializers.ValidationError("Error processing the YouTube video (download/transcript).")
+        return fake_quiz_payload
+
+    monkeypatch.setattr(quiz_serializers.CreateQuizSerializer, "_generate_quiz_from_transcript", fake_generate)
+
+    response = api_client.post(
+        reverse("create-quiz-batch"), data={"urls": URLS[:2] + ["https://example.com/video"]}, format="json",
+    )
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data["rejected"][0]["url"] == "https://example.com/video"
+    assert response.data["progress"] == {
+        "total": 2, "pending": 0, "running": 0, "succeeded": 1, "failed": 1, "rejected": 1, "percent": 100,
+    }
+    failed = [job for job in response.data["jobs"] if job["status"] == "failed"]
+    assert failed[0]["video_url"] == URLS[1] and failed[0]["error"]
+
+
+@pytest.mark.django_db
+def test_batch_without_any_valid_url_is_rejected(api_client):
+    response = api_client.post(reverse("create-quiz-batch"), data={"urls": ["https://example.com/x"]}, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["urls"][0]["url"] == "https://example.com/x"
+    assert not QuizJob.objects.exists()
+
+
+@pytest.mark.django_db
+def test_batch_size_is_limited(api_client, settings):
+    settings.QUIZ_BATCH_MAX_URLS = 2
+
+    response = api_client.post(reverse("create-quiz-batch"), data={"urls": URLS}, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "urls" in response.data
+
+
+@pytest.mark.django_db
+def test_batch_progress_shows_pending_jobs_and_is_owner_only(user, api_client):
+    batch = QuizBatch.objects.create(owner=user)
+    QuizJob.objects.create(owner=user, video_url=URLS[0], batch=batch)
+    QuizJob.objects.create(owner=user, video_url=URLS[1], batch=batch, status=QuizJob.Status.SUCCEEDED)
+
+    detail = api_client.get(reverse("quiz-batch-detail", kwargs={"id": batch.pk}))
+
+    assert detail.data["status"] == "running"
+    assert detail.data["progress"]["percent"] == 50
+
+    other = APIClient()
+    other.force_authenticate(user=User.objects.create_user(username="other", password="123456"))
+    assert other.get(reverse("quiz-batch-detail", kwargs={"id": batch.pk})).status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,115 @@
+import pytest
+
+from quiz_app.api import metrics
+from quiz_app.api import serializers as quiz_serializers
+from quiz_app.api import utils
+
+
+AUTO_VTT = """WEBVTT
+Kind: captions
+Language: de
+
+00:00:00.000 --> 00:00:02.000 align:start position:0%
+Hallo<00:00:00.500><c> und</c><00:00:01.000><c> willkommen</c>
+
+00:00:02.000 --> 00:00:02.010 align:start position:0%
+Hallo und willkommen
+
+00:00:02.010 --> 00:00:04.000 align:start position:0%
+Hallo und willkommen
+zu&nbsp;diesem<00:00:03.000><c> Video</c>
+"""
+
+SRV3 = """<?xml version="1.0" encoding="utf-8" ?><timedtext format="3"><body>
+<p t="0" d="2000"><s>Hallo</s><s> Welt</s></p>
+<p t="2000" d="2000">Tom &amp; Jerry</p>
+</body></timedtext>"""
+
+
+def test_parse_vtt_strips_timing_tags_and_rolling_duplicates():
+    assert utils.parse_vtt(AUTO_VTT) == "Hallo und willkommen zu diesem Video"
+
+
+def test_parse_srv_reads_srv3_paragraphs():
+    assert utils.parse_srv(SRV3) == "Hallo Welt Tom & Jerry"
+
+
+@pytest.mark.parametrize(
+    "info, expected",
+    [
+        # manuelle Untertitel in der gesprochenen Sprache haben Vorrang
+        ({"language": "de", "subtitles": {"de": []}, "requested_subtitles": {"de-orig": {}, "de": {}, "en": {}}}, "de"),
+        # sonst die automatische Spur der Originalsprache
+        ({"language": "de", "subtitles": {}, "requested_subtitles": {"en": {}, "de-orig": {}}}, "de-orig"),
+        # maschinelle Übersetzungen werden nie verwendet
+        ({"language": "de", "subtitles": {}, "requested_subtitles": {"en": {}, "fr": {}}}, None),
+    ],
+)
+def test_pick_caption_track_prefers_spoken_language(info, expected):
+    lang, _ = utils._pick_caption_track(info)
+    assert lang == expected
+
+
+def test_fetch_caption_transcript_uses_subtitle_options(monkeypatch, settings):
+    settings.CAPTION_MIN_CHARS = 10
+    seen_opts = {}
+
+    class FakeYDL:
+        def __init__(self, opts):
+            seen_opts.update(opts)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+        def extract_info(self, url, download=True):
+            assert download is False
+            return {
+                "language": "de",
+                "subtitles": {},
+                "requested_subtitles": {"de-orig": {"ext": "vtt", "data": AUTO_VTT}},
+            }
+
+    monkeypatch.setattr(utils.yt_dlp, "YoutubeDL", FakeYDL)
+
+    text = utils.fetch_caption_transcript("https://www.youtube.com/watch?v=abc123DEF45")
+
+    assert text == "Hallo und willkommen zu diesem Video"
+    assert seen_opts["writesubtitles"] and seen_opts["writeautomaticsub"] and seen_opts["skip_download"]
+
+
+def test_captions_skip_whisper_and_are_counted(monkeypatch, settings):
+    settings.CAPTIONS_ENABLED = True
+    metrics.reset()
+    monkeypatch.setattr(quiz_serializers, "fetch_caption_transcript", lambda url, info=None: "Untertitel-Transkript")
+
+    def no_download(url, output_dir=None):
+        raise AssertionError("Whisper-Pfad darf nicht laufen")
+
+    monkeypatch.setattr(quiz_serializers, "download_audio_pcm", no_download)
+
+    text, info = quiz_serializers._download_and_transcripe_yt_video("https://www.youtube.com/watch?v=abc123DEF45")
+
+    assert text == "Untertitel-Transkript"
+    assert info == {"asr_backend": "captions", "asr_real_time_factor": None}
+    snapshot = metrics.snapshot()
+    assert snapshot["hit_rates"]["transcript.captions"] == 1.0
+    assert snapshot["timings"]["transcript.captions"]["count"] == 1
+
+
+@pytest.mark.django_db
+def test_missing_captions_fall_back_to_whisper(monkeypatch, settings):
+    settings.CAPTIONS_ENABLED = True
+    metrics.reset()
+    monkeypatch.setattr(quiz_serializers, "fetch_caption_transcript", lambda url, info=None: None)
+    monkeypatch.setattr(quiz_serializers, "download_audio_pcm", lambda url, output_dir=None: [0.0])
+    monkeypatch.setattr(utils, "transcript_audio", lambda audio, model_name=None: "Whisper-Transkript")
+
+    text, info = quiz_serializers._download_and_transcripe_yt_video("https://www.youtube.com/watch?v=abc123DEF45")
+
+    assert text == "Whisper-Transkript"
+    assert info["asr_backend"] in settings.ASR_BACKENDS
+    assert metrics.snapshot()["counters"]["transcript.captions.misses"] == 1
+    assert metrics.snapshot()["counters"]["transcript.whisper.runs"] == 1
@@ -0,0 +1,104 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from quiz_app.api import chunked_transcription as chunked
+from quiz_app.api import utils
+
+SR = chunked.SAMPLE_RATE
+
+
+def test_split_windows_overlap_and_cover_the_recording():
+    audio = np.arange(25 * SR, dtype=np.float32)
+
+    windows = chunked.split_windows(audio, window_seconds=10, overlap_seconds=2)
+
+    assert [start // SR for start, _ in windows] == [0, 8, 16]
+    assert windows[-1][0] + len(windows[-1][1]) == len(audio)
+    assert all(len(chunk) == 10 * SR for _, chunk in windows[:-1])
+
+
+def test_stitch_segments_keeps_overlap_once():
+    window_results = [
+        (0, 10 * SR, [
+            {"start": 0.0, "end": 4.0, "text": " Eins zwei."},
+            {"start": 4.0, "end": 8.5, "text": " Drei vier."},
+            {"start": 8.5, "end": 10.0, "text": " Fünf"},
+        ]),
+        (8 * SR, 10 * SR, [
+            {"start": 8.0, "end": 8.5, "text": " vier."},
+            {"start": 8.5, "end": 11.0, "text": " Fünf sechs."},
+            {"start": 11.0, "end": 18.0, "text": " Sieben."},
+        ]),
+    ]
+
+    segments = chunked.stitch_segments(window_results, overlap_seconds=2)
+
+    assert "".join(s["text"] for s in segments).strip() == "Eins zwei. Drei vier. Fünf sechs. Sieben."
+
+
+class FakeModel:
+    def transcribe(self, audio, **options):
+        # die Samples enthalten ihre eigene Position -> Text verrät den Fensterstart
+        return {"segments": [{"start": 0.0, "end": len(audio) / SR, "text": f" ab {audio[0] / SR:.0f}s"}]}
+
+
+def test_chunked_transcriber_returns_stitched_text(monkeypatch):
+    monkeypatch.setattr(chunked, "_worker_models", OrderedDict(base=FakeModel()))
+    progress = []
+    transcriber = chunked.ChunkedTranscriber(
+        "base", workers=2, window_seconds=10, overlap_seconds=2, executor=ThreadPoolExecutor(2),
+    )
+
+    audio = np.arange(25 * SR, dtype=np.float32)
+    result = transcriber.transcribe(audio, on_window_done=lambda i, n: progress.append((i, n)))
+
+    assert result["text"] == "ab 0s ab 8s ab 16s"
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_long_recordings_use_the_parallel_transcriber(monkeypatch, settings):
+    settings.WHISPER_PARALLEL_WORKERS = 2
+    settings.WHISPER_PARALLEL_MIN_SECONDS = 20
+    calls = []
+
+    class FakeChunked:
+        workers = 2
+
+        def transcribe(self, audio, on_window_done=None, model_name=None):
+            calls.append(len(audio))
+            return {"text": " parallel "}
+
+    monkeypatch.setattr(utils, "get_chunked_transcriber", lambda: FakeChunked())
+
+    assert utils.transcript_audio(np.zeros(30 * SR, dtype=np.float32)) == "parallel"
+    assert calls == [30 * SR]
+
+
+def test_worker_keeps_a_bounded_number_of_models(monkeypatch):
+    loaded = []
+    monkeypatch.setattr(chunked.whisper, "load_model", lambda name: loaded.append(name) or FakeModel())
+    monkeypatch.setattr(chunked, "_worker_models", OrderedDict())
+    monkeypatch.setattr(chunked, "_worker_max_models", 2)
+    audio = np.arange(SR, dtype=np.float32)
+
+    for name in ["tiny", "base", "tiny", "small", "tiny", "base"]:
+        chunked._transcribe_window(name, 0, audio)
+
+    # "base" wurde für "small" verdrängt und muss neu geladen werden
+    assert loaded == ["tiny", "base", "small", "base"]
+    assert list(chunked._worker_models) == ["tiny", "base"]
+
+
+def test_all_model_sizes_share_one_pool(settings):
+    settings.WHISPER_PARALLEL_WORKERS = 2
+    settings.WHISPER_MODEL = "base"
+
+    transcriber = utils.get_chunked_transcriber()
+    assert utils.get_chunked_transcriber() is transcriber
+
+    settings.WHISPER_PARALLEL_WORKERS = 3
+    resized = utils.get_chunked_transcriber()
+    assert resized is not transcriber and resized.workers == 3
+    resized.shutdown()
@@ -0,0 +1,140 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+
+from quiz_app.api import views
+from quiz_app.models import Question, Quiz
+
+
+@pytest.fixture
+def quiz(user):
+    quiz = Quiz.objects.create(title="Quiz", video_url="https://youtu.be/abc123", owner=user)
+    Question.objects.bulk_create([
+        Question(quiz=quiz, question_title=f"Frage {i}?", question_options=["A", "B", "C", "D"], answer="A")
+        for i in range(3)
+    ])
+    return quiz
+
+
+def detail_url(name, quiz):
+    return reverse(name, kwargs={"id": quiz.pk})
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("detail_name", ["quiz-detail", "async-quiz-detail"])
+def test_unchanged_quiz_is_answered_with_304(api_client, quiz, detail_name, django_assert_max_num_queries):
+    response = api_client.get(detail_url(detail_name, quiz))
+
+    assert response.status_code == status.HTTP_200_OK
+    etag = response["ETag"]
+    assert etag.startswith('"') and response["Last-Modified"]
+
+    with django_assert_max_num_queries(2):  # Benutzer, Änderungsstand
+        cached = api_client.get(detail_url(detail_name, quiz), HTTP_IF_NONE_MATCH=etag)
+
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.content == b""
+
+    since = api_client.get(detail_url(detail_name, quiz), HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+    assert since.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("detail_name", ["quiz-detail", "async-quiz-detail"])
+def test_quiz_and_question_changes_change_the_etag(api_client, quiz, detail_name):
+    etag = api_client.get(detail_url(detail_name, quiz))["ETag"]
+
+    api_client.patch(detail_url(detail_name, quiz), {"title": "Neu"}, format="json")
+    response = api_client.get(detail_url(detail_name, quiz), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "Neu"
+
+    etag = response["ETag"]
+    question = quiz.questions.first()
+    question.answer = "B"
+    question.save()
+    assert api_client.get(detail_url(detail_name, quiz), HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("detail_name", ["quiz-detail", "async-quiz-detail"])
+def test_conditional_get_does_not_reveal_foreign_quizzes(api_client, detail_name):
+    other = User.objects.create_user(username="other", password="123456")
+    foreign = Quiz.objects.create(title="Fremd", owner=other)
+
+    response = api_client.get(detail_url(detail_name, foreign), HTTP_IF_NONE_MATCH="*")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert "ETag" not in response
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("list_name", ["quiz-list", "async-quiz-list"])
+def test_list_etag_follows_the_query_and_every_change(api_client, user, quiz, list_name, django_assert_max_num_queries):
+    response = api_client.get(reverse(list_name))
+    etag = response["ETag"]
+    assert "Last-Modified" not in response
+
+    with django_assert_max_num_queries(2):  # Benutzer, Änderungsstand
+        cached = api_client.get(reverse(list_name), HTTP_IF_NONE_MATCH=etag)
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+    expanded = api_client.get(reverse(list_name), {"expand": "questions"}, HTTP_IF_NONE_MATCH=etag)
+    assert expanded.status_code == status.HTTP_200_OK and expanded["ETag"] != etag
+
+    Quiz.objects.create(title="Zweites", owner=user)
+    response = api_client.get(reverse(list_name), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response["ETag"]
+
+    quiz.delete()
+    assert api_client.get(reverse(list_name), HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_list_ignores_if_modified_since(api_client, quiz):
+    since = http_date(quiz.updated_at.timestamp() + 60)
+
+    assert api_client.get(reverse("quiz-list"), HTTP_IF_MODIFIED_SINCE=since).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_list_etag_covers_only_the_requested_page(api_client, user, quiz):
+    newer = [Quiz.objects.create(title=f"Quiz {i}", video_url=f"https://youtu.be/n{i}", owner=user) for i in range(3)]
+    etag = api_client.get(reverse("quiz-list"), {"page_size": 2})["ETag"]
+
+    # Ältestes Quiz liegt hinter der ersten Seite (und ihrer Vorschauzeile)
+    quiz.title = "Weiter hinten geändert"
+    quiz.save()
+    unchanged = api_client.get(reverse("quiz-list"), {"page_size": 2}, HTTP_IF_NONE_MATCH=etag)
+    assert unchanged.status_code == status.HTTP_304_NOT_MODIFIED
+
+    newer[-1].title = "Auf der Seite geändert"
+    newer[-1].save()
+    changed = api_client.get(reverse("quiz-list"), {"page_size": 2}, HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed.json()[0]["title"] == "Auf der Seite geändert"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("view, name", [(views.QuizListView, "quiz-list"), (views.QuizDetailView, "quiz-detail")])
+def test_write_during_a_read_never_gets_the_newer_etag(api_client, quiz, monkeypatch, view, name):
+    url = reverse(name, kwargs={"id": quiz.pk}) if name == "quiz-detail" else reverse(name)
+    original = view.get_serializer
+
+    def get_serializer(self, *args, **kwargs):
+        # Gleichzeitiger Schreibzugriff, nachdem die Daten gelesen wurden
+        Quiz.objects.filter(pk=quiz.pk).update(title="Dazwischen geändert", updated_at=timezone.now())
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(view, "get_serializer", get_serializer)
+    stale = api_client.get(url)
+    monkeypatch.setattr(view, "get_serializer", original)
+
+    assert "Dazwischen geändert" not in stale.content.decode()
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=stale["ETag"])
+    assert response.status_code == status.HTTP_200_OK
+    assert "Dazwischen geändert" in response.content.decode()
@@ -172,9 +172,12 @@ def test_create_quiz_fails_when_llm_returns_less_than_10_questions(api_client, m
 
     response = api_client.post(url, data=payload, format="json")
 
-    assert response.status_code == status.HTTP_400_BAD_REQUEST
-    assert "questions" in response.data
-    assert "muss genau 10 Fragen enthalten" in str(response.data["questions"][0])
+    # Die Pipeline läuft als Job: der Fehler landet im Job, nicht im POST
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data["status"] == "failed"
+    assert "questions" in response.data["error"]
+    assert "muss genau 10 Fragen enthalten" in str(response.data["error"]["questions"][0])
+    assert Quiz.objects.count() == 0
 
 
 @pytest.mark.django_db
@@ -207,8 +210,9 @@ def test_create_quiz_rejects_missing_or_empty_title(api_client, monkeypatch, fak
 
     response = api_client.post(url, data=payload, format="json")
 
-    assert response.status_code == status.HTTP_400_BAD_REQUEST
-    assert "title" in response.data
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data["status"] == "failed"
+    assert "title" in response.data["error"]
     @pytest.mark.django_db
     def test_create_quiz_sets_owner_when_none(monkeypatch, django_user_model, rf):
         VALID_YT = "https://www.youtube.com/watch?v=abc123"
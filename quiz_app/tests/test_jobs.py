@@ -0,0 +1,215 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from quiz_app.api import jobs
+from quiz_app.models import Quiz, QuizJob, QuizJobEvent
+
+
+VALID_YT = "https://www.youtube.com/watch?v=abc123"
+
+
+@pytest.mark.django_db
+def test_create_quiz_returns_job_and_detail_shows_result(api_client, user):
+    response = api_client.post(reverse("create-quiz"), data={"url": VALID_YT}, format="json")
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job = QuizJob.objects.get(pk=response.data["id"])
+    assert job.owner == user
+    assert job.status == QuizJob.Status.SUCCEEDED
+    assert job.started_at is not None and job.finished_at is not None
+
+    detail = api_client.get(reverse("quiz-job-detail", kwargs={"id": job.pk}))
+
+    assert detail.status_code == status.HTTP_200_OK
+    assert detail.data["status"] == "succeeded"
+    assert detail.data["quiz"]["id"] == Quiz.objects.get().id
+    assert len(detail.data["quiz"]["questions"]) == 10
+
+
+@pytest.mark.django_db
+def test_job_detail_is_only_visible_to_owner(user):
+    job = QuizJob.objects.create(owner=user, video_url=VALID_YT)
+    client = APIClient()
+    client.force_authenticate(user=User.objects.create_user(username="other", password="123456"))
+
+    response = client.get(reverse("quiz-job-detail", kwargs={"id": job.pk}))
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_create_quiz_queues_job_on_worker_pool(api_client, settings, monkeypatch):
+    settings.QUIZ_JOB_EAGER = False
+    submitted = []
+
+    class FakeExecutor:
+        def submit(self, fn, *args):
+            submitted.append((fn, args))
+
+    monkeypatch.setattr(jobs, "get_executor", lambda: FakeExecutor())
+
+    response = api_client.post(reverse("create-quiz"), data={"url": VALID_YT}, format="json")
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data["status"] == "pending"
+    assert response.data["quiz"] is None
+    assert len(submitted) == 1
+    fn, args = submitted[0]
+    assert fn is jobs._run_in_worker
+    assert str(args[0]) == response.data["id"]
+    assert Quiz.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_run_quiz_job_records_unexpected_errors(user, monkeypatch):
+    from quiz_app.api.serializers import CreateQuizSerializer
+
+    def broken_generate(self, url):
+        raise RuntimeError("gemini down")
+
+    monkeypatch.setattr(CreateQuizSerializer, "_generate_quiz_from_transcript", broken_generate)
+    job = QuizJob.objects.create(owner=user, video_url=VALID_YT)
+
+    jobs.run_quiz_job(job.pk)
+
+    job.refresh_from_db()
+    assert job.status == QuizJob.Status.FAILED
+    assert job.error == {"detail": "gemini down"}
+    assert job.quiz is None
+
+
+@pytest.mark.django_db
+def test_run_quiz_job_skips_jobs_that_are_not_pending(user):
+    job = QuizJob.objects.create(owner=user, video_url=VALID_YT, status=QuizJob.Status.SUCCEEDED)
+
+    assert jobs.run_quiz_job(job.pk) is None
+    assert Quiz.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_new_worker_pool_requeues_jobs_of_a_crashed_process(user, settings, monkeypatch):
+    settings.QUIZ_JOB_STALE_SECONDS = 600
+    long_ago = timezone.now() - timedelta(hours=1)
+    pending = QuizJob.objects.create(owner=user, video_url=VALID_YT)
+    lost = QuizJob.objects.create(owner=user, video_url=VALID_YT, status=QuizJob.Status.RUNNING)
+    busy = QuizJob.objects.create(owner=user, video_url=VALID_YT, status=QuizJob.Status.RUNNING)
+    QuizJobEvent.objects.create(job=busy, type="transcript.started")  # frischer Fortschritt: läuft noch
+    crashed_twice = QuizJob.objects.create(owner=user, video_url=VALID_YT, status=QuizJob.Status.RUNNING)
+    QuizJobEvent.objects.create(job=crashed_twice, type="job.requeued")
+    QuizJobEvent.objects.filter(job=crashed_twice).update(created_at=long_ago)
+    QuizJob.objects.filter(status=QuizJob.Status.RUNNING).update(updated_at=long_ago)
+
+    # Neustart: ein frischer Prozess baut seinen Job-Pool auf
+    submitted = []
+
+    class FakeExecutor:
+        def __init__(self, **kwargs):
+            pass
+
+        def submit(self, fn, *args):
+            submitted.append((fn, args))
+
+    monkeypatch.setattr(jobs, "ThreadPoolExecutor", FakeExecutor)
+    monkeypatch.setattr(jobs, "start_janitor", lambda: None)
+    monkeypatch.setattr(jobs, "start_watchdog", lambda submit: None)
+    monkeypatch.setattr(jobs, "_executor", None)
+    jobs.get_executor()
+
+    assert [args[0] for _, args in submitted] == [pending.pk, lost.pk]
+    assert all(fn is jobs._run_in_worker for fn, _ in submitted)
+    lost.refresh_from_db()
+    assert lost.status == QuizJob.Status.PENDING and lost.started_at is None
+    assert lost.events.filter(type="job.requeued").exists()
+    busy.refresh_from_db()
+    assert busy.status == QuizJob.Status.RUNNING
+    crashed_twice.refresh_from_db()
+    assert crashed_twice.status == QuizJob.Status.FAILED
+
+    # Der wieder eingereihte Job läuft danach ganz normal durch
+    jobs.run_quiz_job(lost.pk)
+    lost.refresh_from_db()
+    assert lost.status == QuizJob.Status.SUCCEEDED
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+@pytest.mark.django_db
+def test_jobs_of_a_dead_process_are_requeued_right_away(user):
+    # Neustart direkt nach dem Abbruch: updated_at ist frisch, der Prozess aber weg
+    host = jobs.worker_identity()["host"]
+    lost = QuizJob.objects.create(
+        owner=user, video_url=VALID_YT, status=QuizJob.Status.RUNNING,
+        worker={"host": host, "pid": dead_pid(), "started": 1},
+    )
+    reused_pid = QuizJob.objects.create(
+        owner=user, video_url=VALID_YT, status=QuizJob.Status.RUNNING,
+        worker={"host": host, "pid": os.getpid(), "started": -1},
+    )
+    alive = QuizJob.objects.create(
+        owner=user, video_url=VALID_YT, status=QuizJob.Status.RUNNING, worker=jobs.worker_identity(),
+    )
+    elsewhere = QuizJob.objects.create(
+        owner=user, video_url=VALID_YT, status=QuizJob.Status.RUNNING,
+        worker={"host": "anderer-host", "pid": dead_pid(), "started": 1},
+    )
+    submitted = []
+
+    assert jobs.recover_jobs(submitted.append) == [lost.pk, reused_pid.pk]
+
+    assert submitted == [lost.pk, reused_pid.pk]
+    assert QuizJob.objects.get(pk=lost.pk).worker is None
+    assert QuizJob.objects.get(pk=alive.pk).status == QuizJob.Status.RUNNING
+    assert QuizJob.objects.get(pk=elsewhere.pk).status == QuizJob.Status.RUNNING
+
+
+@pytest.mark.django_db
+def test_watchdog_keeps_own_jobs_alive_and_requeues_silent_ones(user, settings):
+    settings.QUIZ_JOB_STALE_SECONDS = 600
+    long_ago = timezone.now() - timedelta(hours=1)
+    own = QuizJob.objects.create(
+        owner=user, video_url=VALID_YT, status=QuizJob.Status.RUNNING, worker=jobs.worker_identity(),
+    )
+    silent = QuizJob.objects.create(
+        owner=user, video_url=VALID_YT, status=QuizJob.Status.RUNNING,
+        worker={"host": "anderer-host", "pid": 1, "started": 1},
+    )
+    QuizJob.objects.update(updated_at=long_ago)
+    submitted = []
+
+    # Lange Transkription ohne neue Events: der Heartbeat hält den eigenen Job frisch
+    assert jobs.watch_jobs(submitted.append) == [silent.pk]
+
+    assert submitted == [silent.pk]
+    own.refresh_from_db()
+    assert own.status == QuizJob.Status.RUNNING and own.updated_at > long_ago
+    assert QuizJob.objects.get(pk=silent.pk).status == QuizJob.Status.PENDING
+    assert jobs.watch_jobs(submitted.append) == []
+
+
+@pytest.mark.django_db
+def test_claimed_job_records_its_process(user, monkeypatch):
+    job = QuizJob.objects.create(owner=user, video_url=VALID_YT)
+    seen = []
+    original = jobs.CreateQuizSerializer.save
+
+    def save(self, **kwargs):
+        seen.append(QuizJob.objects.get(pk=job.pk).worker)
+        return original(self, **kwargs)
+
+    monkeypatch.setattr(jobs.CreateQuizSerializer, "save", save)
+    jobs.run_quiz_job(job.pk)
+
+    assert seen == [jobs.worker_identity()]
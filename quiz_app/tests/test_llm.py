@@ -0,0 +1,104 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from quiz_app.api import llm
+
+
+class FakeGemini(BaseHTTPRequestHandler):
+    """Minimaler Stand-in für die Gemini REST API (generateContent)."""
+
+    protocol_version = "HTTP/1.1"
+    answer = ""
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests.append({"path": self.path, "port": self.client_address[1], "body": body})
+        payload = json.dumps({
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": type(self).answer}]},
+                "finishReason": "STOP",
+            }],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def gemini_server(settings, fake_quiz_payload):
+    FakeGemini.answer = json.dumps(fake_quiz_payload)
+    FakeGemini.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGemini)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.GEMINI_BASE_URL = f"http://127.0.0.1:{server.server_port}/"
+    settings.GEMINI_MODEL = "gemini-test"
+    yield FakeGemini
+    server.shutdown()
+    server.server_close()
+
+
+def test_shared_client_is_reused_until_settings_change(settings):
+    settings.GEMINI_BASE_URL = "http://127.0.0.1:1/"
+    first = llm.get_llm()
+
+    assert llm.get_llm() is first
+
+    closed = []
+    first.client.close = lambda: closed.append(True)
+    settings.GEMINI_MODEL = "gemini-other"
+    assert llm.get_llm() is not first
+    assert closed == [True]  # alter Verbindungspool wird geschlossen
+
+
+def test_sync_calls_reuse_one_pooled_connection(gemini_server, fake_quiz_payload):
+    client = llm.get_llm()
+
+    assert client.generate_quiz_sync("Transkript A") == fake_quiz_payload
+    assert client.generate_quiz_sync("Transkript B") == fake_quiz_payload
+
+    requests = gemini_server.requests
+    assert len(requests) == 2
+    assert all(r["path"].endswith("models/gemini-test:generateContent") for r in requests)
+    assert "Transkript B" in requests[1]["body"]["contents"][0]["parts"][0]["text"]
+    schema = requests[0]["body"]["generationConfig"]["responseSchema"]
+    assert schema["properties"]["questions"]["min_items"] == 10
+    # Keep-Alive: beide Anfragen kommen über dieselbe TCP-Verbindung
+    assert requests[0]["port"] == requests[1]["port"]
+
+
+def test_async_generate_quiz(gemini_server, fake_quiz_payload):
+    async def run():
+        return await asyncio.gather(llm.generate_quiz("eins"), llm.generate_quiz("zwei"))
+
+    assert asyncio.run(run()) == [fake_quiz_payload, fake_quiz_payload]
+    assert len(gemini_server.requests) == 2
+
+
+def test_each_event_loop_gets_its_own_async_client(gemini_server, fake_quiz_payload):
+    async def run():
+        return await llm.generate_quiz("Transkript"), llm.get_llm()._async_client()
+
+    first_result, first_client = asyncio.run(run())
+    # Ein zweiter Event-Loop darf die Verbindungen des ersten (geschlossenen) nicht benutzen
+    second_result, second_client = asyncio.run(run())
+
+    assert first_result == second_result == fake_quiz_payload
+    assert first_client is not second_client
+
+
+def test_parse_quiz_json_tolerates_trailing_text_and_rejects_garbage():
+    assert llm.parse_quiz_json('{"title": "A"}\nHier noch Text') == {"title": "A"}
+
+    with pytest.raises(llm.QuizGenerationError):
+        llm.parse_quiz_json("kein JSON")
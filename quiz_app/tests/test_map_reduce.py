@@ -0,0 +1,106 @@
+import json
+import re
+import threading
+import time
+
+import pytest
+
+from quiz_app.api import map_reduce
+from quiz_app.api import serializers as quiz_serializers
+from quiz_app.api.transcript_budget import count_tokens
+from quiz_app.models import Question, Quiz
+
+REAL_GENERATE = quiz_serializers.CreateQuizSerializer._generate_quiz_from_transcript
+
+
+def make_question(title, answer="A"):
+    return {"question_title": title, "question_options": ["A", "B", "C", "D"], "answer": answer}
+
+
+class FakeLLM:
+    """Beantwortet Abschnitts-Prompts mit Fragen zum jeweiligen Abschnitt und misst die Parallelität."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.prompts = []
+
+    def complete(self, prompt, **config):
+        with self.lock:
+            self.prompts.append(prompt)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            time.sleep(0.05)
+            match = re.search(r"section (\d+) of \d+", prompt)
+            if not match:
+                return json.dumps({"title": "Gesamtquiz", "description": "Kurzbeschreibung"})
+            section = match.group(1)
+            questions = [make_question(f"Abschnitt {section}, Frage {i}?") for i in range(3)]
+            # Pro Abschnitt eine kaputte Frage und ein Duplikat
+            questions.append(make_question(f"Abschnitt {section}, Frage 0?"))
+            questions.append(make_question(f"Abschnitt {section}, kaputt?", answer="E"))
+            return json.dumps({"questions": questions})
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+def long_transcript(sentences=600):
+    return " ".join(f"Satz {i} behandelt ein eigenes Detail des Themas." for i in range(sentences))
+
+
+def test_split_sections_respects_the_token_size():
+    sections = map_reduce.split_sections(long_transcript(200), section_tokens=300)
+
+    assert len(sections) > 1
+    assert all(count_tokens(s) <= 320 for s in sections)
+    assert " ".join(sections) == long_transcript(200)
+
+
+def test_select_questions_alternates_sections_and_skips_invalid_and_duplicates():
+    candidates = [
+        [make_question("Eins?"), make_question("eins"), make_question("Zwei?")],
+        [make_question("Kaputt?", answer="X"), make_question("Drei?")],
+    ]
+
+    selected = map_reduce.select_questions(candidates, 3)
+
+    assert [q["question_title"] for q in selected] == ["Eins?", "Drei?", "Zwei?"]
+
+
+def test_map_reduce_runs_sections_concurrently_with_a_limit():
+    llm = FakeLLM()
+
+    quiz_json, stats = map_reduce.generate_quiz_map_reduce(llm, long_transcript(), section_tokens=500, concurrency=3)
+
+    assert stats["sections"] >= 6
+    assert 1 < llm.max_running <= 3
+    assert len(llm.prompts) == stats["sections"] + 1
+    assert quiz_json["title"] == "Gesamtquiz"
+    titles = [q["question_title"] for q in quiz_json["questions"]]
+    assert len(titles) == len(set(titles)) == 10
+    # Reihum aus den Abschnitten gewählt, nicht alle aus dem ersten
+    assert len({t.split(",")[0] for t in titles}) >= 6
+
+
+@pytest.mark.django_db
+def test_long_transcripts_use_map_reduce_in_the_serializer(monkeypatch, settings, user):
+    monkeypatch.setattr(quiz_serializers.CreateQuizSerializer, "_generate_quiz_from_transcript", REAL_GENERATE)
+    monkeypatch.setattr(quiz_serializers, "_download_and_transcripe_yt_video", lambda url, quality=None: (long_transcript(), {}))
+    llm = FakeLLM()
+    monkeypatch.setattr(quiz_serializers, "get_llm", lambda: llm)
+    settings.QUIZ_PROMPT_TOKEN_BUDGET = 0
+    settings.QUIZ_MAP_REDUCE_MIN_TOKENS = 1000
+    settings.QUIZ_MAP_SECTION_TOKENS = 1500
+
+    serializer = quiz_serializers.CreateQuizSerializer(
+        data={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}, context={"user": user},
+    )
+    assert serializer.is_valid(), serializer.errors
+    quiz = serializer.save()
+
+    assert Quiz.objects.get(pk=quiz.pk).title == "Gesamtquiz"
+    assert Question.objects.filter(quiz=quiz).count() == 10
+    assert len(llm.prompts) > 2
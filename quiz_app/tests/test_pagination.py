@@ -0,0 +1,104 @@
+import re
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from quiz_app.api.pagination import encode_cursor
+from quiz_app.models import Question, Quiz
+
+
+def make_quizzes(owner, count, questions=2, same_time=False):
+    quizzes = []
+    for i in range(count):
+        quiz = Quiz.objects.create(title=f"Quiz {i}", video_url=f"https://youtu.be/video{i:05d}", owner=owner)
+        Question.objects.bulk_create([
+            Question(quiz=quiz, question_title=f"Frage {j}?", question_options=["A", "B", "C", "D"], answer="A")
+            for j in range(questions)
+        ])
+        quizzes.append(quiz)
+    if same_time:
+        # Gleiche Zeitstempel: die Reihenfolge hängt dann nur noch an der id
+        Quiz.objects.filter(owner=owner).update(created_at=timezone.now())
+    return quizzes
+
+
+def next_link(response):
+    match = re.match(r'<([^>]+)>; rel="next"', response.get("Link", ""))
+    return match.group(1) if match else None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("list_name", ["quiz-list", "async-quiz-list"])
+def test_pages_walk_all_quizzes_once_in_order(api_client, user, settings, list_name):
+    settings.QUIZ_LIST_PAGE_SIZE = 4
+    quizzes = make_quizzes(user, 10, same_time=True)
+
+    seen, url = [], reverse(list_name)
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        seen += [quiz["id"] for quiz in response.json()]
+        url = next_link(response)
+
+    assert seen == [quiz.pk for quiz in reversed(quizzes)]
+
+
+@pytest.mark.django_db
+def test_query_count_per_page_does_not_grow_with_the_account(api_client, user, django_assert_max_num_queries, settings):
+    settings.QUIZ_LIST_PAGE_SIZE = 5
+
+    def count_queries():
+        from django.core.cache import caches
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        caches["quiz_reads"].clear()  # die Datenbank messen, nicht den Antwort-Cache
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.get(reverse("quiz-list"))
+        assert response.status_code == status.HTTP_200_OK
+        return len(ctx.captured_queries)
+
+    make_quizzes(user, 5)
+    small = count_queries()
+    Quiz.objects.bulk_create([Quiz(title=f"Mehr {i}", owner=user) for i in range(200)])
+    large = count_queries()
+
+    assert small == large
+    with django_assert_max_num_queries(3):  # Benutzer, ETag, Quizzes samt Fragenanzahl
+        api_client.get(reverse("quiz-list"))
+    with django_assert_max_num_queries(4):  # Benutzer, ETag, Quizzes, Fragen
+        api_client.get(reverse("quiz-list"), {"expand": "questions"})
+
+
+@pytest.mark.django_db
+def test_page_size_is_capped_and_bad_cursors_are_rejected(api_client, user, settings):
+    settings.QUIZ_LIST_MAX_PAGE_SIZE = 3
+    make_quizzes(user, 5, questions=0)
+
+    response = api_client.get(reverse("quiz-list"), {"page_size": 100})
+    assert len(response.json()) == 3 and next_link(response)
+
+    last = Quiz.objects.order_by("created_at", "id").first()
+    response = api_client.get(reverse("quiz-list"), {"cursor": encode_cursor(last.created_at, last.pk)})
+    assert response.json() == [] and not next_link(response)
+
+    assert api_client.get(reverse("quiz-list"), {"cursor": "kaputt"}).status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("list_name", ["quiz-list", "async-quiz-list"])
+def test_list_returns_summaries_unless_questions_are_expanded(api_client, user, list_name):
+    make_quizzes(user, 1, questions=3)
+    Quiz.objects.create(title="Leer", video_url="https://youtu.be/leer", owner=user)
+
+    summaries = api_client.get(reverse(list_name)).json()
+
+    assert [q["question_count"] for q in summaries] == [0, 3]
+    assert all("questions" not in q for q in summaries)
+
+    expanded = api_client.get(reverse(list_name), {"expand": "questions"}).json()
+
+    assert [len(q["questions"]) for q in expanded] == [0, 3]
+    assert all("question_count" not in q for q in expanded)
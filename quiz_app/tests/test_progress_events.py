@@ -0,0 +1,115 @@
+import io
+import json
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from quiz_app.api import progress, utils
+from quiz_app.models import Quiz, QuizJob, QuizJobEvent
+
+
+VALID_YT = "https://www.youtube.com/watch?v=abc123"
+
+
+def read_events(response):
+    """Zerlegt einen text/event-stream in (id, event, data)-Tupel."""
+    body = b"".join(response.streaming_content).decode()
+    events = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if line and not line.startswith(":"))
+        if "event" in fields:
+            events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.django_db
+def test_event_stream_reports_questions_and_ends_with_quiz(api_client):
+    job_id = api_client.post(reverse("create-quiz"), data={"url": VALID_YT}, format="json").data["id"]
+
+    response = api_client.get(reverse("quiz-job-events", kwargs={"id": job_id}), HTTP_ACCEPT="text/event-stream")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "text/event-stream"
+    events = read_events(response)
+    types = [event for _, event, _ in events]
+    assert types[0] == "job.started"
+    assert types.count("question.validated") == 10
+    assert types[-1] == "quiz.completed"
+    quiz = events[-1][2]["quiz"]
+    assert quiz["id"] == Quiz.objects.get().id
+    assert len(quiz["questions"]) == 10
+
+
+@pytest.mark.django_db
+def test_event_stream_resumes_after_last_event_id(api_client):
+    job_id = api_client.post(reverse("create-quiz"), data={"url": VALID_YT}, format="json").data["id"]
+    last_seen = QuizJobEvent.objects.filter(job_id=job_id).order_by("id")[5].pk
+
+    response = api_client.get(reverse("quiz-job-events", kwargs={"id": job_id}), HTTP_LAST_EVENT_ID=str(last_seen))
+
+    assert all(event_id > last_seen for event_id, _, _ in read_events(response))
+
+
+@pytest.mark.django_db
+def test_failed_job_ends_stream_with_error(api_client, user, settings):
+    job = QuizJob.objects.create(owner=user, video_url=VALID_YT, status=QuizJob.Status.FAILED)
+    QuizJobEvent.objects.create(job=job, type="job.failed", data={"error": {"detail": "kaputt"}})
+    settings.QUIZ_EVENTS_POLL_SECONDS = 0
+
+    events = read_events(api_client.get(reverse("quiz-job-events", kwargs={"id": job.pk})))
+
+    assert events == [(events[0][0], "job.failed", {"error": {"detail": "kaputt"}})]
+
+
+@pytest.mark.django_db
+def test_streams_are_capped_and_extra_clients_are_sent_to_polling(api_client, user, settings):
+    settings.QUIZ_EVENTS_MAX_STREAMS = 1
+    running = QuizJob.objects.create(owner=user, video_url=VALID_YT, status=QuizJob.Status.RUNNING)
+    finished = QuizJob.objects.create(owner=user, video_url=VALID_YT, status=QuizJob.Status.FAILED)
+
+    first = api_client.get(reverse("quiz-job-events", kwargs={"id": running.pk}))
+    second = api_client.get(reverse("quiz-job-events", kwargs={"id": finished.pk}))
+
+    assert first.status_code == status.HTTP_200_OK
+    assert second.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert second.data["poll"] == reverse("quiz-job-detail", kwargs={"id": finished.pk})
+    assert second["Retry-After"]
+
+    first.close()  # Client trennt die Verbindung: Platz wird frei
+    third = api_client.get(reverse("quiz-job-events", kwargs={"id": finished.pk}))
+    assert third.status_code == status.HTTP_200_OK
+    read_events(third)
+    assert progress._open_streams == 0
+
+
+@pytest.mark.django_db
+def test_pipeline_stages_emit_events_only_inside_a_job(monkeypatch, user):
+    pcm = np.zeros(40 * 16000, dtype=np.int16).tobytes()
+    monkeypatch.setattr(utils, "_spawn_decoder", lambda url: ([], io.BytesIO(pcm)))
+
+    class FakeModel:
+        def transcribe(self, audio, **options):
+            return {"text": " Hallo.", "segments": [{"start": 0.0, "end": 1.0, "text": " Hallo."}]}
+
+    class FakeRegistry:
+        @contextmanager
+        def use(self, name):
+            yield FakeModel()
+
+    monkeypatch.setattr(utils, "whisper_models", FakeRegistry())
+    job = QuizJob.objects.create(owner=user, video_url=VALID_YT)
+
+    utils.transcribe_stream(VALID_YT)
+    assert not QuizJobEvent.objects.exists()
+
+    with progress.reporting(job):
+        utils.transcribe_stream(VALID_YT)
+
+    events = list(job.events.values_list("type", "data"))
+    assert events == [
+        ("transcription.progress", {"window": 1, "seconds": 30}),
+        ("transcription.progress", {"window": 2, "seconds": 40}),
+    ]
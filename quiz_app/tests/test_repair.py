@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from quiz_app.api import metrics
+from quiz_app.api import serializers as quiz_serializers
+from quiz_app.api.llm import QuestionListSchema, QuizGenerationError, QuizSchema
+from quiz_app.api.repair import complete_json, repair_quiz
+from quiz_app.models import Question
+
+REAL_GENERATE = quiz_serializers.CreateQuizSerializer._generate_quiz_from_transcript
+
+
+def make_question(title, options=("A", "B", "C", "D"), answer="A"):
+    return {"question_title": title, "question_options": list(options), "answer": answer}
+
+
+class ScriptedLLM:
+    """Gibt vorbereitete Antworten der Reihe nach zurück und merkt sich die Aufrufe."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = []
+
+    def complete(self, prompt, **config):
+        self.calls.append((prompt, config))
+        answer = self.answers.pop(0)
+        return answer if isinstance(answer, str) else json.dumps(answer)
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+
+
+def test_only_the_broken_question_is_regenerated():
+    questions = [make_question(f"Frage {i}?") for i in range(10)]
+    questions[3] = make_question("Kaputt?", options=("A", "A", "C", "D"))
+    questions[7] = make_question("Falsche Antwort?", answer="E")
+    llm = ScriptedLLM({"questions": [make_question("Ersatz 1?"), make_question("Frage 1?"), make_question("Ersatz 2?")]})
+
+    quiz = repair_quiz(llm, "Transkript", {"title": "T", "description": "D", "questions": questions}, attempts=2)
+
+    titles = [q["question_title"] for q in quiz["questions"]]
+    assert len(titles) == 10 and "Kaputt?" not in titles and "Falsche Antwort?" not in titles
+    assert titles[-2:] == ["Ersatz 1?", "Ersatz 2?"]
+    prompt, config = llm.calls[0]
+    assert "write 2 new" in prompt and "Transkript" in prompt and "Frage 9?" in prompt
+    assert config["response_schema"] is QuestionListSchema
+    counters = metrics.snapshot()["counters"]
+    assert counters["llm.repair.attempts"] == 1
+    assert counters["llm.repair.questions"] == 2
+    assert counters["llm.repair.succeeded"] == 1
+
+
+def test_repair_gives_up_after_the_configured_attempts():
+    llm = ScriptedLLM("kein JSON", {"questions": []})
+
+    quiz = repair_quiz(llm, "Transkript", {"title": "T", "questions": [make_question("Eins?")]}, attempts=2)
+
+    assert len(quiz["questions"]) == 1
+    assert len(llm.calls) == 2
+    assert metrics.snapshot()["counters"]["llm.repair.failed"] == 1
+
+
+def test_missing_title_is_requested_separately():
+    questions = [make_question(f"Frage {i}?") for i in range(10)]
+    llm = ScriptedLLM({"title": "Neuer Titel", "description": "Neue Beschreibung"})
+
+    quiz = repair_quiz(llm, "Transkript", {"title": " ", "questions": questions}, attempts=2)
+
+    assert (quiz["title"], quiz["description"]) == ("Neuer Titel", "Neue Beschreibung")
+    assert quiz["questions"] == questions
+
+
+def test_unparseable_answer_is_requested_again():
+    llm = ScriptedLLM("```kaputt", {"title": "T"})
+
+    assert complete_json(llm, "prompt", QuizSchema, attempts=1) == {"title": "T"}
+    assert metrics.snapshot()["counters"]["llm.repair.regenerated"] == 1
+
+    with pytest.raises(QuizGenerationError):
+        complete_json(ScriptedLLM("a", "b"), "prompt", QuizSchema, attempts=1)
+
+
+@pytest.mark.django_db
+def test_serializer_saves_quiz_after_repairing_one_question(monkeypatch, user, fake_quiz_payload):
+    monkeypatch.setattr(quiz_serializers.CreateQuizSerializer, "_generate_quiz_from_transcript", REAL_GENERATE)
+    monkeypatch.setattr(quiz_serializers, "_download_and_transcripe_yt_video", lambda url, quality=None: ("Kurzes Transkript.", {}))
+    broken = dict(fake_quiz_payload, questions=list(fake_quiz_payload["questions"]))
+    broken["questions"][0] = make_question("Doppelte Optionen?", options=("A", "A", "B", "C"))
+    llm = ScriptedLLM(broken, {"questions": [make_question("Repariert?")]})
+    monkeypatch.setattr(quiz_serializers, "get_llm", lambda: llm)
+
+    serializer = quiz_serializers.CreateQuizSerializer(
+        data={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}, context={"user": user},
+    )
+    assert serializer.is_valid(), serializer.errors
+    quiz = serializer.save()
+
+    titles = list(Question.objects.filter(quiz=quiz).values_list("question_title", flat=True))
+    assert len(titles) == 10 and "Repariert?" in titles
+    assert len(llm.calls) == 2
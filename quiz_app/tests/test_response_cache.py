@@ -0,0 +1,190 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from quiz_app.api import metrics, response_cache
+from quiz_app.api import serializers as quiz_serializers
+from quiz_app.api.response_cache import QuizReadCache, get_quiz_read_cache
+from quiz_app.models import Question, Quiz
+
+URL = "https://www.youtube.com/watch?v=abc123"
+
+
+@pytest.fixture
+def quiz(user):
+    quiz = Quiz.objects.create(title="Quiz", video_url=URL, owner=user)
+    Question.objects.bulk_create([
+        Question(quiz=quiz, question_title=f"Frage {i}?", question_options=["A", "B", "C", "D"], answer="A")
+        for i in range(3)
+    ])
+    return quiz
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch):
+    metrics.reset()
+    monkeypatch.setattr(response_cache, "_cache", QuizReadCache())
+
+
+def hits():
+    return get_quiz_read_cache().stats()["hits"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", ["quiz-list", "quiz-detail", "async-quiz-list", "async-quiz-detail"])
+def test_second_read_is_served_from_the_cache(api_client, quiz, name, django_assert_max_num_queries):
+    url = reverse(name, kwargs={"id": quiz.pk}) if "detail" in name else reverse(name)
+    first = api_client.get(url)
+    before = hits()
+
+    with django_assert_max_num_queries(1):  # Benutzer
+        second = api_client.get(url)
+
+    assert second.status_code == status.HTTP_200_OK
+    assert second.json() == first.json()
+    assert second["ETag"] == first["ETag"]
+    assert hits() == before + 1
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=second["ETag"]).status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("prefix", ["", "async-"])
+def test_update_and_delete_invalidate_detail_and_list(api_client, quiz, prefix):
+    detail = reverse(f"{prefix}quiz-detail", kwargs={"id": quiz.pk})
+    listing = reverse(f"{prefix}quiz-list")
+    api_client.get(detail)
+    api_client.get(listing)
+
+    api_client.patch(detail, {"title": "Neuer Titel"}, format="json")
+
+    assert api_client.get(detail).json()["title"] == "Neuer Titel"
+    assert api_client.get(listing).json()[0]["title"] == "Neuer Titel"
+
+    api_client.delete(detail)
+
+    assert api_client.get(detail).status_code == status.HTTP_404_NOT_FOUND
+    assert api_client.get(listing).json() == []
+
+
+@pytest.mark.django_db
+def test_generating_a_quiz_invalidates_the_list_and_the_detail(api_client, user, monkeypatch, fake_quiz_payload):
+    assert api_client.get(reverse("quiz-list")).json() == []
+
+    api_client.post(reverse("create-quiz"), data={"url": URL}, format="json")
+
+    quizzes = api_client.get(reverse("quiz-list")).json()
+    assert [q["question_count"] for q in quizzes] == [10]
+    detail = reverse("quiz-detail", kwargs={"id": quizzes[0]["id"]})
+    assert api_client.get(detail).json()["title"] == fake_quiz_payload["title"]
+
+    # Erneute Generierung desselben Videos: Quiz aktualisiert, Fragen ersetzt
+    regenerated = dict(fake_quiz_payload, title="Neu generiert")
+    monkeypatch.setattr(quiz_serializers.CreateQuizSerializer, "_generate_quiz_from_transcript", lambda self, url: regenerated)
+    quiz_serializers.CreateQuizSerializer()._create_quiz(URL, user)
+
+    assert api_client.get(detail).json()["title"] == "Neu generiert"
+    assert api_client.get(reverse("quiz-list")).json()[0]["title"] == "Neu generiert"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("prefix", ["", "async-"])
+def test_writes_outside_the_api_are_never_served_stale(api_client, quiz, prefix):
+    detail = reverse(f"{prefix}quiz-detail", kwargs={"id": quiz.pk})
+    api_client.get(detail)
+
+    # z. B. im Admin: das post_save-Signal macht den Eintrag ungültig
+    quiz.title = "Im Admin geändert"
+    quiz.save()
+
+    assert api_client.get(detail).json()["title"] == "Im Admin geändert"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("prefix", ["", "async-"])
+def test_question_edits_outside_the_api_invalidate_detail_and_list(api_client, quiz, prefix):
+    detail = reverse(f"{prefix}quiz-detail", kwargs={"id": quiz.pk})
+    listing = reverse(f"{prefix}quiz-list")
+    etag = api_client.get(detail)["ETag"]
+    api_client.get(listing)
+
+    # z. B. im QuestionAdmin oder in der Shell
+    question = Question.objects.get(pk=quiz.questions.first().pk)
+    question.question_title = "Im Admin geändert?"
+    question.save()
+
+    response = api_client.get(detail)
+    assert response.json()["questions"][0]["question_title"] == "Im Admin geändert?"
+    assert response["ETag"] != etag
+
+    Question.objects.get(pk=question.pk).delete()
+    assert api_client.get(listing).json()[0]["question_count"] == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("prefix", ["", "async-"])
+def test_conditional_requests_skip_entries_older_than_the_database(api_client, quiz, prefix):
+    detail = reverse(f"{prefix}quiz-detail", kwargs={"id": quiz.pk})
+    etag = api_client.get(detail)["ETag"]
+
+    # QuerySet.update() löst keine Signale aus, der Eintrag bleibt liegen
+    Quiz.objects.filter(pk=quiz.pk).update(title="Ohne Signal geändert", updated_at=timezone.now())
+
+    response = api_client.get(detail, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "Ohne Signal geändert"
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_entries_are_per_user(api_client, quiz):
+    api_client.get(reverse("quiz-list"))
+    api_client.get(reverse("quiz-detail", kwargs={"id": quiz.pk}))
+
+    other = APIClient()
+    other.force_authenticate(user=User.objects.create_user(username="other", password="123456"))
+
+    assert other.get(reverse("quiz-list")).json() == []
+    assert other.get(reverse("quiz-detail", kwargs={"id": quiz.pk})).status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_evicted_version_token_never_revives_old_entries():
+    reads = QuizReadCache()
+    key, _ = reads.quiz_entry(1, 7)
+    reads.store(key, {"title": "Alt"})
+    reads.invalidate(7, 1)
+    caches["quiz_reads"].delete("quiz-reads:version:quiz:7")
+
+    new_key, entry = reads.quiz_entry(1, 7)
+
+    assert entry is None and new_key != key
+    assert reads.stats() == {"backend": "LocMemCache", "hits": 0, "misses": 2, "hit_ratio": 0.0}
+
+
+def test_file_backend_is_shared_between_cache_instances(settings, tmp_path):
+    settings.CACHES = {
+        **settings.CACHES,
+        "quiz_reads": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": str(tmp_path)},
+    }
+    key, _ = QuizReadCache().list_entry(1, [])
+    QuizReadCache().store(key, [{"id": 1}], {"Link": "<x>", "ETag": '"e"', "Content-Type": "text/html"})
+
+    _, entry = QuizReadCache().list_entry(1, [])
+
+    assert entry == {"data": [{"id": 1}], "headers": {"Link": "<x>", "ETag": '"e"'}}
+
+
+@pytest.mark.django_db
+def test_metrics_view_reports_the_hit_ratio(api_client, quiz):
+    api_client.get(reverse("quiz-list"))
+    api_client.get(reverse("quiz-list"))
+    admin = APIClient()
+    admin.force_authenticate(user=User.objects.create_user(username="admin", password="123456", is_staff=True))
+
+    data = admin.get(reverse("metrics")).data
+
+    assert data["quiz_read_cache"]["hit_ratio"] == 0.5
+    assert data["counters"]["quiz_read_cache.hits"] == 1
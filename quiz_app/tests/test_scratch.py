@@ -0,0 +1,127 @@
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from quiz_app.api import scratch, utils
+from quiz_app.api import serializers as quiz_serializers
+
+
+def make_space(tmp_path, quota=1000, wait_seconds=5):
+    return scratch.ScratchSpace(tmp_path / "scratch", quota, wait_seconds=wait_seconds, orphan_seconds=3600)
+
+
+def test_each_job_gets_its_own_directory_which_is_always_removed(tmp_path):
+    space = make_space(tmp_path)
+
+    with space.job_dir(100) as first, space.job_dir(100) as second:
+        assert first != second
+        (tmp_path / first / "audio.webm").write_bytes(b"x" * 10)
+    assert not os.path.exists(first) and not os.path.exists(second)
+
+    with pytest.raises(RuntimeError):
+        with space.job_dir(100) as failed:
+            (tmp_path / failed / "audio.webm").write_bytes(b"x")
+            raise RuntimeError("Download abgebrochen")
+    assert not os.path.exists(failed)
+    assert os.listdir(space.root) == []
+
+
+def test_quota_applies_back_pressure_until_space_is_freed(tmp_path):
+    space = make_space(tmp_path, quota=1000)
+    started = threading.Event()
+    release = threading.Event()
+    order = []
+
+    def first_job():
+        with space.job_dir(800):
+            started.set()
+            release.wait(5)
+            order.append("first done")
+
+    def second_job():
+        with space.job_dir(500):
+            order.append("second started")
+
+    first = threading.Thread(target=first_job)
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=second_job)
+    second.start()
+    time.sleep(0.2)
+    assert order == []  # wartet auf freien Platz
+
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert order == ["first done", "second started"]
+
+
+def test_quota_counts_real_file_sizes_and_times_out(tmp_path):
+    space = make_space(tmp_path, quota=1000, wait_seconds=0)
+
+    with space.job_dir(100) as workdir:
+        (tmp_path / workdir / "audio.webm").write_bytes(b"x" * 700)
+        assert space.usage() >= 700
+        with pytest.raises(scratch.ScratchQuotaExceeded):
+            with space.job_dir(400):
+                pass
+
+    with pytest.raises(scratch.ScratchQuotaExceeded):
+        with space.job_dir(2000):
+            pass
+
+
+def write_owner(path, **owner):
+    path.mkdir(parents=True)
+    (path / scratch.OWNER_FILE).write_text(json.dumps(owner))
+
+
+def test_janitor_removes_only_orphaned_directories(tmp_path, monkeypatch):
+    space = make_space(tmp_path)
+    root = tmp_path / "scratch"
+    host = socket.gethostname()
+    write_owner(root / "job-crashed", pid=999999, host=host)
+    write_owner(root / "job-alive", pid=os.getppid(), host=host)
+    write_owner(root / "job-other-host", pid=1, host="other")
+    write_owner(root / "job-old", pid=1, host="other")
+    old = time.time() - 2 * 3600
+    os.utime(root / "job-old", (old, old))
+    monkeypatch.setattr(scratch, "_pid_alive", lambda pid: pid != 999999)
+
+    with space.job_dir(100) as active:
+        assert space.sweep() == 2
+        assert os.path.exists(active)
+
+    assert sorted(os.listdir(root)) == ["job-alive", "job-other-host"]
+
+
+def test_failed_download_leaves_no_files_behind(monkeypatch, settings):
+    def broken_download(url, output_dir=None):
+        with open(os.path.join(output_dir, "abc123.webm"), "wb") as fh:
+            fh.write(b"halb")
+        raise OSError("Verbindung abgebrochen")
+
+    monkeypatch.setattr(quiz_serializers, "download_audio_pcm", broken_download)
+
+    with pytest.raises(quiz_serializers.serializers.ValidationError):
+        quiz_serializers._whisper_transcript("https://youtu.be/abc123")
+
+    assert os.listdir(settings.SCRATCH_DIR) == []
+
+
+def test_transcript_audio_deletes_the_file_when_transcription_fails(monkeypatch, tmp_path):
+    path = tmp_path / "audio.mp3"
+    path.write_bytes(b"mp3")
+
+    def broken(audio, model_name=None):
+        raise RuntimeError("Whisper abgestürzt")
+
+    monkeypatch.setattr(utils, "_transcribe", broken)
+
+    with pytest.raises(RuntimeError):
+        utils.transcript_audio(str(path))
+    assert not path.exists()
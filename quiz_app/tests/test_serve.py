@@ -0,0 +1,111 @@
+import runpy
+
+import pytest
+import torch
+from django.conf import settings as django_settings
+from django.core.management import call_command
+
+from quiz_app.api import jobs, metrics
+from quiz_app.management.commands import serve
+
+
+@pytest.fixture
+def exec_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(serve.os, "execve", lambda path, argv, env: calls.append((argv, env)))
+    return calls
+
+
+def test_serve_starts_gunicorn_with_production_settings(exec_calls, settings):
+    settings.WHISPER_WARMUP_MODELS = []
+    settings.WHISPER_MODEL = "base"
+
+    call_command("serve", "--workers", "3", "--threads", "4")
+
+    argv, env = exec_calls[0]
+    assert argv[1:4] == ["-m", "gunicorn", "--config"]
+    assert argv[4].endswith("gunicorn.conf.py") and argv[-1] == "core.wsgi:application"
+    assert env["DEBUG"] == "0"
+    assert env["WHISPER_WARMUP_MODELS"] == "base"
+    assert (env["GUNICORN_WORKERS"], env["GUNICORN_THREADS"]) == ("3", "4")
+
+
+def test_serve_preloads_the_requested_models(exec_calls):
+    call_command("serve", "--models", "tiny,small")
+
+    assert exec_calls[0][1]["WHISPER_WARMUP_MODELS"] == "tiny,small"
+
+
+def test_gunicorn_profile_preloads_and_splits_cores(monkeypatch):
+    monkeypatch.setenv("GUNICORN_WORKERS", "2")
+    config = runpy.run_path(str(django_settings.BASE_DIR / "gunicorn.conf.py"))
+    assert config["preload_app"] is True and config["worker_class"] == "gthread"
+
+    class FakeServer:
+        class cfg:
+            workers = 2
+
+    started = []
+    monkeypatch.setattr(jobs, "get_executor", lambda: started.append(True))
+    threads = torch.get_num_threads()
+    monkeypatch.setattr(config["os"], "cpu_count", lambda: 8)
+    try:
+        config["post_fork"](FakeServer, None)
+        assert torch.get_num_threads() == 4
+        assert started == [True]  # Job-Pool samt Wiederaufnahme offener Jobs
+    finally:
+        torch.set_num_threads(threads)
+
+
+def test_process_memory_reports_shared_and_private_pages():
+    memory = metrics.process_memory()
+
+    assert memory["pid"] > 0
+    if "pss_bytes" in memory:  # nur unter Linux
+        assert 0 < memory["pss_bytes"] <= memory["rss_bytes"]
+
+
+@pytest.mark.parametrize("argv, run_main, expected", [
+    (["manage.py", "migrate", "--noinput"], None, False),
+    (["manage.py", "serve"], None, False),         # lädt gunicorns Master, nicht serve selbst
+    (["manage.py", "runserver"], None, False),     # Autoreloader-Elternprozess
+    (["manage.py", "runserver"], "true", True),
+    (["manage.py", "runserver", "--noreload"], None, True),
+])
+def test_models_are_only_warmed_up_where_requests_are_served(monkeypatch, argv, run_main, expected):
+    from quiz_app import apps
+
+    monkeypatch.setattr(apps.sys, "argv", argv)
+    if run_main:
+        monkeypatch.setenv("RUN_MAIN", run_main)
+    else:
+        monkeypatch.delenv("RUN_MAIN", raising=False)
+
+    assert apps.serves_requests_here() is expected
+
+
+def test_gunicorn_master_warms_up_before_forking(monkeypatch):
+    from quiz_app.api import transcript_budget
+    from quiz_app.api.whisper_models import registry
+
+    config = runpy.run_path(str(django_settings.BASE_DIR / "gunicorn.conf.py"))
+    calls = []
+    monkeypatch.setattr(registry, "warm_up", lambda: calls.append("whisper"))
+    monkeypatch.setattr(transcript_budget, "load_encoding", lambda timeout=None: calls.append("tokenizer"))
+
+    config["when_ready"](None)
+
+    assert calls == ["whisper", "tokenizer"]
+
+
+def test_collected_static_files_are_served_without_debug(settings, tmp_path, client):
+    settings.DEBUG = False
+    settings.STATIC_ROOT = tmp_path
+    (tmp_path / "admin" / "css").mkdir(parents=True)
+    (tmp_path / "admin" / "css" / "base.css").write_text("body {}")
+
+    response = client.get("/static/admin/css/base.css")
+
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == b"body {}"
+    assert client.get("/static/fehlt.css").status_code == 404
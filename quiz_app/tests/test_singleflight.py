@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+from filelock import FileLock
+
+from quiz_app.api import metrics
+from quiz_app.api.singleflight import SingleFlight
+
+
+def test_concurrent_calls_for_one_key_run_once():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def pipeline():
+        calls.append(1)
+        release.wait(5)
+        return "quiz"
+
+    threads = [threading.Thread(target=lambda: results.append(flights.do("abc", pipeline))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    while len(flights.in_flight()) == 0:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [1]
+    assert results == ["quiz"] * 5
+    assert flights.in_flight() == []
+
+
+def test_followers_receive_the_leaders_exception():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("kaputt")
+
+    def call():
+        try:
+            flights.do("abc", failing)
+        except ValueError as exc:
+            errors.append(str(exc))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    time.sleep(0.1)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert errors == ["kaputt", "kaputt"]
+
+
+def test_different_keys_do_not_block_each_other():
+    flights = SingleFlight()
+    assert flights.do("a", lambda: 1) == 1
+    assert flights.do("b", lambda: 2) == 2
+
+
+def test_process_that_waited_on_file_lock_reuses_result(tmp_path):
+    flights = SingleFlight()
+    metrics.reset()
+    stored = {}
+    results = []
+
+    # Simuliert einen anderen Prozess, der das Video gerade verarbeitet
+    other_process = FileLock(SingleFlight.lock_path(tmp_path, "abc"))
+    other_process.acquire()
+
+    worker = threading.Thread(target=lambda: results.append(flights.do(
+        "abc",
+        lambda: pytest.fail("Pipeline darf nicht erneut laufen"),
+        reuse=lambda: stored.get("quiz"),
+        lock_dir=tmp_path,
+    )))
+    worker.start()
+    time.sleep(0.2)
+    stored["quiz"] = "quiz vom anderen Prozess"
+    other_process.release()
+    worker.join(5)
+
+    assert results == ["quiz vom anderen Prozess"]
+    assert metrics.snapshot()["counters"]["singleflight.coalesced"] == 1
@@ -0,0 +1,80 @@
+import io
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from quiz_app.api import utils
+
+SR = 16000
+
+
+def pcm_bytes(seconds):
+    return np.zeros(int(seconds * SR), dtype=np.int16).tobytes()
+
+
+class TrickleStream(io.BytesIO):
+    """Liefert höchstens 777 Bytes pro read() (ungerade, wie eine Pipe)."""
+
+    def read(self, size=-1):
+        return super().read(min(size, 777) if size > 0 else 777)
+
+
+def test_read_pcm_windows_overlap_and_skip_covered_tail():
+    windows = list(utils._read_pcm_windows(TrickleStream(pcm_bytes(58)), window_seconds=30, overlap_seconds=2))
+
+    assert [(start // SR, len(w) // SR) for start, w in windows] == [(0, 30), (28, 30)]
+
+    windows = list(utils._read_pcm_windows(io.BytesIO(pcm_bytes(65)), window_seconds=30, overlap_seconds=2))
+    assert [(start // SR, len(w) // SR) for start, w in windows] == [(0, 30), (28, 30), (56, 9)]
+
+
+def test_stream_audio_windows_hands_windows_over_a_bounded_queue(monkeypatch):
+    monkeypatch.setattr(utils, "_spawn_decoder", lambda url: ([], io.BytesIO(pcm_bytes(65))))
+
+    windows = list(utils.stream_audio_windows("https://youtu.be/abc123", 30, 2, max_windows=1))
+
+    assert [start // SR for start, _ in windows] == [0, 28, 56]
+
+
+def test_stream_audio_windows_reports_decoder_failures(monkeypatch):
+    class FailedProcess:
+        args = ["ffmpeg"]
+        returncode = 1
+
+        def wait(self):
+            return 1
+
+        def poll(self):
+            return 1
+
+    monkeypatch.setattr(utils, "_spawn_decoder", lambda url: ([FailedProcess()], io.BytesIO(b"")))
+
+    with pytest.raises(RuntimeError, match="ffmpeg exited"):
+        list(utils.stream_audio_windows("https://youtu.be/abc123"))
+
+
+def test_transcribe_stream_stitches_window_transcripts(monkeypatch, settings):
+    settings.WHISPER_PIPELINE_WINDOW_SECONDS = 30
+    settings.WHISPER_PIPELINE_OVERLAP_SECONDS = 2
+    monkeypatch.setattr(utils, "_spawn_decoder", lambda url: ([], io.BytesIO(pcm_bytes(40))))
+    prompts = []
+
+    class FakeModel:
+        def transcribe(self, audio, initial_prompt=None, **options):
+            prompts.append(initial_prompt)
+            seconds = len(audio) / SR
+            text = f" Fenster mit {seconds:.0f} Sekunden."
+            return {"text": text, "segments": [{"start": 0.0, "end": seconds, "text": text}]}
+
+    class FakeRegistry:
+        @contextmanager
+        def use(self, name):
+            yield FakeModel()
+
+    monkeypatch.setattr(utils, "whisper_models", FakeRegistry())
+
+    text = utils.transcribe_stream("https://youtu.be/abc123")
+
+    assert text == "Fenster mit 30 Sekunden. Fenster mit 12 Sekunden."
+    assert prompts == [None, " Fenster mit 30 Sekunden."]
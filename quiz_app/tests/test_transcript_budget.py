@@ -0,0 +1,132 @@
+import json
+import threading
+import time
+
+import pytest
+
+from quiz_app.api import serializers as quiz_serializers
+from quiz_app.api import transcript_budget
+from quiz_app.api.transcript_budget import compress_transcript, count_tokens
+from quiz_app.models import Quiz
+
+# Vor dem autouse-Mock gesichert, damit wir den echten Ablauf testen können
+REAL_GENERATE = quiz_serializers.CreateQuizSerializer._generate_quiz_from_transcript
+
+
+def test_short_transcript_is_left_untouched():
+    text = "Ähm, das ist ein kurzes Transkript."
+
+    result, stats = compress_transcript(text, budget=1000)
+
+    assert result == text
+    assert stats["steps"] == []
+    assert stats["raw_tokens"] == stats["tokens"] == count_tokens(text)
+
+
+def test_filler_is_dropped_before_anything_else():
+    text = "Um, so the the idea is simple. [Music] Uh, we cache results."
+
+    result, stats = compress_transcript(text, budget=count_tokens(text) - 1)
+
+    assert result == "so the idea is simple. we cache results."
+    assert stats["steps"] == ["filler"]
+
+
+def test_repeated_segments_are_deduplicated():
+    text = "Um, so the idea is simple. We cache results. " * 3
+
+    result, stats = compress_transcript(text, budget=20)
+
+    assert result == "so the idea is simple. We cache results."
+    assert stats["steps"] == ["filler", "dedupe"]
+    assert stats["tokens"] <= 20
+
+
+def test_sampling_keeps_all_parts_of_a_long_transcript():
+    sentences = [f"Abschnitt {i} erklärt ein eigenes Thema." for i in range(400)]
+    text = " ".join(sentences)
+
+    result, stats = compress_transcript(text, budget=500)
+
+    assert stats["steps"] == ["filler", "dedupe", "sample"]
+    assert stats["tokens"] <= 500 < stats["raw_tokens"]
+    kept = [int(s.split()[1]) for s in result.split(".") if s.strip()]
+    assert kept == sorted(kept)
+    # Anfang, Mitte und Ende des Videos bleiben vertreten
+    assert kept[0] < 20 and any(180 < i < 220 for i in kept) and kept[-1] > 380
+
+
+def test_token_count_estimate_without_tokenizer(monkeypatch):
+    monkeypatch.setattr(transcript_budget, "get_encoding", lambda: None)
+
+    assert count_tokens("x" * 10) == 3
+
+
+@pytest.mark.django_db
+def test_generation_stats_are_stored_on_the_quiz(monkeypatch, settings, user, fake_quiz_payload):
+    monkeypatch.setattr(quiz_serializers.CreateQuizSerializer, "_generate_quiz_from_transcript", REAL_GENERATE)
+    transcript = " ".join(f"Satz Nummer {i} über Caching." for i in range(300))
+    monkeypatch.setattr(quiz_serializers, "_download_and_transcripe_yt_video", lambda url, quality=None: (transcript, {}))
+    prompts = []
+
+    class FakeLLM:
+        def complete(self, prompt, **config):
+            prompts.append(prompt)
+            return json.dumps(fake_quiz_payload)
+
+    monkeypatch.setattr(quiz_serializers, "get_llm", lambda: FakeLLM())
+    settings.QUIZ_PROMPT_TOKEN_BUDGET = 200
+
+    serializer = quiz_serializers.CreateQuizSerializer(
+        data={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}, context={"user": user},
+    )
+    assert serializer.is_valid(), serializer.errors
+    quiz = Quiz.objects.get(pk=serializer.save().pk)
+
+    assert quiz.transcript_tokens == count_tokens(transcript)
+    assert quiz.prompt_tokens == count_tokens(prompts[0])
+    assert quiz.prompt_tokens < quiz.transcript_tokens
+    assert quiz.llm_latency_ms is not None
+
+
+def test_requests_estimate_while_the_tokenizer_is_still_loading(monkeypatch):
+    release = threading.Event()
+
+    class WordEncoding:
+        def encode(self, text, disallowed_special=()):
+            return text.split()
+
+    monkeypatch.setattr(transcript_budget, "_load_encoding", lambda: release.wait(5) and WordEncoding())
+    monkeypatch.setattr(transcript_budget, "_loader", None)
+    monkeypatch.setattr(transcript_budget, "_loaded", threading.Event())
+    monkeypatch.setattr(transcript_budget, "_encoding", None)
+    monkeypatch.setattr(transcript_budget, "_REQUEST_WAIT_SECONDS", 0.05)
+    monkeypatch.setattr(transcript_budget, "_waited", False)
+    text = "eins zwei drei vier fuenf"
+
+    # Download hängt (z. B. kein Netz): Schätzung über die Zeichenzahl statt zu blockieren
+    assert count_tokens(text) == 7
+
+    release.set()
+    assert transcript_budget.load_encoding(timeout=5) is not None
+    assert count_tokens(text) == 5
+
+
+def test_a_stuck_tokenizer_is_waited_for_only_once(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(transcript_budget, "_load_encoding", lambda: release.wait(5) and None)
+    monkeypatch.setattr(transcript_budget, "_loader", None)
+    monkeypatch.setattr(transcript_budget, "_loaded", threading.Event())
+    monkeypatch.setattr(transcript_budget, "_encoding", None)
+    monkeypatch.setattr(transcript_budget, "_REQUEST_WAIT_SECONDS", 0.2)
+    monkeypatch.setattr(transcript_budget, "_waited", False)
+    text = " ".join(f"Satz Nummer {i} über das Thema." for i in range(500))
+
+    started = time.monotonic()
+    result, stats = compress_transcript(text, budget=200)
+    elapsed = time.monotonic() - started
+    release.set()
+
+    # Hunderte Zählungen (eine pro Satz), aber nur die erste wartet
+    assert elapsed < 1
+    assert stats["tokens"] <= 200 and result
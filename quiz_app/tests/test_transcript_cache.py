@@ -0,0 +1,95 @@
+import os
+import time
+
+import pytest
+from rest_framework.exceptions import ValidationError
+
+from quiz_app.api import serializers as quiz_serializers
+from quiz_app.api import utils
+from quiz_app.api.transcript_cache import TranscriptCache, get_transcript_cache
+
+
+def test_key_depends_on_video_model_and_options():
+    key = TranscriptCache.make_key("abc123", "base", {"fp16": False})
+
+    assert key == TranscriptCache.make_key("abc123", "base", {"fp16": False})
+    assert key != TranscriptCache.make_key("abc124", "base", {"fp16": False})
+    assert key != TranscriptCache.make_key("abc123", "small", {"fp16": False})
+    assert key != TranscriptCache.make_key("abc123", "base", {"fp16": True})
+
+
+def test_get_counts_hits_and_misses(tmp_path):
+    cache = TranscriptCache(tmp_path, max_bytes=10_000)
+    key = cache.make_key("abc123", "base")
+
+    assert cache.get(key) is None
+    cache.set(key, "Hallo Welt", video_id="abc123")
+    assert cache.get(key) == "Hallo Welt"
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_eviction_drops_least_recently_used_entries(tmp_path):
+    cache = TranscriptCache(tmp_path, max_bytes=10_000)
+    keys = [cache.make_key(f"video{i}", "base") for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.set(key, "x" * 1000)
+        past = time.time() - 100 + i
+        os.utime(cache.path_for(key), (past, past))
+
+    # video0 wird gelesen und ist danach das zuletzt benutzte Element
+    assert cache.get(keys[0]) is not None
+    cache.max_bytes = 2 * os.path.getsize(cache.path_for(keys[0]))
+    cache.evict()
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+
+
+@pytest.mark.django_db
+def test_download_and_transcribe_uses_cache_for_repeat_videos(monkeypatch):
+    calls = []
+
+    def fake_download(url, output_dir=None):
+        calls.append(url)
+        return [0.0] * 16000
+
+    monkeypatch.setattr(quiz_serializers, "download_audio_pcm", fake_download)
+    monkeypatch.setattr(utils, "transcript_audio", lambda audio, model_name=None: "Ein Transkript")
+
+    first, _ = quiz_serializers._download_and_transcripe_yt_video("https://www.youtube.com/watch?v=abc123DEF45")
+    second, _ = quiz_serializers._download_and_transcripe_yt_video("https://youtu.be/abc123DEF45")
+
+    assert first == second == "Ein Transkript"
+    assert len(calls) == 1
+    stats = get_transcript_cache().stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)  # eine Abfrage je Video, egal wie viele Backends
+
+
+@pytest.mark.django_db
+def test_cached_transcripts_of_less_accurate_backends_are_not_reused(monkeypatch, settings):
+    settings.WHISPER_MODEL = "base"
+    settings.ASR_BACKENDS = ["tiny", "base", "small"]
+    cache = get_transcript_cache()
+    cache.set(quiz_serializers._transcript_cache_key(cache, "abc123DEF45", "tiny"), "Tiny-Transkript")
+    monkeypatch.setattr(quiz_serializers, "download_audio_pcm", lambda url, output_dir=None: [0.0] * 16000 * 600)
+    monkeypatch.setattr(utils, "transcript_audio", lambda audio, model_name=None: f"Neu mit {model_name}")
+    url = "https://www.youtube.com/watch?v=abc123DEF45"
+
+    assert quiz_serializers._download_and_transcripe_yt_video(url, "fast")[0] == "Tiny-Transkript"
+
+    text, info = quiz_serializers._download_and_transcripe_yt_video(url, "best")
+    assert text == "Neu mit small" and info["asr_backend"] == "small"
+    assert quiz_serializers._download_and_transcripe_yt_video(url)[0] == "Neu mit small"
+
+
+def test_download_and_transcribe_wraps_pipeline_errors(monkeypatch):
+    def broken_download(url, output_dir=None):
+        raise RuntimeError("403")
+
+    monkeypatch.setattr(quiz_serializers, "download_audio_pcm", broken_download)
+
+    with pytest.raises(ValidationError):
+        quiz_serializers._download_and_transcripe_yt_video("https://www.youtube.com/watch?v=abc123DEF45")
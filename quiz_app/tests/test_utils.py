@@ -1,4 +1,5 @@
 import os
+import numpy as np
 import pytest
 
 from quiz_app.api import utils
@@ -104,3 +105,35 @@ def test_yt_url_to_id_invalid_strings(url):
 @pytest.mark.parametrize("non_str", [None, 123, 12.34, [], {}])
 def test_yt_url_to_id_non_string_returns_none(non_str):
     assert utils.yt_url_to_id(non_str) is None
+
+
+def test_download_audio_pcm_decodes_stream_without_reencoding(monkeypatch, tmp_path):
+    seen_opts = {}
+    stream = tmp_path / "abc123.webm"
+
+    class FakeYDL:
+        def __init__(self, opts):
+            seen_opts.update(opts)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+        def extract_info(self, url, download=True):
+            stream.write_bytes(b"opus")
+            return {"id": "abc123", "ext": "webm"}
+
+        def prepare_filename(self, info):
+            return str(stream)
+
+    monkeypatch.setattr(utils.yt_dlp, "YoutubeDL", FakeYDL)
+    monkeypatch.setattr(utils.whisper, "load_audio", lambda path: np.zeros(32000, dtype=np.float32))
+
+    audio = utils.download_audio_pcm("https://www.youtube.com/watch?v=abc123", output_dir=str(tmp_path))
+
+    assert audio.dtype == np.float32 and len(audio) == 32000
+    assert "postprocessors" not in seen_opts
+    assert seen_opts["outtmpl"].endswith("%(id)s.%(ext)s")
+    assert not stream.exists()
@@ -0,0 +1,202 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from quiz_app.api import metrics, video_probe
+from quiz_app.api import serializers as quiz_serializers
+from quiz_app.models import Quiz, QuizJob
+
+URL = "https://www.youtube.com/watch?v=abc123DEF45"
+
+
+def make_info(**overrides):
+    info = {
+        "id": "abc123DEF45",
+        "title": "Vorlesung",
+        "duration": 1200,
+        "live_status": "not_live",
+        "availability": "public",
+        "language": "de",
+        "subtitles": {},
+        "requested_subtitles": {"de-orig": {"ext": "vtt", "url": "https://example.com/de.vtt"}},
+        "chapters": [{"title": "Einleitung", "start_time": 0.0, "end_time": 300.0}],
+    }
+    info.update(overrides)
+    return info
+
+
+@pytest.fixture
+def fake_ydl(monkeypatch, settings):
+    """Ersetzt yt-dlp; gibt das in `state["info"]` hinterlegte Info-Dict zurück und zählt die Abfragen."""
+    settings.VIDEO_PROBE_ENABLED = True
+    metrics.reset()
+    state = {"info": make_info(), "calls": 0}
+
+    class FakeYDL:
+        def __init__(self, opts):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
+        def extract_info(self, url, download=True):
+            assert download is False
+            state["calls"] += 1
+            if isinstance(state["info"], Exception):
+                raise state["info"]
+            return state["info"]
+
+    monkeypatch.setattr(video_probe.yt_dlp, "YoutubeDL", FakeYDL)
+    return state
+
+
+def test_probe_reports_duration_captions_and_chapters_and_is_cached(fake_ydl):
+    probe = video_probe.probe_video(URL)
+    again = video_probe.probe_video("https://youtu.be/abc123DEF45")
+
+    assert again is probe
+    assert fake_ydl["calls"] == 1
+    assert probe["duration"] == 1200
+    assert probe["has_captions"] and probe["caption_language"] == "de-orig"
+    assert probe["chapters"] == [{"title": "Einleitung", "start": 0.0, "end": 300.0}]
+    counters = metrics.snapshot()["counters"]
+    assert (counters["video_probe.misses"], counters["video_probe.hits"]) == (1, 1)
+
+
+def test_probe_cache_expires(fake_ydl, settings):
+    settings.VIDEO_PROBE_TTL_SECONDS = 0
+
+    video_probe.probe_video(URL)
+    video_probe.probe_video(URL)
+
+    assert fake_ydl["calls"] == 2
+
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"duration": 4 * 3600}, "zu lang"),
+    ({"live_status": "is_live"}, "Livestreams"),
+    ({"live_status": "is_upcoming"}, "Livestreams"),
+    ({"availability": "private"}, "nicht öffentlich"),
+])
+def test_check_video_rejects_unsuitable_videos(overrides, message, settings):
+    settings.QUIZ_MAX_VIDEO_DURATION = 3 * 3600
+
+    with pytest.raises(video_probe.VideoRejected, match=message):
+        video_probe.check_video(video_probe._summarize(make_info(**overrides)))
+
+
+def test_unavailable_video_is_rejected(fake_ydl):
+    fake_ydl["info"] = video_probe.yt_dlp.utils.DownloadError("Video unavailable")
+
+    with pytest.raises(video_probe.VideoRejected, match="nicht verfügbar"):
+        video_probe.probe_video(URL)
+
+
+@pytest.mark.django_db
+def test_transient_probe_errors_do_not_fail_the_job(api_client, fake_ydl):
+    fake_ydl["info"] = video_probe.yt_dlp.utils.DownloadError("HTTP Error 429: Too Many Requests")
+
+    with pytest.raises(video_probe.yt_dlp.utils.DownloadError):
+        video_probe.probe_video(URL)
+    # Die Pipeline läuft ohne Metadaten weiter, statt das Video als nicht verfügbar abzulehnen
+    assert quiz_serializers._probe_video(URL) is None
+    assert fake_ydl["calls"] == 2  # Fehler werden nicht zwischengespeichert
+
+    preview = api_client.get(reverse("video-probe"), {"url": URL})
+    assert preview.status_code == status.HTTP_200_OK
+    assert preview.data["accepted"] is None and "später" in preview.data["reason"]
+
+
+def test_live_streams_are_probed_again_soon(fake_ydl, settings, monkeypatch):
+    settings.VIDEO_PROBE_TTL_SECONDS = 3600
+    settings.VIDEO_PROBE_LIVE_TTL_SECONDS = 60
+    fake_ydl["info"] = make_info(live_status="is_upcoming")
+    clock = [1000.0]
+    monkeypatch.setattr(video_probe.time, "monotonic", lambda: clock[0])
+
+    assert video_probe.probe_video(URL)["live_status"] == "is_upcoming"
+    fake_ydl["info"] = make_info()
+    clock[0] += 61
+
+    assert video_probe.probe_video(URL)["live_status"] == "not_live"
+    assert fake_ydl["calls"] == 2
+
+
+@pytest.mark.django_db
+def test_estimate_uses_routing_and_observed_real_time_factor(settings, user):
+    settings.QUIZ_PROMPT_TOKEN_BUDGET = 0
+    settings.QUIZ_MAP_REDUCE_MIN_TOKENS = 12000
+    settings.QUIZ_MAP_SECTION_TOKENS = 4000
+    Quiz.objects.create(title="a", video_url="https://youtu.be/a", owner=user, asr_backend="tiny", asr_real_time_factor=0.1)
+    Quiz.objects.create(title="b", video_url="https://youtu.be/b", owner=user, asr_backend="tiny", asr_real_time_factor=0.3)
+    probe = video_probe._summarize(make_info(duration=2 * 3600, requested_subtitles={}))
+
+    estimate = video_probe.estimate_cost(probe)
+
+    assert estimate["strategy"] == "asr"
+    assert estimate["asr_backend"] == "tiny"  # lange Aufnahme → kleineres Modell
+    assert estimate["asr_seconds"] == 1440
+    assert estimate["map_reduce"] is True
+    assert estimate["llm_calls"] == 7
+
+
+@pytest.mark.django_db
+def test_too_long_video_is_rejected_before_any_download(monkeypatch, fake_ydl, settings):
+    settings.QUIZ_MAX_VIDEO_DURATION = 3600
+    fake_ydl["info"] = make_info(duration=4 * 3600)
+
+    def no_download(url, output_dir=None):
+        raise AssertionError("Download darf nicht starten")
+
+    monkeypatch.setattr(quiz_serializers, "download_audio_pcm", no_download)
+
+    with pytest.raises(quiz_serializers.serializers.ValidationError, match="zu lang"):
+        quiz_serializers._download_and_transcripe_yt_video(URL)
+    assert metrics.snapshot()["counters"]["video_probe.rejected"] == 1
+
+
+@pytest.mark.django_db
+def test_probe_reuses_metadata_for_captions_and_duration_for_routing(monkeypatch, fake_ydl, settings):
+    settings.CAPTIONS_ENABLED = True
+    seen = {}
+
+    def fake_captions(url, info=None):
+        seen["info"] = info
+        return None
+
+    monkeypatch.setattr(quiz_serializers, "fetch_caption_transcript", fake_captions)
+
+    def fake_whisper(url, quality=None, duration=None):
+        seen["duration"] = duration
+        return "Whisper-Transkript", "base", 0.2
+
+    monkeypatch.setattr(quiz_serializers, "_whisper_transcript", fake_whisper)
+
+    text, info = quiz_serializers._download_and_transcripe_yt_video(URL)
+
+    assert text == "Whisper-Transkript"
+    assert seen["info"]["requested_subtitles"] == make_info()["requested_subtitles"]
+    assert seen["duration"] == 1200
+    assert fake_ydl["calls"] == 1
+
+
+@pytest.mark.django_db
+def test_probe_view_previews_limits_and_cost(api_client, fake_ydl, settings):
+    settings.QUIZ_MAX_VIDEO_DURATION = 3600
+    settings.CAPTIONS_ENABLED = True
+    fake_ydl["info"] = make_info(duration=2 * 3600)
+
+    response = api_client.get(reverse("video-probe"), {"url": URL})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["accepted"] is False and "zu lang" in response.data["reason"]
+    assert response.data["duration"] == 7200 and response.data["has_captions"] is True
+    assert response.data["estimate"]["strategy"] == "captions"
+    assert "caption_info" not in response.data
+    assert not QuizJob.objects.exists()
+
+    invalid = api_client.get(reverse("video-probe"), {"url": "https://example.com/x"})
+    assert invalid.status_code == status.HTTP_400_BAD_REQUEST
@@ -49,16 +49,18 @@ def test_create_quiz_view_creates_quiz(monkeypatch):
 
     response = client.post(url, data=payload, format="json")
 
-    # 4) Prüfen
-    assert response.status_code == status.HTTP_201_CREATED
+    # 4) Prüfen: Job wurde angenommen (im Test eager ausgeführt)
+    assert response.status_code == status.HTTP_202_ACCEPTED
     assert Quiz.objects.count() == 1
 
     quiz = Quiz.objects.first()
     assert quiz.title == "Python Grundlagen"
     assert quiz.owner == user
 
-    # Response sollte die Daten aus dem Read-Serializer enthalten
-    assert response.data["title"] == "Python Grundlagen"
+    # Response enthält den Job inkl. der Daten aus dem Read-Serializer
+    assert response.data["status"] == "succeeded"
+    assert response.data["quiz"]["title"] == "Python Grundlagen"
+    assert response["Location"] == reverse("quiz-job-detail", kwargs={"id": response.data["id"]})
 
 
 @pytest.mark.django_db
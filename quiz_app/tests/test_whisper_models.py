@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+import torch
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from quiz_app.api import metrics
+from quiz_app.api.quantization import quantize_model, word_error_rate
+from quiz_app.api.whisper_models import WhisperModelRegistry, model_resident_bytes
+
+
+def make_counting_loader():
+    calls = []
+
+    def loader(name):
+        calls.append(name)
+        return torch.nn.Linear(4, 4)
+
+    return loader, calls
+
+
+def test_registry_loads_each_model_once_across_threads():
+    loader, calls = make_counting_loader()
+    registry = WhisperModelRegistry(loader=loader)
+    models = []
+
+    threads = [threading.Thread(target=lambda: models.append(registry.get("base"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ["base"]
+    assert all(m is models[0] for m in models)
+
+
+def test_registry_reports_load_time_and_resident_size():
+    loader, _ = make_counting_loader()
+    registry = WhisperModelRegistry(loader=loader)
+
+    model = registry.get("tiny")
+
+    stats = registry.stats()
+    assert set(stats) == {"tiny"}
+    assert stats["tiny"]["resident_bytes"] == model_resident_bytes(model) == (16 + 4) * 4
+    assert stats["tiny"]["load_seconds"] >= 0
+    assert metrics.snapshot()["gauges"]["whisper.tiny.resident_bytes"] == (16 + 4) * 4
+
+
+def test_warm_up_uses_configured_models(settings):
+    settings.WHISPER_WARMUP_MODELS = ["tiny", "base"]
+    loader, calls = make_counting_loader()
+    registry = WhisperModelRegistry(loader=loader)
+
+    registry.warm_up()
+    with registry.use("base") as model:
+        assert model is registry.get("base")
+
+    assert calls == ["tiny", "base"]
+
+
+def test_quantized_model_is_built_once_and_cached_separately(settings):
+    calls = []
+
+    def loader(name):
+        calls.append(name)
+        return torch.nn.Sequential(torch.nn.Linear(64, 64))
+
+    registry = WhisperModelRegistry(loader=loader)
+    settings.WHISPER_QUANTIZE = True
+
+    quantized = registry.get("base")
+    assert registry.get("base") is quantized
+    fp32 = registry.get("base", quantized=False)
+
+    assert calls == ["base", "base"]
+    assert isinstance(quantized[0], torch.ao.nn.quantized.dynamic.Linear)
+    assert isinstance(fp32[0], torch.nn.Linear)
+    stats = registry.stats()
+    # int8-Gewichte brauchen etwa ein Viertel des Speichers
+    assert stats["base-int8"]["resident_bytes"] < stats["base"]["resident_bytes"] / 2
+
+
+def test_quantized_whisper_keeps_its_output_close():
+    from whisper.model import ModelDimensions, Whisper
+
+    torch.manual_seed(0)
+    dims = ModelDimensions(
+        n_mels=80, n_audio_ctx=1500, n_audio_state=64, n_audio_head=2, n_audio_layer=1,
+        n_vocab=51865, n_text_ctx=448, n_text_state=64, n_text_head=2, n_text_layer=1,
+    )
+    model = Whisper(dims).eval()
+    mel = torch.randn(1, 80, 3000)
+    expected = model.encoder(mel)
+
+    quantized = quantize_model(model)
+
+    assert not any(isinstance(m, torch.nn.Linear) for m in quantized.modules())
+    assert torch.allclose(quantized.encoder(mel), expected, atol=0.1)
+
+
+def test_word_error_rate():
+    assert word_error_rate("Das ist ein Test.", "das ist ein test") == 0
+    assert word_error_rate("das ist ein test", "das war ein test") == 0.25
+    assert word_error_rate("das ist ein test", "das ist test ok ok") == 0.75
+    assert word_error_rate("", "") == 0
+
+
+@pytest.mark.django_db
+def test_metrics_view_requires_staff():
+    client = APIClient()
+    client.force_authenticate(user=User.objects.create_user(username="u", password="123456"))
+    assert client.get(reverse("metrics")).status_code == status.HTTP_403_FORBIDDEN
+
+    client.force_authenticate(user=User.objects.create_user(username="admin", password="123456", is_staff=True))
+    response = client.get(reverse("metrics"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert {"counters", "timings", "gauges", "whisper_models"} <= set(response.data)
@@ -0,0 +1,73 @@
+import pytest
+
+from quiz_app.api import jobs
+from quiz_app.api import ytdlp_version
+from quiz_app.api.ytdlp_version import YtDlpVersionManager
+
+
+class FakeUpdater:
+    queries = 0
+    updates = 0
+
+    def __init__(self, latest):
+        self.latest = latest
+
+    def query_update(self, _output=False):
+        FakeUpdater.queries += 1
+        if self.latest is None:
+            return None
+        return type("UpdateInfo", (), {"version": self.latest, "tag": self.latest})()
+
+    def update(self):
+        FakeUpdater.updates += 1
+        return True
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    FakeUpdater.queries = FakeUpdater.updates = 0
+    monkeypatch.setattr(ytdlp_version, "installed_version", "2026.01.01")
+    mgr = YtDlpVersionManager(tmp_path / "state.json", ttl_seconds=3600)
+    monkeypatch.setattr(mgr, "_updater", lambda: FakeUpdater("2026.02.01"))
+    return mgr
+
+
+def test_check_result_is_cached_until_ttl_expires(manager):
+    first = manager.check()
+    second = manager.check()
+
+    assert FakeUpdater.queries == 1
+    assert first == second
+    assert first["update_available"] is True
+
+    manager.ttl_seconds = -1
+    manager.check()
+    assert FakeUpdater.queries == 2
+
+
+def test_apply_update_marks_restart_and_is_not_repeated(manager):
+    manager.check()
+    assert manager.apply_update() is True
+
+    state = manager.check(force=True)
+    assert state["restart_required"] is True
+    assert manager.should_update(state) is False
+
+
+def test_run_between_jobs_skips_while_a_job_is_running():
+    calls = []
+    with jobs._job_slot():
+        assert jobs.run_between_jobs(lambda: calls.append("busy")) is False
+    assert jobs.run_between_jobs(lambda: calls.append("idle")) is True
+    assert calls == ["idle"]
+
+
+def test_refresh_yt_dlp_installs_update_when_pool_is_idle(manager, settings, monkeypatch):
+    settings.YT_DLP_AUTO_UPDATE = True
+    monkeypatch.setattr(jobs, "get_version_manager", lambda: manager)
+
+    jobs.refresh_yt_dlp()
+    jobs.refresh_yt_dlp()
+
+    assert FakeUpdater.queries == 1
+    assert FakeUpdater.updates == 1